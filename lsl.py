@@ -1,7 +1,10 @@
 import argparse
+import os
 import threading
 from lsl_antlr_parser import LSLParser
+from lsl_script_cache import load_script, get_cache_stats
 from lsl_simulator import LSLSimulator
+from lsl_log import LogWriter, configure
 from lsl_dialect import LSLDialect, set_dialect, get_dialect, parse_dialect_flag
 
 def main():
@@ -10,7 +13,13 @@ def main():
     parser.add_argument("filename", help="The LSL script file to run (e.g., sample.lsl)")
     parser.add_argument("--sl", action="store_true", help="Use Second Life dialect (default)")
     parser.add_argument("--os", action="store_true", help="Use OpenSimulator dialect")
+    parser.add_argument("--no-cache", action="store_true", help="Parse from scratch, bypassing __lslcache__")
+    parser.add_argument("--log", metavar="SPEC",
+                        help="Log levels, e.g. 'debug' or 'event=debug,api=info' (default: warnings, plus chat)")
+    parser.add_argument("--inventory", help="Directory holding the script's notecards (default: the script's directory)")
     args = parser.parse_args()
+    # Interactive: write each line as it comes rather than in batches
+    configure(args.log, writer=LogWriter(capacity=1))
     
     # Set dialect based on arguments
     if args.os:
@@ -31,16 +40,19 @@ def main():
 
     # --- 1. Parse the Script ---
     print(f"--- Parsing {args.filename} ---")
-    lsl_parser = LSLParser()
     try:
-        parsed_script = lsl_parser.parse(lsl_code)
-        print("Parsing complete.")
+        if args.no_cache:
+            parsed_script = LSLParser(single_pass=True).parse(lsl_code)
+        else:
+            parsed_script = load_script(args.filename, lsl_code)
+        print(f"Parsing complete. (cache: {get_cache_stats()})")
     except Exception as e:
         print(f"A parsing error occurred: {e}")
         return
 
     # --- 2. Simulate the Script ---
-    simulator = LSLSimulator(parsed_script)
+    inventory = args.inventory or os.path.dirname(os.path.abspath(args.filename))
+    simulator = LSLSimulator(parsed_script, inventory=inventory)
     
     # Run the simulator in a separate thread
     sim_thread = threading.Thread(target=simulator.run)
@@ -89,7 +101,7 @@ def main():
             
             # Handle abbreviations and full commands
             if cmd in ['touch', 't']:
-                simulator.event_queue.append(("touch_start", []))
+                simulator.queue_event("touch_start")
             elif cmd in ['say', 's']:
                 if len(cmd_parts) > 1:
                     # s john 1 hi  OR  s john hi
@@ -7,42 +7,46 @@ Complete implementation using proper ANTLR4 parsing
 import re
 from typing import Any, Dict, List, Optional, Union
 from antlr4 import InputStream, CommonTokenStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
 from LSLLexer import LSLLexer
 from LSLParser import LSLParser as GeneratedLSLParser
 from LSLVisitor import LSLVisitor
+from lsl_expression_parser import BINARY_PRECEDENCE, unescape_string
+
+# Bump whenever the shape of the parsed dict changes - keys the on-disk script cache
+PARSER_VERSION = 3
+
+# Parse-tree levels of the binary operator chain, loosest first
+BINARY_CONTEXTS = (
+    GeneratedLSLParser.LogicalOrExpressionContext,
+    GeneratedLSLParser.LogicalAndExpressionContext,
+    GeneratedLSLParser.BitwiseOrExpressionContext,
+    GeneratedLSLParser.BitwiseXorExpressionContext,
+    GeneratedLSLParser.BitwiseAndExpressionContext,
+    GeneratedLSLParser.EqualityExpressionContext,
+    GeneratedLSLParser.RelationalExpressionContext,
+    GeneratedLSLParser.ShiftExpressionContext,
+    GeneratedLSLParser.AdditiveExpressionContext,
+    GeneratedLSLParser.MultiplicativeExpressionContext,
+)
 
 class LSLStatementVisitor(LSLVisitor):
     """Visitor to convert ANTLR parse tree to statement structures"""
     
     def visitIfStatement(self, ctx):
-        """Visit if statement with proper else-if handling"""
+        """Visit if statement; else-if chains arrive as an if nested in the else branch"""
+        statements = ctx.statement()
         result = {
             'type': 'if_statement',
-            'condition': self.visit(ctx.expression(0)),
-            'then_statement': self.visit(ctx.statement(0))
+            'condition': self.visit(ctx.expression()),
+            'then_statement': self.visit(statements[0])
         }
         
-        # Handle else-if chains
-        else_ifs = []
-        stmt_index = 1
-        expr_index = 1
-        
-        # Process each else-if pair
-        while expr_index < len(ctx.expression()) and stmt_index < len(ctx.statement()) - 1:
-            else_if = {
-                'condition': self.visit(ctx.expression(expr_index)),
-                'statement': self.visit(ctx.statement(stmt_index))
-            }
-            else_ifs.append(else_if)
-            expr_index += 1
-            stmt_index += 1
-        
-        if else_ifs:
-            result['else_if_statements'] = else_ifs
-        
         # Handle final else clause
-        if stmt_index < len(ctx.statement()):
-            result['else_statement'] = self.visit(ctx.statement(stmt_index))
+        if len(statements) > 1:
+            result['else_statement'] = self.visit(statements[1])
         
         return result
     
@@ -119,9 +123,234 @@ class LSLStatementVisitor(LSLVisitor):
             result['expression'] = self.visit(ctx.expression())
         return result
     
+    def visitDoWhileStatement(self, ctx):
+        """Visit do-while statement"""
+        return {
+            'type': 'do_while_statement',
+            'statement': self.visit(ctx.statement()),
+            'condition': self.visit(ctx.expression())
+        }
+    
+    def visitStateChangeStatement(self, ctx):
+        """Visit state change statement"""
+        return {'type': 'state_change', 'state': ctx.IDENTIFIER().getText()}
+    
+    def visitJumpStatement(self, ctx):
+        """Visit jump statement"""
+        return {'type': 'jump', 'label': ctx.IDENTIFIER().getText()}
+    
+    def visitLabelStatement(self, ctx):
+        """Visit label statement"""
+        return {'type': 'label', 'name': ctx.IDENTIFIER().getText()}
+    
+    def visitBreakStatement(self, ctx):
+        """Visit break statement"""
+        return {'type': 'break'}
+    
+    def visitContinueStatement(self, ctx):
+        """Visit continue statement"""
+        return {'type': 'continue'}
+    
+    # =========================================================================
+    # Expressions - typed expression nodes instead of getText() strings.
+    # Every node is a dict with a 'type' key, like statements:
+    #   literal     {'value'}
+    #   identifier  {'name'}
+    #   binary      {'op', 'left', 'right'}
+    #   unary       {'op', 'operand'}            (!, ~, -, +)
+    #   postfix     {'op', 'operand'}            (++, --)
+    #   assign      {'op', 'target', 'value'}
+    #   call        {'name', 'args'}
+    #   cast        {'cast_type', 'expression'}
+    #   member      {'object', 'member'}         (v.x, r.s)
+    #   index       {'object', 'index'}
+    #   vector / rotation / list  {'elements'}
+    # =========================================================================
+    
     def visitExpression(self, ctx):
-        """Visit expression - return text representation for now"""
-        return ctx.getText()
+        """Visit expression - returns a typed expression node"""
+        return self.visit(ctx.assignmentExpression())
+    
+    def visitAssignmentExpression(self, ctx):
+        """Visit assignment expression (right associative)"""
+        operands = [self.visit(c) for c in ctx.conditionalExpression()]
+        operators = [op.getText() for op in ctx.assignmentOperator()]
+        node = operands[-1]
+        for target, op in zip(reversed(operands[:-1]), reversed(operators)):
+            node = {'type': 'assign', 'op': op, 'target': target, 'value': node}
+        return node
+    
+    def visitConditionalExpression(self, ctx):
+        """Visit conditional expression"""
+        return self.visit(ctx.logicalOrExpression())
+    
+    def _visit_binary(self, ctx):
+        """Visit a binary chain (or unary expression) as left-associative binary nodes"""
+        stream = []
+        self._operator_stream(ctx, stream)
+        return self._fold(stream)
+    
+    visitLogicalOrExpression = _visit_binary
+    visitLogicalAndExpression = _visit_binary
+    visitBitwiseOrExpression = _visit_binary
+    visitBitwiseXorExpression = _visit_binary
+    visitBitwiseAndExpression = _visit_binary
+    visitEqualityExpression = _visit_binary
+    visitRelationalExpression = _visit_binary
+    visitShiftExpression = _visit_binary
+    visitAdditiveExpression = _visit_binary
+    visitMultiplicativeExpression = _visit_binary
+    visitUnaryExpression = _visit_binary
+    
+    def _operator_stream(self, ctx, stream):
+        """
+        Flatten a binary chain into ('operand', node), ('binary', op), ('prefix', op)
+        and ('cast', type) items. The grammar's cast takes the whole expression
+        after it; LSL's takes only the next operand, so a cast's expression is
+        opened up here and _fold regroups it by precedence.
+        """
+        if isinstance(ctx, BINARY_CONTEXTS):
+            children = list(ctx.getChildren())
+            self._operator_stream(children[0], stream)
+            for i in range(1, len(children), 2):
+                stream.append(('binary', children[i].getText()))
+                self._operator_stream(children[i + 1], stream)
+        elif isinstance(ctx, GeneratedLSLParser.UnaryExpressionContext):
+            if ctx.getChildCount() > 1:
+                stream.append(('prefix', ctx.getChild(0).getText()))
+            self._operator_stream(ctx.postfixExpression(), stream)
+        elif (isinstance(ctx, GeneratedLSLParser.PostfixExpressionContext) and not ctx.postfixOperator()
+                and ctx.primaryExpression().lslType()):
+            primary = ctx.primaryExpression()
+            stream.append(('cast', primary.lslType().getText()))
+            assignment = primary.expression().assignmentExpression()
+            if assignment.assignmentOperator():
+                stream.append(('operand', self.visit(assignment)))
+            else:
+                self._operator_stream(assignment.conditionalExpression(0).logicalOrExpression(), stream)
+        else:
+            stream.append(('operand', self.visit(ctx)))
+    
+    def _fold(self, stream):
+        """Build the expression node for an operator stream, by LSL precedence"""
+        position = 0
+        
+        def unary():
+            nonlocal position
+            kind, value = stream[position]
+            position += 1
+            if kind == 'operand':
+                return value
+            operand = unary()
+            if kind == 'cast':
+                return {'type': 'cast', 'cast_type': value, 'expression': operand}
+            return self._prefix(value, operand)
+        
+        def binary(min_precedence):
+            nonlocal position
+            left = unary()
+            while position < len(stream):
+                op = stream[position][1]
+                precedence = BINARY_PRECEDENCE[op]
+                if precedence < min_precedence:
+                    break
+                position += 1
+                left = {'type': 'binary', 'op': op, 'left': left, 'right': binary(precedence + 1)}
+            return left
+        
+        return binary(0)
+    
+    def _prefix(self, op, operand):
+        """A unary operator applied to a node; negative numeric literals are folded"""
+        if op == '+':
+            return operand
+        if op == '-' and operand['type'] == 'literal' and isinstance(operand['value'], (int, float)):
+            return {'type': 'literal', 'value': -operand['value']}
+        return {'type': 'unary', 'op': op, 'operand': operand}
+    
+    def visitPostfixExpression(self, ctx):
+        """Visit postfix expression: ++/--, member access, indexing and calls"""
+        node = self.visit(ctx.primaryExpression())
+        for op_ctx in ctx.postfixOperator():
+            if op_ctx.INCREMENT() or op_ctx.DECREMENT():
+                node = {'type': 'postfix', 'op': op_ctx.getText(), 'operand': node}
+            elif op_ctx.DOT():
+                node = {'type': 'member', 'object': node, 'member': op_ctx.IDENTIFIER().getText()}
+            elif op_ctx.LBRACKET():
+                node = {'type': 'index', 'object': node, 'index': self.visit(op_ctx.expression())}
+            else:
+                # `name(...)` - the grammar may route calls through postfix instead of functionCall
+                node = {
+                    'type': 'call',
+                    'name': node.get('name', ''),
+                    'args': self._arguments(op_ctx.argumentList())
+                }
+        return node
+    
+    def visitPrimaryExpression(self, ctx):
+        """Visit primary expression"""
+        if ctx.lslType():
+            return {
+                'type': 'cast',
+                'cast_type': ctx.lslType().getText(),
+                'expression': self.visit(ctx.expression())
+            }
+        if ctx.expression():
+            return self.visit(ctx.expression())
+        if ctx.IDENTIFIER():
+            return {'type': 'identifier', 'name': ctx.IDENTIFIER().getText()}
+        return self.visit(ctx.getChild(0))
+    
+    def visitFunctionCall(self, ctx):
+        """Visit function call"""
+        return {
+            'type': 'call',
+            'name': ctx.IDENTIFIER().getText(),
+            'args': self._arguments(ctx.argumentList())
+        }
+    
+    def _arguments(self, arg_list_ctx):
+        """Convert an argument list to expression nodes"""
+        if arg_list_ctx is None:
+            return []
+        return [self.visit(expr) for expr in arg_list_ctx.expression()]
+    
+    def visitLiteral(self, ctx):
+        """Visit literal"""
+        if ctx.INTEGER():
+            text = ctx.getText()
+            value = int(text, 16) if text[:2] in ('0x', '0X') else int(text)
+        elif ctx.FLOAT():
+            value = float(ctx.getText())
+        elif ctx.STRING() or ctx.KEY():
+            value = unescape_string(ctx.getText()[1:-1])
+        elif ctx.TRUE():
+            value = 1
+        elif ctx.FALSE():
+            value = 0
+        elif ctx.NULL_KEY():
+            value = '00000000-0000-0000-0000-000000000000'
+        else:
+            return self.visit(ctx.getChild(0))
+        return {'type': 'literal', 'value': value}
+    
+    def visitVectorLiteral(self, ctx):
+        """Visit vector literal"""
+        return {'type': 'vector', 'elements': [self.visit(e) for e in ctx.expression()]}
+    
+    def visitRotationLiteral(self, ctx):
+        """Visit rotation literal"""
+        return {'type': 'rotation', 'elements': [self.visit(e) for e in ctx.expression()]}
+    
+    def visitListLiteral(self, ctx):
+        """Visit list literal"""
+        return {'type': 'list', 'elements': [self.visit(e) for e in ctx.listElement()]}
+    
+    def visitListElement(self, ctx):
+        """Visit list element"""
+        if ctx.expression():
+            return self.visit(ctx.expression())
+        return self.visit(ctx.listLiteral())
     
     def visitLvalue(self, ctx):
         """Visit lvalue - return text representation"""
@@ -135,13 +364,94 @@ class LSLStatementVisitor(LSLVisitor):
         """Default result for visitor"""
         return None
 
+class LSLScriptVisitor(LSLStatementVisitor):
+    """Visitor to convert a whole-script parse tree to the globals/functions/states dict"""
+    
+    def visitScript(self, ctx):
+        """Visit script root - same output shape as the regex scanner"""
+        script = {"globals": [], "functions": {}, "states": {}}
+        
+        for global_ctx in ctx.globalDeclaration():
+            script["globals"].append(self.visit(global_ctx))
+        
+        for function_ctx in ctx.functionDefinition():
+            name, function = self.visit(function_ctx)
+            script["functions"][name] = function
+        
+        for state_ctx in ctx.stateDefinition():
+            name, events = self.visit(state_ctx)
+            script["states"][name] = events
+        
+        return script
+    
+    def visitGlobalDeclaration(self, ctx):
+        """Visit global declaration - value keeps its source text like the regex scanner"""
+        value = None
+        if ctx.expression():
+            value = self._source_text(ctx.expression()).strip().strip('"')
+        return {
+            "type": ctx.lslType().getText(),
+            "name": ctx.IDENTIFIER().getText(),
+            "value": value
+        }
+    
+    def visitFunctionDefinition(self, ctx):
+        """Visit user-defined function"""
+        return_type = ctx.returnType().getText() if ctx.returnType() else "void"
+        parameters = self._parameters(ctx.parameterList())
+        return ctx.IDENTIFIER().getText(), {
+            "return_type": return_type,
+            "parameters": parameters,
+            "args": parameters,  # Compatibility with old interface
+            "body": self._body(ctx.statement())
+        }
+    
+    def visitStateDefinition(self, ctx):
+        """Visit state definition"""
+        state_name = "default" if ctx.DEFAULT() else ctx.IDENTIFIER().getText()
+        events = {}
+        for handler_ctx in ctx.eventHandler():
+            parameters = self._parameters(handler_ctx.parameterList())
+            events[handler_ctx.eventName().getText()] = {
+                "parameters": parameters,
+                "args": parameters,  # Compatibility with old interface
+                "body": self._body(handler_ctx.statement())
+            }
+        return state_name, events
+    
+    def _parameters(self, param_list_ctx):
+        """Convert a parameter list to [{"type", "name"}]"""
+        if param_list_ctx is None:
+            return []
+        return [
+            {"type": param.lslType().getText(), "name": param.IDENTIFIER().getText()}
+            for param in param_list_ctx.parameter()
+        ]
+    
+    def _body(self, statement_ctxs):
+        """Convert handler/function statements, dropping empty results"""
+        statements = []
+        for stmt_ctx in statement_ctxs:
+            stmt = self.visit(stmt_ctx)
+            if stmt:
+                statements.append(stmt)
+        return statements
+    
+    def _source_text(self, ctx):
+        """Original source text of a rule, whitespace included"""
+        return ctx.start.getInputStream().getText(ctx.start.start, ctx.stop.stop)
+
 class LSLParser:
     """Production LSL Parser with ANTLR4-like architecture"""
     
-    def __init__(self):
+    def __init__(self, single_pass=False):
         self.current_line = 1
         self.errors = []
         
+        # Single-pass mode runs the generated parser once on the `script` rule
+        # instead of regex-scanning and re-lexing every function/event body
+        self.single_pass = single_pass
+        
         # Complete list of LSL events
         self.lsl_events = {
             'state_entry', 'state_exit', 'touch_start', 'touch', 'touch_end',
@@ -209,6 +519,11 @@ class LSLParser:
     
     def parse_script(self, code):
         """Parse LSL code and return dictionary format for compatibility"""
+        if self.single_pass:
+            script = self.parse_script_single_pass(code)
+            if script is not None:
+                return script
+        
         code = self._remove_comments(code)
         
         script = {"globals": [], "functions": {}, "states": {}}
@@ -227,6 +542,42 @@ class LSLParser:
         
         return script
     
+    def parse_script_single_pass(self, code):
+        """
+        Parse the whole script with one lexer/parser run on the `script` rule.
+        Uses fast SLL prediction first and retries with full LL only when SLL
+        bails. Returns None (and records the error) if the script does not
+        match the grammar, so callers can fall back to the regex scanner.
+        """
+        token_stream = CommonTokenStream(LSLLexer(InputStream(code)))
+        parser = GeneratedLSLParser(token_stream)
+        parser.removeErrorListeners()
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser._errHandler = BailErrorStrategy()
+        
+        try:
+            tree = parser.script()
+        except ParseCancellationException:
+            # SLL is not powerful enough for this input - rewind and use full LL
+            token_stream.seek(0)
+            parser.reset()
+            parser._interp.predictionMode = PredictionMode.LL
+            try:
+                tree = parser.script()
+            except ParseCancellationException as e:
+                self.errors.append(f"Single-pass parse failed: {e}")
+                return None
+        
+        # The script rule has no EOF anchor, so make sure everything was consumed
+        if token_stream.LA(1) != GeneratedLSLParser.EOF:
+            offending = token_stream.LT(1)
+            self.errors.append(
+                f"Single-pass parse stopped at line {offending.line}: {offending.text!r}"
+            )
+            return None
+        
+        return LSLScriptVisitor().visit(tree)
+    
     def parse_expression(self, expr_str: str):
         """Parse a single expression - compatible with old parser interface"""
         expr_str = expr_str.strip()
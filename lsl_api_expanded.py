@@ -2,6 +2,13 @@
 """
 LSL API Expanded Implementation - 80% Coverage for Rating 8+
 Comprehensive implementation of 160+ LSL functions across all major categories
+
+The functions are plain functions taking the script's context (an
+LSLAPIExpanded instance, holding its object properties, inventory, sensors,
+listeners and clock) as their first argument. They are registered once, into
+the read-only module table FUNCTIONS, which every instance shares; an
+instance only carries its state, and its `functions` mapping hands out the
+table's entries bound to it.
 """
 
 import math
@@ -10,78 +17,119 @@ import time as time_module
 import uuid
 import json
 import re
+from collections.abc import Mapping
+from types import MappingProxyType, MethodType
 from typing import Any, List, Tuple, Union, Dict
 
+from lsl_log import category
+from lsl_scheduler import WallClock
+
+API_LOG = category("api")
+CHAT_LOG = category("chat")
+
+class ScriptFunctions(Mapping):
+    """The shared function table seen from one script: each lookup is bound to its context"""
+
+    __slots__ = ("context", "table")
+
+    def __init__(self, context, table: Mapping):
+        self.context = context
+        self.table = table
+
+    def __getitem__(self, name: str):
+        return MethodType(self.table[name], self.context)
+
+    def __contains__(self, name) -> bool:
+        return name in self.table
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
 class LSLAPIExpanded:
     """Expanded implementation of LSL API functions for 80% coverage"""
-    
-    def __init__(self):
-        self.functions = {}
+
+    # The process-wide table (FUNCTIONS), set once the class is defined
+    function_table: Mapping = MappingProxyType({})
+
+    def __init__(self, clock=None):
+        # Time functions read this clock, so a virtual clock fast-forwards them too
+        self.clock = clock if clock is not None else WallClock()
+        self.time_origin = self.clock()
         self.object_properties = {}
         self.inventory = {}
         self.sensors = []
+        self.listeners = {}
         self.animations = {}
         self.sounds = {}
-        self._register_all_functions()
-    
-    def _register_all_functions(self):
-        """Register all implemented LSL functions"""
+        self.functions = ScriptFunctions(self, self.function_table)
+
+    @classmethod
+    def _build_function_table(cls) -> Mapping:
+        """Register all implemented LSL functions into a new read-only table"""
+        functions = {}
         # Core functions (already implemented)
-        self._register_math_functions()
-        self._register_string_functions()
-        self._register_list_functions()
-        self._register_vector_functions()
-        self._register_timer_functions()
-        self._register_conversion_functions()
-        self._register_communication_functions()
-        self._register_json_functions()
-        
+        cls._register_math_functions(functions)
+        cls._register_string_functions(functions)
+        cls._register_list_functions(functions)
+        cls._register_vector_functions(functions)
+        cls._register_timer_functions(functions)
+        cls._register_conversion_functions(functions)
+        cls._register_communication_functions(functions)
+        cls._register_json_functions(functions)
+
         # New expanded functions
-        self._register_object_properties()
-        self._register_physics_functions()
-        self._register_sensor_functions()
-        self._register_animation_functions()
-        self._register_sound_functions()
-        self._register_inventory_functions()
-        self._register_http_functions()
-        self._register_collision_functions()
-        self._register_notecard_functions()
-        self._register_media_functions()
-        
+        cls._register_object_properties(functions)
+        cls._register_physics_functions(functions)
+        cls._register_sensor_functions(functions)
+        cls._register_animation_functions(functions)
+        cls._register_sound_functions(functions)
+        cls._register_inventory_functions(functions)
+        cls._register_http_functions(functions)
+        cls._register_collision_functions(functions)
+        cls._register_notecard_functions(functions)
+        cls._register_media_functions(functions)
+
         # NPC.lsl compatibility functions
-        self._register_npc_compatibility_functions()
-    
+        cls._register_npc_compatibility_functions(functions)
+        return MappingProxyType(functions)
+
     def call_function(self, name: str, args: List[Any]) -> Any:
         """Call an LSL function by name"""
-        if name in self.functions:
-            return self.functions[name](*args)
+        function = self.function_table.get(name)
+        if function is not None:
+            return function(self, *args)
         else:
-            print(f"Warning: LSL function {name} not implemented")
+            API_LOG.warning("LSL function %s not implemented", name)
             return None
 
     # =============================================================================
     # CORE FUNCTIONS (Already implemented - keeping existing)
     # =============================================================================
     
-    def _register_math_functions(self):
+    @staticmethod
+    def _register_math_functions(functions):
         """Register math functions (17 functions)"""
-        def llAbs(x): return abs(int(x))
-        def llFabs(x): return abs(float(x))
-        def llCeil(x): return math.ceil(float(x))
-        def llFloor(x): return math.floor(float(x))
-        def llRound(x): return round(float(x))
-        def llSqrt(x): return math.sqrt(float(x))
-        def llPow(x, y): return math.pow(float(x), float(y))
-        def llLog(x): return math.log(float(x))
-        def llLog10(x): return math.log10(float(x))
-        def llSin(x): return math.sin(float(x))
-        def llCos(x): return math.cos(float(x))
-        def llTan(x): return math.tan(float(x))
-        def llAsin(x): return math.asin(float(x))
-        def llAcos(x): return math.acos(float(x))
-        def llAtan2(y, x): return math.atan2(float(y), float(x))
-        def llFrand(x): return random.uniform(0.0, float(x))
-        def llModPow(a, b, c): return pow(int(a), int(b), int(c))
+        def llAbs(ctx, x): return abs(int(x))
+        def llFabs(ctx, x): return abs(float(x))
+        def llCeil(ctx, x): return math.ceil(float(x))
+        def llFloor(ctx, x): return math.floor(float(x))
+        def llRound(ctx, x): return round(float(x))
+        def llSqrt(ctx, x): return math.sqrt(float(x))
+        def llPow(ctx, x, y): return math.pow(float(x), float(y))
+        def llLog(ctx, x): return math.log(float(x))
+        def llLog10(ctx, x): return math.log10(float(x))
+        def llSin(ctx, x): return math.sin(float(x))
+        def llCos(ctx, x): return math.cos(float(x))
+        def llTan(ctx, x): return math.tan(float(x))
+        def llAsin(ctx, x): return math.asin(float(x))
+        def llAcos(ctx, x): return math.acos(float(x))
+        def llAtan2(ctx, y, x): return math.atan2(float(y), float(x))
+        def llFrand(ctx, x): return random.uniform(0.0, float(x))
+        def llModPow(ctx, a, b, c): return pow(int(a), int(b), int(c))
         
         math_funcs = {
             'llAbs': llAbs, 'llFabs': llFabs, 'llCeil': llCeil, 'llFloor': llFloor,
@@ -90,52 +138,53 @@ class LSLAPIExpanded:
             'llAsin': llAsin, 'llAcos': llAcos, 'llAtan2': llAtan2, 'llFrand': llFrand,
             'llModPow': llModPow
         }
-        self.functions.update(math_funcs)
+        functions.update(math_funcs)
 
-    def _register_string_functions(self):
+    @staticmethod
+    def _register_string_functions(functions):
         """Register string functions (17 functions)"""
-        def llStringLength(s): return len(str(s))
-        def llGetSubString(s, start, end):
+        def llStringLength(ctx, s): return len(str(s))
+        def llGetSubString(ctx, s, start, end):
             s = str(s)
             start, end = int(start), int(end)
             if end == -1: end = len(s)
             return s[start:end+1]
-        def llSubStringIndex(s, substr):
+        def llSubStringIndex(ctx, s, substr):
             try: return str(s).index(str(substr))
             except ValueError: return -1
-        def llStringTrim(s, trim_type):
+        def llStringTrim(ctx, s, trim_type):
             s = str(s)
             trim_type = int(trim_type)
             if trim_type == 1: return s.lstrip()  # LSL: 1=left trim
             elif trim_type == 2: return s.rstrip()  # LSL: 2=right trim
             elif trim_type == 3: return s.strip()   # LSL: 3=both
             else: return s  # Invalid type, return unchanged
-        def llToUpper(s): return str(s).upper()
-        def llToLower(s): return str(s).lower()
-        def llInsertString(s, pos, insert):
+        def llToUpper(ctx, s): return str(s).upper()
+        def llToLower(ctx, s): return str(s).lower()
+        def llInsertString(ctx, s, pos, insert):
             s = str(s)
             pos = int(pos)
             insert = str(insert)
             return s[:pos] + insert + s[pos:]
-        def llDeleteSubString(s, start, end):
+        def llDeleteSubString(ctx, s, start, end):
             s = str(s)
             start, end = int(start), int(end)
             if end == -1: end = len(s) - 1
             return s[:start] + s[end+1:]
-        def llStringToBase64(s):
+        def llStringToBase64(ctx, s):
             import base64
             return base64.b64encode(str(s).encode('utf-8')).decode('ascii')
-        def llBase64ToString(s):
+        def llBase64ToString(ctx, s):
             import base64
             try: return base64.b64decode(str(s)).decode('utf-8')
             except: return ""
-        def llEscapeURL(url):
+        def llEscapeURL(ctx, url):
             import urllib.parse
             return urllib.parse.quote(str(url))
-        def llUnescapeURL(url):
+        def llUnescapeURL(ctx, url):
             import urllib.parse
             return urllib.parse.unquote(str(url))
-        def llParseString2List(s, separators, spacers):
+        def llParseString2List(ctx, s, separators, spacers):
             s = str(s)
             if not separators: return [s]
             result = [s]
@@ -145,15 +194,15 @@ class LSLAPIExpanded:
                     new_result.extend(item.split(str(sep)))
                 result = new_result
             return [item for item in result if item]
-        def llDumpList2String(lst, separator):
+        def llDumpList2String(ctx, lst, separator):
             separator = str(separator)
             return separator.join(str(item) for item in lst)
-        def llCSV2List(csv):
+        def llCSV2List(ctx, csv):
             csv = str(csv)
             return [item.strip() for item in csv.split(',')]
-        def llList2CSV(lst):
+        def llList2CSV(ctx, lst):
             return ', '.join(str(item) for item in lst)
-        def llXorBase64(s1, s2):
+        def llXorBase64(ctx, s1, s2):
             import base64
             try:
                 b1 = base64.b64decode(str(s1))
@@ -172,35 +221,36 @@ class LSLAPIExpanded:
             'llParseString2List': llParseString2List, 'llDumpList2String': llDumpList2String,
             'llCSV2List': llCSV2List, 'llList2CSV': llList2CSV, 'llXorBase64': llXorBase64
         }
-        self.functions.update(string_funcs)
+        functions.update(string_funcs)
 
-    def _register_list_functions(self):
+    @staticmethod
+    def _register_list_functions(functions):
         """Register list functions (15 functions)"""
-        def llGetListLength(lst): return len(lst) if isinstance(lst, list) else 0
-        def llList2String(lst): return ', '.join(str(item) for item in lst) if isinstance(lst, list) else str(lst)  # LSL quirk: comma-space separator
-        def llDeleteSubList(lst, start, end):
+        def llGetListLength(ctx, lst): return len(lst) if isinstance(lst, list) else 0
+        def llList2String(ctx, lst): return ', '.join(str(item) for item in lst) if isinstance(lst, list) else str(lst)  # LSL quirk: comma-space separator
+        def llDeleteSubList(ctx, lst, start, end):
             if not isinstance(lst, list): return []
             start, end = int(start), int(end)
             if end == -1: end = len(lst) - 1
             return lst[:start] + lst[end+1:]
-        def llInsertList(dest, src, pos):
+        def llInsertList(ctx, dest, src, pos):
             if not isinstance(dest, list): dest = []
             if not isinstance(src, list): src = [src]
             pos = int(pos)
             return dest[:pos] + src + dest[pos:]
-        def llListReplaceList(dest, src, start, end):
+        def llListReplaceList(ctx, dest, src, start, end):
             if not isinstance(dest, list): dest = []
             if not isinstance(src, list): src = [src]
             start, end = int(start), int(end)
             if end == -1: end = len(dest) - 1
             return dest[:start] + src + dest[end+1:]
-        def llListFindList(src, test):
+        def llListFindList(ctx, src, test):
             if not isinstance(src, list) or not isinstance(test, list): return -1
             test_len = len(test)
             for i in range(len(src) - test_len + 1):
                 if src[i:i+test_len] == test: return i
             return -1
-        def llGetListEntryType(lst, index):
+        def llGetListEntryType(ctx, lst, index):
             if not isinstance(lst, list) or index >= len(lst): return 0
             item = lst[int(index)]
             if isinstance(item, int): return 1
@@ -209,28 +259,28 @@ class LSLAPIExpanded:
             elif isinstance(item, tuple) and len(item) == 3: return 5
             elif isinstance(item, tuple) and len(item) == 4: return 6
             else: return 0
-        def llList2Integer(lst, index):
+        def llList2Integer(ctx, lst, index):
             if not isinstance(lst, list) or index >= len(lst): return 0
             try: return int(lst[int(index)])
             except: return 0
-        def llList2Float(lst, index):
+        def llList2Float(ctx, lst, index):
             if not isinstance(lst, list) or index >= len(lst): return 0.0
             try: return float(lst[int(index)])
             except: return 0.0
-        def llList2Key(lst, index):
+        def llList2Key(ctx, lst, index):
             if not isinstance(lst, list) or index >= len(lst): return "00000000-0000-0000-0000-000000000000"
             return str(lst[int(index)])
-        def llList2Vector(lst, index):
+        def llList2Vector(ctx, lst, index):
             if not isinstance(lst, list) or index >= len(lst): return (0.0, 0.0, 0.0)
             item = lst[int(index)]
             if isinstance(item, tuple) and len(item) == 3: return item
             return (0.0, 0.0, 0.0)
-        def llList2Rot(lst, index):
+        def llList2Rot(ctx, lst, index):
             if not isinstance(lst, list) or index >= len(lst): return (0.0, 0.0, 0.0, 1.0)
             item = lst[int(index)]
             if isinstance(item, tuple) and len(item) == 4: return item
             return (0.0, 0.0, 0.0, 1.0)
-        def llListSort(lst, stride, ascending):
+        def llListSort(ctx, lst, stride, ascending):
             if not isinstance(lst, list): return []
             stride = int(stride)
             ascending = bool(ascending)
@@ -242,7 +292,7 @@ class LSLAPIExpanded:
             result = []
             for group in groups: result.extend(group)
             return result
-        def llListRandomize(lst, stride):
+        def llListRandomize(ctx, lst, stride):
             if not isinstance(lst, list): return []
             stride = int(stride)
             if stride <= 1:
@@ -256,7 +306,7 @@ class LSLAPIExpanded:
             result = []
             for group in groups: result.extend(group)
             return result
-        def llList2ListStrided(src, start, end, stride):
+        def llList2ListStrided(ctx, src, start, end, stride):
             if not isinstance(src, list): return []
             start, end, stride = int(start), int(end), int(stride)
             if end == -1: end = len(src) - 1
@@ -275,22 +325,23 @@ class LSLAPIExpanded:
             'llListSort': llListSort, 'llListRandomize': llListRandomize,
             'llList2ListStrided': llList2ListStrided
         }
-        self.functions.update(list_funcs)
+        functions.update(list_funcs)
 
-    def _register_vector_functions(self):
+    @staticmethod
+    def _register_vector_functions(functions):
         """Register vector functions (12 functions)"""
-        def llVecMag(vec):
+        def llVecMag(ctx, vec):
             if isinstance(vec, tuple) and len(vec) == 3:
                 x, y, z = vec
                 return math.sqrt(x*x + y*y + z*z)
             return 0.0
-        def llVecNorm(vec):
+        def llVecNorm(ctx, vec):
             if isinstance(vec, tuple) and len(vec) == 3:
                 x, y, z = vec
                 mag = math.sqrt(x*x + y*y + z*z)
                 if mag > 0: return (x/mag, y/mag, z/mag)
             return (0.0, 0.0, 0.0)
-        def llVecDist(vec1, vec2):
+        def llVecDist(ctx, vec1, vec2):
             if (isinstance(vec1, tuple) and len(vec1) == 3 and 
                 isinstance(vec2, tuple) and len(vec2) == 3):
                 dx = vec1[0] - vec2[0]
@@ -298,7 +349,7 @@ class LSLAPIExpanded:
                 dz = vec1[2] - vec2[2]
                 return math.sqrt(dx*dx + dy*dy + dz*dz)
             return 0.0
-        def llRot2Euler(rot):
+        def llRot2Euler(ctx, rot):
             if isinstance(rot, tuple) and len(rot) == 4:
                 x, y, z, s = rot
                 test = x*y + z*s
@@ -319,7 +370,7 @@ class LSLAPIExpanded:
                     roll = math.atan2(2*x*s - 2*y*z, 1 - 2*sqx - 2*sqz)
                 return (roll, pitch, yaw)
             return (0.0, 0.0, 0.0)
-        def llEuler2Rot(euler):
+        def llEuler2Rot(ctx, euler):
             if isinstance(euler, tuple) and len(euler) == 3:
                 roll, pitch, yaw = euler
                 cr = math.cos(roll * 0.5)
@@ -334,7 +385,7 @@ class LSLAPIExpanded:
                 s = cr * cp * cy + sr * sp * sy
                 return (x, y, z, s)
             return (0.0, 0.0, 0.0, 1.0)
-        def llRot2Fwd(rot):
+        def llRot2Fwd(ctx, rot):
             if isinstance(rot, tuple) and len(rot) == 4:
                 x, y, z, s = rot
                 fwd_x = 1 - 2 * (y*y + z*z)
@@ -342,7 +393,7 @@ class LSLAPIExpanded:
                 fwd_z = 2 * (x*z - y*s)
                 return (fwd_x, fwd_y, fwd_z)
             return (1.0, 0.0, 0.0)
-        def llRot2Left(rot):
+        def llRot2Left(ctx, rot):
             if isinstance(rot, tuple) and len(rot) == 4:
                 x, y, z, s = rot
                 left_x = 2 * (x*y - z*s)
@@ -350,7 +401,7 @@ class LSLAPIExpanded:
                 left_z = 2 * (y*z + x*s)
                 return (left_x, left_y, left_z)
             return (0.0, 1.0, 0.0)
-        def llRot2Up(rot):
+        def llRot2Up(ctx, rot):
             if isinstance(rot, tuple) and len(rot) == 4:
                 x, y, z, s = rot
                 up_x = 2 * (x*z + y*s)
@@ -358,7 +409,7 @@ class LSLAPIExpanded:
                 up_z = 1 - 2 * (x*x + y*y)
                 return (up_x, up_y, up_z)
             return (0.0, 0.0, 1.0)
-        def llAxisAngle2Rot(axis, angle):
+        def llAxisAngle2Rot(ctx, axis, angle):
             if isinstance(axis, tuple) and len(axis) == 3:
                 x, y, z = axis
                 angle = float(angle)
@@ -369,22 +420,22 @@ class LSLAPIExpanded:
                 cos_half = math.cos(half_angle)
                 return (x * sin_half, y * sin_half, z * sin_half, cos_half)
             return (0.0, 0.0, 0.0, 1.0)
-        def llRot2Axis(rot):
+        def llRot2Axis(ctx, rot):
             if isinstance(rot, tuple) and len(rot) == 4:
                 x, y, z, s = rot
                 scale = math.sqrt(x*x + y*y + z*z)
                 if scale > 0: return (x/scale, y/scale, z/scale)
             return (0.0, 0.0, 1.0)
-        def llRot2Angle(rot):
+        def llRot2Angle(ctx, rot):
             if isinstance(rot, tuple) and len(rot) == 4:
                 x, y, z, s = rot
                 return 2.0 * math.acos(abs(s))
             return 0.0
-        def llRotBetween(vec1, vec2):
+        def llRotBetween(ctx, vec1, vec2):
             if (isinstance(vec1, tuple) and len(vec1) == 3 and
                 isinstance(vec2, tuple) and len(vec2) == 3):
-                v1 = llVecNorm(vec1)
-                v2 = llVecNorm(vec2)
+                v1 = llVecNorm(ctx, vec1)
+                v2 = llVecNorm(ctx, vec2)
                 cross_x = v1[1] * v2[2] - v1[2] * v2[1]
                 cross_y = v1[2] * v2[0] - v1[0] * v2[2]
                 cross_z = v1[0] * v2[1] - v1[1] * v2[0]
@@ -393,9 +444,9 @@ class LSLAPIExpanded:
                 elif dot < -0.99999:
                     if abs(v1[0]) < 0.1: axis = (1.0, 0.0, 0.0)
                     else: axis = (0.0, 1.0, 0.0)
-                    return llAxisAngle2Rot(axis, math.pi)
+                    return llAxisAngle2Rot(ctx, axis, math.pi)
                 angle = math.acos(dot)
-                return llAxisAngle2Rot((cross_x, cross_y, cross_z), angle)
+                return llAxisAngle2Rot(ctx, (cross_x, cross_y, cross_z), angle)
             return (0.0, 0.0, 0.0, 1.0)
 
         vector_funcs = {
@@ -405,21 +456,30 @@ class LSLAPIExpanded:
             'llAxisAngle2Rot': llAxisAngle2Rot, 'llRot2Axis': llRot2Axis,
             'llRot2Angle': llRot2Angle, 'llRotBetween': llRotBetween
         }
-        self.functions.update(vector_funcs)
+        functions.update(vector_funcs)
 
-    def _register_timer_functions(self):
+    @staticmethod
+    def _register_timer_functions(functions):
         """Register timer functions (7 functions)"""
-        def llGetUnixTime(): return int(time_module.time())
-        def llGetTimestamp(): return time_module.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time_module.gmtime())
-        def llGetGMTclock():
-            now = time_module.gmtime()
+        def llGetUnixTime(ctx): return int(ctx.clock.unix_time())
+        def llGetTimestamp(ctx):
+            now = ctx.clock.unix_time()
+            micros = int((now % 1) * 1000000)
+            return time_module.strftime("%Y-%m-%dT%H:%M:%S", time_module.gmtime(now)) + ".%06dZ" % micros
+        def llGetGMTclock(ctx):
+            now = time_module.gmtime(ctx.clock.unix_time())
             return now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
-        def llSetTimerEvent(sec):
-            print(f"Timer set for {sec} seconds")
+        def llSetTimerEvent(ctx, sec):
+            if API_LOG.info_on:
+                API_LOG.info("Timer set for %s seconds", sec)
             return None
-        def llGetTime(): return 0.0
-        def llResetTime(): return None
-        def llGetAndResetTime(): return 0.0
+        def llGetTime(ctx): return float(ctx.clock() - ctx.time_origin)
+        def llResetTime(ctx):
+            ctx.time_origin = ctx.clock()
+        def llGetAndResetTime(ctx):
+            elapsed = llGetTime(ctx)
+            llResetTime(ctx)
+            return elapsed
 
         timer_funcs = {
             'llGetUnixTime': llGetUnixTime, 'llGetTimestamp': llGetTimestamp,
@@ -427,11 +487,12 @@ class LSLAPIExpanded:
             'llGetTime': llGetTime, 'llResetTime': llResetTime,
             'llGetAndResetTime': llGetAndResetTime
         }
-        self.functions.update(timer_funcs)
+        functions.update(timer_funcs)
 
-    def _register_conversion_functions(self):
+    @staticmethod
+    def _register_conversion_functions(functions):
         """Register conversion functions (2 functions)"""
-        def llList2Json(type_flag, lst):
+        def llList2Json(ctx, type_flag, lst):
             type_flag = int(type_flag)
             if type_flag == 0: return json.dumps(lst)
             elif type_flag == 1:
@@ -443,7 +504,7 @@ class LSLAPIExpanded:
                     obj[key] = value
                 return json.dumps(obj)
             else: return "null"
-        def llJson2List(json_str):
+        def llJson2List(ctx, json_str):
             try:
                 data = json.loads(str(json_str))
                 if isinstance(data, list): return data
@@ -456,44 +517,51 @@ class LSLAPIExpanded:
             except: return []
 
         conversion_funcs = {'llList2Json': llList2Json, 'llJson2List': llJson2List}
-        self.functions.update(conversion_funcs)
+        functions.update(conversion_funcs)
 
-    def _register_communication_functions(self):
+    @staticmethod
+    def _register_communication_functions(functions):
         """Register communication functions (5 functions)"""
-        def llSay(channel, message):
+        def llSay(ctx, channel, message):
             channel = int(channel)
             message = str(message)
-            print(f"[Channel {channel}] {message}")
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("[Channel %s] %s", channel, message)
             return None
-        def llOwnerSay(message):
+        def llOwnerSay(ctx, message):
             message = str(message)
-            print(f"[Owner] {message}")
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("[Owner] %s", message)
             return None
-        def llShout(channel, message):
+        def llShout(ctx, channel, message):
             channel = int(channel)
             message = str(message)
-            print(f"[SHOUT Channel {channel}] {message}")
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("[SHOUT Channel %s] %s", channel, message)
             return None
-        def llWhisper(channel, message):
+        def llWhisper(ctx, channel, message):
             channel = int(channel)
             message = str(message)
-            print(f"[whisper channel {channel}] {message}")
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("[whisper channel %s] %s", channel, message)
             return None
-        def llRegionSay(channel, message):
+        def llRegionSay(ctx, channel, message):
             channel = int(channel)
             message = str(message)
-            print(f"[Region Channel {channel}] {message}")
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("[Region Channel %s] %s", channel, message)
             return None
 
         comm_funcs = {
             'llSay': llSay, 'llOwnerSay': llOwnerSay, 'llShout': llShout,
             'llWhisper': llWhisper, 'llRegionSay': llRegionSay
         }
-        self.functions.update(comm_funcs)
+        functions.update(comm_funcs)
 
-    def _register_json_functions(self):
+    @staticmethod
+    def _register_json_functions(functions):
         """Register JSON functions (3 functions)"""
-        def llJsonGetValue(json_str, specifiers):
+        def llJsonGetValue(ctx, json_str, specifiers):
             try:
                 data = json.loads(str(json_str))
                 current = data
@@ -511,7 +579,7 @@ class LSLAPIExpanded:
                     if current is None: return ""
                 return str(current) if current is not None else ""
             except: return ""
-        def llJsonSetValue(json_str, specifiers, value):
+        def llJsonSetValue(ctx, json_str, specifiers, value):
             try:
                 data = json.loads(str(json_str))
                 current = data
@@ -537,7 +605,7 @@ class LSLAPIExpanded:
                     current[index] = value
                 return json.dumps(data)
             except: return str(json_str)
-        def llJsonValueType(json_str, specifiers):
+        def llJsonValueType(ctx, json_str, specifiers):
             try:
                 data = json.loads(str(json_str))
                 current = data
@@ -565,60 +633,70 @@ class LSLAPIExpanded:
             'llJsonGetValue': llJsonGetValue, 'llJsonSetValue': llJsonSetValue,
             'llJsonValueType': llJsonValueType
         }
-        self.functions.update(json_funcs)
+        functions.update(json_funcs)
 
     # =============================================================================
     # NEW EXPANDED FUNCTIONS FOR 80% COVERAGE
     # =============================================================================
 
-    def _register_object_properties(self):
+    @staticmethod
+    def _register_object_properties(functions):
         """Register object property functions (22 functions)"""
-        def llGetPos(): return self.object_properties.get('position', (0.0, 0.0, 0.0))
-        def llSetPos(pos):
-            self.object_properties['position'] = pos
-            print(f"Position set to {pos}")
-        def llGetLocalPos(): return self.object_properties.get('local_position', (0.0, 0.0, 0.0))
-        def llSetLocalPos(pos):
-            self.object_properties['local_position'] = pos
-            print(f"Local position set to {pos}")
-        def llGetRot(): return self.object_properties.get('rotation', (0.0, 0.0, 0.0, 1.0))
-        def llSetRot(rot):
-            self.object_properties['rotation'] = rot
-            print(f"Rotation set to {rot}")
-        def llGetLocalRot(): return self.object_properties.get('local_rotation', (0.0, 0.0, 0.0, 1.0))
-        def llSetLocalRot(rot):
-            self.object_properties['local_rotation'] = rot
-            print(f"Local rotation set to {rot}")
-        def llGetVel(): return self.object_properties.get('velocity', (0.0, 0.0, 0.0))
-        def llGetAccel(): return self.object_properties.get('acceleration', (0.0, 0.0, 0.0))
-        def llGetOmega(): return self.object_properties.get('angular_velocity', (0.0, 0.0, 0.0))
-        def llGetMass(): return self.object_properties.get('mass', 1.0)
-        def llGetScale(): return self.object_properties.get('scale', (1.0, 1.0, 1.0))
-        def llSetScale(scale):
-            self.object_properties['scale'] = scale
-            print(f"Scale set to {scale}")
-        def llGetColor(face): return self.object_properties.get(f'color_{face}', (1.0, 1.0, 1.0))
-        def llSetColor(color, face):
-            self.object_properties[f'color_{face}'] = color
-            print(f"Color face {face} set to {color}")
-        def llGetAlpha(face): return self.object_properties.get(f'alpha_{face}', 1.0)
-        def llSetAlpha(alpha, face):
-            self.object_properties[f'alpha_{face}'] = alpha
-            print(f"Alpha face {face} set to {alpha}")
-        def llGetTexture(face): return self.object_properties.get(f'texture_{face}', "")
-        def llSetTexture(texture, face):
-            self.object_properties[f'texture_{face}'] = texture
-            print(f"Texture face {face} set to {texture}")
-        def llSetText(text, color, alpha):
-            self.object_properties['text'] = text
-            self.object_properties['text_color'] = color
-            self.object_properties['text_alpha'] = alpha
-            print(f"Text set: {text}")
-        def llGetText():
+        def llGetPos(ctx): return ctx.object_properties.get('position', (0.0, 0.0, 0.0))
+        def llSetPos(ctx, pos):
+            ctx.object_properties['position'] = pos
+            if API_LOG.info_on:
+                API_LOG.info("Position set to %s", pos)
+        def llGetLocalPos(ctx): return ctx.object_properties.get('local_position', (0.0, 0.0, 0.0))
+        def llSetLocalPos(ctx, pos):
+            ctx.object_properties['local_position'] = pos
+            if API_LOG.info_on:
+                API_LOG.info("Local position set to %s", pos)
+        def llGetRot(ctx): return ctx.object_properties.get('rotation', (0.0, 0.0, 0.0, 1.0))
+        def llSetRot(ctx, rot):
+            ctx.object_properties['rotation'] = rot
+            if API_LOG.info_on:
+                API_LOG.info("Rotation set to %s", rot)
+        def llGetLocalRot(ctx): return ctx.object_properties.get('local_rotation', (0.0, 0.0, 0.0, 1.0))
+        def llSetLocalRot(ctx, rot):
+            ctx.object_properties['local_rotation'] = rot
+            if API_LOG.info_on:
+                API_LOG.info("Local rotation set to %s", rot)
+        def llGetVel(ctx): return ctx.object_properties.get('velocity', (0.0, 0.0, 0.0))
+        def llGetAccel(ctx): return ctx.object_properties.get('acceleration', (0.0, 0.0, 0.0))
+        def llGetOmega(ctx): return ctx.object_properties.get('angular_velocity', (0.0, 0.0, 0.0))
+        def llGetMass(ctx): return ctx.object_properties.get('mass', 1.0)
+        def llGetScale(ctx): return ctx.object_properties.get('scale', (1.0, 1.0, 1.0))
+        def llSetScale(ctx, scale):
+            ctx.object_properties['scale'] = scale
+            if API_LOG.info_on:
+                API_LOG.info("Scale set to %s", scale)
+        def llGetColor(ctx, face): return ctx.object_properties.get(f'color_{face}', (1.0, 1.0, 1.0))
+        def llSetColor(ctx, color, face):
+            ctx.object_properties[f'color_{face}'] = color
+            if API_LOG.info_on:
+                API_LOG.info("Color face %s set to %s", face, color)
+        def llGetAlpha(ctx, face): return ctx.object_properties.get(f'alpha_{face}', 1.0)
+        def llSetAlpha(ctx, alpha, face):
+            ctx.object_properties[f'alpha_{face}'] = alpha
+            if API_LOG.info_on:
+                API_LOG.info("Alpha face %s set to %s", face, alpha)
+        def llGetTexture(ctx, face): return ctx.object_properties.get(f'texture_{face}', "")
+        def llSetTexture(ctx, texture, face):
+            ctx.object_properties[f'texture_{face}'] = texture
+            if API_LOG.info_on:
+                API_LOG.info("Texture face %s set to %s", face, texture)
+        def llSetText(ctx, text, color, alpha):
+            ctx.object_properties['text'] = text
+            ctx.object_properties['text_color'] = color
+            ctx.object_properties['text_alpha'] = alpha
+            if API_LOG.info_on:
+                API_LOG.info("Text set: %s", text)
+        def llGetText(ctx):
             return (
-                self.object_properties.get('text', ''),
-                self.object_properties.get('text_color', (1.0, 1.0, 1.0)),
-                self.object_properties.get('text_alpha', 1.0)
+                ctx.object_properties.get('text', ''),
+                ctx.object_properties.get('text_color', (1.0, 1.0, 1.0)),
+                ctx.object_properties.get('text_alpha', 1.0)
             )
 
         object_funcs = {
@@ -631,48 +709,62 @@ class LSLAPIExpanded:
             'llSetAlpha': llSetAlpha, 'llGetTexture': llGetTexture, 'llSetTexture': llSetTexture,
             'llSetText': llSetText, 'llGetText': llGetText
         }
-        self.functions.update(object_funcs)
+        functions.update(object_funcs)
 
-    def _register_physics_functions(self):
+    @staticmethod
+    def _register_physics_functions(functions):
         """Register physics functions (16 functions)"""
-        def llSetStatus(status, value):
-            print(f"Status {status} set to {value}")
-        def llGetStatus(status):
-            return self.object_properties.get(f'status_{status}', 0)
-        def llSetForce(force, local):
-            self.object_properties['force'] = force
-            print(f"Force set to {force} (local: {local})")
-        def llGetForce(): return self.object_properties.get('force', (0.0, 0.0, 0.0))
-        def llSetTorque(torque, local):
-            self.object_properties['torque'] = torque
-            print(f"Torque set to {torque} (local: {local})")
-        def llGetTorque(): return self.object_properties.get('torque', (0.0, 0.0, 0.0))
-        def llSetForceAndTorque(force, torque, local):
-            self.object_properties['force'] = force
-            self.object_properties['torque'] = torque
-            print(f"Force and torque set (local: {local})")
-        def llPushObject(target, impulse, ang_impulse, local):
-            print(f"Push object {target} with impulse {impulse}")
-        def llApplyImpulse(impulse, local):
-            print(f"Apply impulse {impulse} (local: {local})")
-        def llApplyRotationalImpulse(impulse, local):
-            print(f"Apply rotational impulse {impulse} (local: {local})")
-        def llMoveToTarget(target, tau):
-            self.object_properties['move_target'] = target
-            print(f"Move to target {target} with tau {tau}")
-        def llStopMoveToTarget():
-            self.object_properties.pop('move_target', None)
-            print("Stop move to target")
-        def llRotLookAt(target, strength, damping):
-            print(f"Look at {target} with strength {strength}")
-        def llStopLookAt():
-            print("Stop look at")
-        def llSetHoverHeight(height, water, tau):
-            self.object_properties['hover_height'] = height
-            print(f"Hover height set to {height}")
-        def llStopHover():
-            self.object_properties.pop('hover_height', None)
-            print("Stop hover")
+        def llSetStatus(ctx, status, value):
+            if API_LOG.info_on:
+                API_LOG.info("Status %s set to %s", status, value)
+        def llGetStatus(ctx, status):
+            return ctx.object_properties.get(f'status_{status}', 0)
+        def llSetForce(ctx, force, local):
+            ctx.object_properties['force'] = force
+            if API_LOG.info_on:
+                API_LOG.info("Force set to %s (local: %s)", force, local)
+        def llGetForce(ctx): return ctx.object_properties.get('force', (0.0, 0.0, 0.0))
+        def llSetTorque(ctx, torque, local):
+            ctx.object_properties['torque'] = torque
+            if API_LOG.info_on:
+                API_LOG.info("Torque set to %s (local: %s)", torque, local)
+        def llGetTorque(ctx): return ctx.object_properties.get('torque', (0.0, 0.0, 0.0))
+        def llSetForceAndTorque(ctx, force, torque, local):
+            ctx.object_properties['force'] = force
+            ctx.object_properties['torque'] = torque
+            if API_LOG.info_on:
+                API_LOG.info("Force and torque set (local: %s)", local)
+        def llPushObject(ctx, target, impulse, ang_impulse, local):
+            if API_LOG.info_on:
+                API_LOG.info("Push object %s with impulse %s", target, impulse)
+        def llApplyImpulse(ctx, impulse, local):
+            if API_LOG.info_on:
+                API_LOG.info("Apply impulse %s (local: %s)", impulse, local)
+        def llApplyRotationalImpulse(ctx, impulse, local):
+            if API_LOG.info_on:
+                API_LOG.info("Apply rotational impulse %s (local: %s)", impulse, local)
+        def llMoveToTarget(ctx, target, tau):
+            ctx.object_properties['move_target'] = target
+            if API_LOG.info_on:
+                API_LOG.info("Move to target %s with tau %s", target, tau)
+        def llStopMoveToTarget(ctx):
+            ctx.object_properties.pop('move_target', None)
+            if API_LOG.info_on:
+                API_LOG.info("Stop move to target")
+        def llRotLookAt(ctx, target, strength, damping):
+            if API_LOG.info_on:
+                API_LOG.info("Look at %s with strength %s", target, strength)
+        def llStopLookAt(ctx):
+            if API_LOG.info_on:
+                API_LOG.info("Stop look at")
+        def llSetHoverHeight(ctx, height, water, tau):
+            ctx.object_properties['hover_height'] = height
+            if API_LOG.info_on:
+                API_LOG.info("Hover height set to %s", height)
+        def llStopHover(ctx):
+            ctx.object_properties.pop('hover_height', None)
+            if API_LOG.info_on:
+                API_LOG.info("Stop hover")
 
         physics_funcs = {
             'llSetStatus': llSetStatus, 'llGetStatus': llGetStatus,
@@ -684,55 +776,56 @@ class LSLAPIExpanded:
             'llRotLookAt': llRotLookAt, 'llStopLookAt': llStopLookAt,
             'llSetHoverHeight': llSetHoverHeight, 'llStopHover': llStopHover
         }
-        self.functions.update(physics_funcs)
+        functions.update(physics_funcs)
 
-    def _register_sensor_functions(self):
+    @staticmethod
+    def _register_sensor_functions(functions):
         """Register sensor functions (19 functions)"""
-        def llDetectedName(number):
-            if 0 <= number < len(self.sensors):
+        def llDetectedName(ctx, number):
+            if 0 <= number < len(ctx.sensors):
                 return f"Avatar_{number}"  # Simulate detected name
             return ""
-        def llDetectedKey(number):
-            if 0 <= number < len(self.sensors):
+        def llDetectedKey(ctx, number):
+            if 0 <= number < len(ctx.sensors):
                 return str(uuid.uuid4())  # Simulate detected key
             return "00000000-0000-0000-0000-000000000000"
-        def llDetectedOwner(number):
-            if 0 <= number < len(self.sensors):
+        def llDetectedOwner(ctx, number):
+            if 0 <= number < len(ctx.sensors):
                 return str(uuid.uuid4())  # Simulate owner
             return "00000000-0000-0000-0000-000000000000"
-        def llDetectedType(number):
-            if 0 <= number < len(self.sensors):
+        def llDetectedType(ctx, number):
+            if 0 <= number < len(ctx.sensors):
                 return 1  # AGENT
             return 0
-        def llDetectedPos(number):
-            if 0 <= number < len(self.sensors):
-                return self.sensors[number]['pos']
+        def llDetectedPos(ctx, number):
+            if 0 <= number < len(ctx.sensors):
+                return ctx.sensors[number]['pos']
             return (0.0, 0.0, 0.0)
-        def llDetectedVel(number):
-            if 0 <= number < len(self.sensors):
+        def llDetectedVel(ctx, number):
+            if 0 <= number < len(ctx.sensors):
                 return (0.0, 0.0, 0.0)  # Simulate velocity
             return (0.0, 0.0, 0.0)
-        def llDetectedGrab(number):
+        def llDetectedGrab(ctx, number):
             return (0.0, 0.0, 0.0)
-        def llDetectedRot(number):
-            if 0 <= number < len(self.sensors):
+        def llDetectedRot(ctx, number):
+            if 0 <= number < len(ctx.sensors):
                 return (0.0, 0.0, 0.0, 1.0)  # Simulate rotation
             return (0.0, 0.0, 0.0, 1.0)
-        def llDetectedGroup(number):
-            return str(uuid.uuid4()) if 0 <= number < len(self.sensors) else "00000000-0000-0000-0000-000000000000"
-        def llDetectedLinkNumber(number):
-            return 1 if 0 <= number < len(self.sensors) else 0
-        def llDetectedTouchFace(number):
-            return 0 if 0 <= number < len(self.sensors) else -1
-        def llDetectedTouchPos(number):
+        def llDetectedGroup(ctx, number):
+            return str(uuid.uuid4()) if 0 <= number < len(ctx.sensors) else "00000000-0000-0000-0000-000000000000"
+        def llDetectedLinkNumber(ctx, number):
+            return 1 if 0 <= number < len(ctx.sensors) else 0
+        def llDetectedTouchFace(ctx, number):
+            return 0 if 0 <= number < len(ctx.sensors) else -1
+        def llDetectedTouchPos(ctx, number):
             return (0.0, 0.0, 0.0)
-        def llDetectedTouchNormal(number):
+        def llDetectedTouchNormal(ctx, number):
             return (0.0, 0.0, 1.0)
-        def llDetectedTouchBinormal(number):
+        def llDetectedTouchBinormal(ctx, number):
             return (1.0, 0.0, 0.0)
-        def llDetectedTouchST(number):
+        def llDetectedTouchST(ctx, number):
             return (0.5, 0.5)
-        def llDetectedTouchUV(number):
+        def llDetectedTouchUV(ctx, number):
             return (0.5, 0.5)
 
         sensor_funcs = {
@@ -745,34 +838,41 @@ class LSLAPIExpanded:
             'llDetectedTouchBinormal': llDetectedTouchBinormal, 'llDetectedTouchST': llDetectedTouchST,
             'llDetectedTouchUV': llDetectedTouchUV
         }
-        self.functions.update(sensor_funcs)
+        functions.update(sensor_funcs)
 
-    def _register_animation_functions(self):
+    @staticmethod
+    def _register_animation_functions(functions):
         """Register animation functions (9 functions)"""
-        def llStartAnimation(anim):
-            self.animations[anim] = True
-            print(f"Starting animation: {anim}")
-        def llStopAnimation(anim):
-            self.animations.pop(anim, None)
-            print(f"Stopping animation: {anim}")
-        def llStartObjectAnimation(anim):
-            self.animations[f"object_{anim}"] = True
-            print(f"Starting object animation: {anim}")
-        def llStopObjectAnimation(anim):
-            self.animations.pop(f"object_{anim}", None)
-            print(f"Stopping object animation: {anim}")
-        def llGetAnimation(avatar):
+        def llStartAnimation(ctx, anim):
+            ctx.animations[anim] = True
+            if API_LOG.info_on:
+                API_LOG.info("Starting animation: %s", anim)
+        def llStopAnimation(ctx, anim):
+            ctx.animations.pop(anim, None)
+            if API_LOG.info_on:
+                API_LOG.info("Stopping animation: %s", anim)
+        def llStartObjectAnimation(ctx, anim):
+            ctx.animations[f"object_{anim}"] = True
+            if API_LOG.info_on:
+                API_LOG.info("Starting object animation: %s", anim)
+        def llStopObjectAnimation(ctx, anim):
+            ctx.animations.pop(f"object_{anim}", None)
+            if API_LOG.info_on:
+                API_LOG.info("Stopping object animation: %s", anim)
+        def llGetAnimation(ctx, avatar):
             return "standing"  # Simulate current animation
-        def llGetAnimationList(avatar):
-            return list(self.animations.keys())
-        def llSetAnimationOverride(state, anim):
-            self.animations[f"override_{state}"] = anim
-            print(f"Animation override {state}: {anim}")
-        def llGetAnimationOverride(state):
-            return self.animations.get(f"override_{state}", "")
-        def llResetAnimationOverride(state):
-            self.animations.pop(f"override_{state}", None)
-            print(f"Reset animation override: {state}")
+        def llGetAnimationList(ctx, avatar):
+            return list(ctx.animations.keys())
+        def llSetAnimationOverride(ctx, state, anim):
+            ctx.animations[f"override_{state}"] = anim
+            if API_LOG.info_on:
+                API_LOG.info("Animation override %s: %s", state, anim)
+        def llGetAnimationOverride(ctx, state):
+            return ctx.animations.get(f"override_{state}", "")
+        def llResetAnimationOverride(ctx, state):
+            ctx.animations.pop(f"override_{state}", None)
+            if API_LOG.info_on:
+                API_LOG.info("Reset animation override: %s", state)
 
         anim_funcs = {
             'llStartAnimation': llStartAnimation, 'llStopAnimation': llStopAnimation,
@@ -781,35 +881,46 @@ class LSLAPIExpanded:
             'llSetAnimationOverride': llSetAnimationOverride, 'llGetAnimationOverride': llGetAnimationOverride,
             'llResetAnimationOverride': llResetAnimationOverride
         }
-        self.functions.update(anim_funcs)
+        functions.update(anim_funcs)
 
-    def _register_sound_functions(self):
+    @staticmethod
+    def _register_sound_functions(functions):
         """Register sound functions (10 functions)"""
-        def llPlaySound(sound, volume):
-            self.sounds[sound] = {'volume': volume, 'looping': False}
-            print(f"Playing sound: {sound} at volume {volume}")
-        def llLoopSound(sound, volume):
-            self.sounds[sound] = {'volume': volume, 'looping': True}
-            print(f"Looping sound: {sound} at volume {volume}")
-        def llStopSound():
-            self.sounds.clear()
-            print("All sounds stopped")
-        def llPlaySoundSlave(sound, volume):
-            print(f"Playing sound slave: {sound} at volume {volume}")
-        def llLoopSoundSlave(sound, volume):
-            print(f"Looping sound slave: {sound} at volume {volume}")
-        def llStopSoundSlave():
-            print("Sound slave stopped")
-        def llSetSoundQueueing(queue):
-            print(f"Sound queueing set to {queue}")
-        def llSetSoundRadius(radius):
-            print(f"Sound radius set to {radius}")
-        def llAdjustSoundVolume(volume):
-            for sound in self.sounds:
-                self.sounds[sound]['volume'] = volume
-            print(f"All sound volumes adjusted to {volume}")
-        def llTriggerSound(sound, volume):
-            print(f"Triggered sound: {sound} at volume {volume}")
+        def llPlaySound(ctx, sound, volume):
+            ctx.sounds[sound] = {'volume': volume, 'looping': False}
+            if API_LOG.info_on:
+                API_LOG.info("Playing sound: %s at volume %s", sound, volume)
+        def llLoopSound(ctx, sound, volume):
+            ctx.sounds[sound] = {'volume': volume, 'looping': True}
+            if API_LOG.info_on:
+                API_LOG.info("Looping sound: %s at volume %s", sound, volume)
+        def llStopSound(ctx):
+            ctx.sounds.clear()
+            if API_LOG.info_on:
+                API_LOG.info("All sounds stopped")
+        def llPlaySoundSlave(ctx, sound, volume):
+            if API_LOG.info_on:
+                API_LOG.info("Playing sound slave: %s at volume %s", sound, volume)
+        def llLoopSoundSlave(ctx, sound, volume):
+            if API_LOG.info_on:
+                API_LOG.info("Looping sound slave: %s at volume %s", sound, volume)
+        def llStopSoundSlave(ctx):
+            if API_LOG.info_on:
+                API_LOG.info("Sound slave stopped")
+        def llSetSoundQueueing(ctx, queue):
+            if API_LOG.info_on:
+                API_LOG.info("Sound queueing set to %s", queue)
+        def llSetSoundRadius(ctx, radius):
+            if API_LOG.info_on:
+                API_LOG.info("Sound radius set to %s", radius)
+        def llAdjustSoundVolume(ctx, volume):
+            for sound in ctx.sounds:
+                ctx.sounds[sound]['volume'] = volume
+            if API_LOG.info_on:
+                API_LOG.info("All sound volumes adjusted to %s", volume)
+        def llTriggerSound(ctx, sound, volume):
+            if API_LOG.info_on:
+                API_LOG.info("Triggered sound: %s at volume %s", sound, volume)
 
         sound_funcs = {
             'llPlaySound': llPlaySound, 'llLoopSound': llLoopSound, 'llStopSound': llStopSound,
@@ -818,50 +929,58 @@ class LSLAPIExpanded:
             'llSetSoundRadius': llSetSoundRadius, 'llAdjustSoundVolume': llAdjustSoundVolume,
             'llTriggerSound': llTriggerSound
         }
-        self.functions.update(sound_funcs)
+        functions.update(sound_funcs)
 
-    def _register_inventory_functions(self):
+    @staticmethod
+    def _register_inventory_functions(functions):
         """Register inventory functions (13 functions)"""
-        def llGetInventoryNumber(type):
-            return len([k for k in self.inventory.keys() if self.inventory[k].get('type') == type])
-        def llGetInventoryName(type, number):
-            items = [k for k in self.inventory.keys() if self.inventory[k].get('type') == type]
+        def llGetInventoryNumber(ctx, type):
+            return len([k for k in ctx.inventory.keys() if ctx.inventory[k].get('type') == type])
+        def llGetInventoryName(ctx, type, number):
+            items = [k for k in ctx.inventory.keys() if ctx.inventory[k].get('type') == type]
             if 0 <= number < len(items):
                 return items[number]
             return ""
-        def llGetInventoryKey(name):
-            if name in self.inventory:
-                return self.inventory[name].get('key', "00000000-0000-0000-0000-000000000000")
+        def llGetInventoryKey(ctx, name):
+            if name in ctx.inventory:
+                return ctx.inventory[name].get('key', "00000000-0000-0000-0000-000000000000")
             return "00000000-0000-0000-0000-000000000000"
-        def llGetInventoryType(name):
-            if name in self.inventory:
-                return self.inventory[name].get('type', -1)
+        def llGetInventoryType(ctx, name):
+            if name in ctx.inventory:
+                return ctx.inventory[name].get('type', -1)
             return -1
-        def llGetInventoryCreator(name):
-            if name in self.inventory:
-                return self.inventory[name].get('creator', "00000000-0000-0000-0000-000000000000")
+        def llGetInventoryCreator(ctx, name):
+            if name in ctx.inventory:
+                return ctx.inventory[name].get('creator', "00000000-0000-0000-0000-000000000000")
             return "00000000-0000-0000-0000-000000000000"
-        def llGetInventoryPermMask(name, mask):
-            if name in self.inventory:
-                return self.inventory[name].get(f'perm_mask_{mask}', 0)
+        def llGetInventoryPermMask(ctx, name, mask):
+            if name in ctx.inventory:
+                return ctx.inventory[name].get(f'perm_mask_{mask}', 0)
             return 0
-        def llSetInventoryPermMask(name, mask, value):
-            if name in self.inventory:
-                self.inventory[name][f'perm_mask_{mask}'] = value
-                print(f"Inventory {name} perm mask {mask} set to {value}")
-        def llGiveInventory(destination, inventory):
-            print(f"Giving inventory {inventory} to {destination}")
-        def llGiveInventoryList(destination, folder, items):
-            print(f"Giving inventory list {items} to {destination} in folder {folder}")
-        def llRemoveInventory(item):
-            self.inventory.pop(item, None)
-            print(f"Removed inventory item: {item}")
-        def llCreateLink(target, parent):
-            print(f"Creating link between {target} and {parent}")
-        def llBreakLink(linknum):
-            print(f"Breaking link {linknum}")
-        def llBreakAllLinks():
-            print("Breaking all links")
+        def llSetInventoryPermMask(ctx, name, mask, value):
+            if name in ctx.inventory:
+                ctx.inventory[name][f'perm_mask_{mask}'] = value
+                if API_LOG.info_on:
+                    API_LOG.info("Inventory %s perm mask %s set to %s", name, mask, value)
+        def llGiveInventory(ctx, destination, inventory):
+            if API_LOG.info_on:
+                API_LOG.info("Giving inventory %s to %s", inventory, destination)
+        def llGiveInventoryList(ctx, destination, folder, items):
+            if API_LOG.info_on:
+                API_LOG.info("Giving inventory list %s to %s in folder %s", items, destination, folder)
+        def llRemoveInventory(ctx, item):
+            ctx.inventory.pop(item, None)
+            if API_LOG.info_on:
+                API_LOG.info("Removed inventory item: %s", item)
+        def llCreateLink(ctx, target, parent):
+            if API_LOG.info_on:
+                API_LOG.info("Creating link between %s and %s", target, parent)
+        def llBreakLink(ctx, linknum):
+            if API_LOG.info_on:
+                API_LOG.info("Breaking link %s", linknum)
+        def llBreakAllLinks(ctx):
+            if API_LOG.info_on:
+                API_LOG.info("Breaking all links")
 
         inv_funcs = {
             'llGetInventoryNumber': llGetInventoryNumber, 'llGetInventoryName': llGetInventoryName,
@@ -871,28 +990,35 @@ class LSLAPIExpanded:
             'llGiveInventoryList': llGiveInventoryList, 'llRemoveInventory': llRemoveInventory,
             'llCreateLink': llCreateLink, 'llBreakLink': llBreakLink, 'llBreakAllLinks': llBreakAllLinks
         }
-        self.functions.update(inv_funcs)
+        functions.update(inv_funcs)
 
-    def _register_http_functions(self):
+    @staticmethod
+    def _register_http_functions(functions):
         """Register HTTP functions (7 functions)"""
-        def llHTTPRequest(url, parameters, body):
-            print(f"HTTP request to {url}")
+        def llHTTPRequest(ctx, url, parameters, body):
+            if API_LOG.info_on:
+                API_LOG.info("HTTP request to %s", url)
             # Simulate HTTP response
             return str(uuid.uuid4())  # Return request ID
-        def llHTTPResponse(request_id, status, body):
-            print(f"HTTP response {request_id}: {status}")
-        def llSetContentType(request_id, content_type):
-            print(f"Set content type for {request_id}: {content_type}")
-        def llGetHTTPHeader(request_id, header):
-            print(f"Get HTTP header {header} for {request_id}")
+        def llHTTPResponse(ctx, request_id, status, body):
+            if API_LOG.info_on:
+                API_LOG.info("HTTP response %s: %s", request_id, status)
+        def llSetContentType(ctx, request_id, content_type):
+            if API_LOG.info_on:
+                API_LOG.info("Set content type for %s: %s", request_id, content_type)
+        def llGetHTTPHeader(ctx, request_id, header):
+            if API_LOG.info_on:
+                API_LOG.info("Get HTTP header %s for %s", header, request_id)
             return ""
-        def llGetFreeURLs():
+        def llGetFreeURLs(ctx):
             return 10  # Simulate available URLs
-        def llRequestURL():
-            print("Requesting URL")
+        def llRequestURL(ctx):
+            if API_LOG.info_on:
+                API_LOG.info("Requesting URL")
             return str(uuid.uuid4())
-        def llReleaseURL(url):
-            print(f"Releasing URL: {url}")
+        def llReleaseURL(ctx, url):
+            if API_LOG.info_on:
+                API_LOG.info("Releasing URL: %s", url)
 
         http_funcs = {
             'llHTTPRequest': llHTTPRequest, 'llHTTPResponse': llHTTPResponse,
@@ -900,59 +1026,74 @@ class LSLAPIExpanded:
             'llGetFreeURLs': llGetFreeURLs, 'llRequestURL': llRequestURL,
             'llReleaseURL': llReleaseURL
         }
-        self.functions.update(http_funcs)
+        functions.update(http_funcs)
 
-    def _register_collision_functions(self):
+    @staticmethod
+    def _register_collision_functions(functions):
         """Register collision functions (5 functions)"""
-        def llVolumeDetect(detect):
-            self.object_properties['volume_detect'] = detect
-            print(f"Volume detect set to {detect}")
-        def llPassCollisions(pass_collisions):
-            self.object_properties['pass_collisions'] = pass_collisions
-            print(f"Pass collisions set to {pass_collisions}")
-        def llCollisionFilter(name, id, accept):
-            print(f"Collision filter: {name}, accept: {accept}")
-        def llCollisionSprite(impact_sprite):
-            print(f"Collision sprite set to {impact_sprite}")
-        def llCollisionSound(impact_sound, impact_volume):
-            print(f"Collision sound: {impact_sound} at volume {impact_volume}")
+        def llVolumeDetect(ctx, detect):
+            ctx.object_properties['volume_detect'] = detect
+            if API_LOG.info_on:
+                API_LOG.info("Volume detect set to %s", detect)
+        def llPassCollisions(ctx, pass_collisions):
+            ctx.object_properties['pass_collisions'] = pass_collisions
+            if API_LOG.info_on:
+                API_LOG.info("Pass collisions set to %s", pass_collisions)
+        def llCollisionFilter(ctx, name, id, accept):
+            if API_LOG.info_on:
+                API_LOG.info("Collision filter: %s, accept: %s", name, accept)
+        def llCollisionSprite(ctx, impact_sprite):
+            if API_LOG.info_on:
+                API_LOG.info("Collision sprite set to %s", impact_sprite)
+        def llCollisionSound(ctx, impact_sound, impact_volume):
+            if API_LOG.info_on:
+                API_LOG.info("Collision sound: %s at volume %s", impact_sound, impact_volume)
 
         collision_funcs = {
             'llVolumeDetect': llVolumeDetect, 'llPassCollisions': llPassCollisions,
             'llCollisionFilter': llCollisionFilter, 'llCollisionSprite': llCollisionSprite,
             'llCollisionSound': llCollisionSound
         }
-        self.functions.update(collision_funcs)
+        functions.update(collision_funcs)
 
-    def _register_notecard_functions(self):
+    @staticmethod
+    def _register_notecard_functions(functions):
         """Register notecard functions (2 functions)"""
-        def llGetNotecardLine(name, line):
-            print(f"Reading notecard {name} line {line}")
+        def llGetNotecardLine(ctx, name, line):
+            if API_LOG.info_on:
+                API_LOG.info("Reading notecard %s line %s", name, line)
             return str(uuid.uuid4())  # Return request ID
-        def llGetNumberOfNotecardLines(name):
-            print(f"Getting number of lines in notecard {name}")
+        def llGetNumberOfNotecardLines(ctx, name):
+            if API_LOG.info_on:
+                API_LOG.info("Getting number of lines in notecard %s", name)
             return str(uuid.uuid4())  # Return request ID
 
         notecard_funcs = {
             'llGetNotecardLine': llGetNotecardLine,
             'llGetNumberOfNotecardLines': llGetNumberOfNotecardLines
         }
-        self.functions.update(notecard_funcs)
+        functions.update(notecard_funcs)
 
-    def _register_media_functions(self):
+    @staticmethod
+    def _register_media_functions(functions):
         """Register media functions (6 functions)"""
-        def llSetPrimMediaParams(face, params):
-            print(f"Setting media params for face {face}")
-        def llGetPrimMediaParams(face, params):
-            print(f"Getting media params for face {face}")
+        def llSetPrimMediaParams(ctx, face, params):
+            if API_LOG.info_on:
+                API_LOG.info("Setting media params for face %s", face)
+        def llGetPrimMediaParams(ctx, face, params):
+            if API_LOG.info_on:
+                API_LOG.info("Getting media params for face %s", face)
             return []
-        def llClearPrimMedia(face):
-            print(f"Clearing media for face {face}")
-        def llModifyLand(action, brush, seconds):
-            print(f"Modifying land: {action}")
-        def llSetPrimURL(url):
-            print(f"Setting prim URL: {url}")
-        def llGetPrimURL():
+        def llClearPrimMedia(ctx, face):
+            if API_LOG.info_on:
+                API_LOG.info("Clearing media for face %s", face)
+        def llModifyLand(ctx, action, brush, seconds):
+            if API_LOG.info_on:
+                API_LOG.info("Modifying land: %s", action)
+        def llSetPrimURL(ctx, url):
+            if API_LOG.info_on:
+                API_LOG.info("Setting prim URL: %s", url)
+        def llGetPrimURL(ctx):
             return "http://example.com"
 
         media_funcs = {
@@ -960,61 +1101,65 @@ class LSLAPIExpanded:
             'llClearPrimMedia': llClearPrimMedia, 'llModifyLand': llModifyLand,
             'llSetPrimURL': llSetPrimURL, 'llGetPrimURL': llGetPrimURL
         }
-        self.functions.update(media_funcs)
+        functions.update(media_funcs)
 
-    def _register_npc_compatibility_functions(self):
+    @staticmethod
+    def _register_npc_compatibility_functions(functions):
         """Register functions needed specifically for npc.lsl compatibility (10 functions)"""
-        def llInstantMessage(user, message):
+        def llInstantMessage(ctx, user, message):
             """Sends instant message to specific user"""
-            print(f"IM to {user}: {message}")
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("IM to %s: %s", user, message)
             
-        def llListen(channel, name, id, msg):
+        def llListen(ctx, channel, name, id, msg):
             """Starts listening on a channel"""
-            handle = len(self.listeners) + 1
-            self.listeners[handle] = {
+            handle = len(ctx.listeners) + 1
+            ctx.listeners[handle] = {
                 'channel': channel,
                 'name': name,
                 'id': id,
                 'msg': msg
             }
-            print(f"Listening on channel {channel} with handle {handle}")
+            if API_LOG.info_on:
+                API_LOG.info("Listening on channel %s with handle %s", channel, handle)
             return handle
             
-        def llListenRemove(handle):
+        def llListenRemove(ctx, handle):
             """Removes a listen handle"""
-            if handle in self.listeners:
-                del self.listeners[handle]
-                print(f"Removed listen handle {handle}")
+            if handle in ctx.listeners:
+                del ctx.listeners[handle]
+                if API_LOG.info_on:
+                    API_LOG.info("Removed listen handle %s", handle)
             
-        def llDetectedDist(number):
+        def llDetectedDist(ctx, number):
             """Returns distance to detected object"""
-            if 0 <= number < len(self.sensors):
+            if 0 <= number < len(ctx.sensors):
                 # Calculate distance from current position
-                detected_pos = self.sensors[number]['pos']
-                current_pos = self.object_properties.get('position', (0.0, 0.0, 0.0))
+                detected_pos = ctx.sensors[number]['pos']
+                current_pos = ctx.object_properties.get('position', (0.0, 0.0, 0.0))
                 dx = detected_pos[0] - current_pos[0]
                 dy = detected_pos[1] - current_pos[1] 
                 dz = detected_pos[2] - current_pos[2]
                 return math.sqrt(dx*dx + dy*dy + dz*dz)
             return 0.0
             
-        def llGetKey():
+        def llGetKey(ctx):
             """Returns object's UUID"""
-            if 'uuid' not in self.object_properties:
-                self.object_properties['uuid'] = str(uuid.uuid4())
-            return self.object_properties['uuid']
+            if 'uuid' not in ctx.object_properties:
+                ctx.object_properties['uuid'] = str(uuid.uuid4())
+            return ctx.object_properties['uuid']
             
-        def llGetOwner():
+        def llGetOwner(ctx):
             """Returns object owner's UUID"""
-            if 'owner' not in self.object_properties:
-                self.object_properties['owner'] = str(uuid.uuid4())
-            return self.object_properties['owner']
+            if 'owner' not in ctx.object_properties:
+                ctx.object_properties['owner'] = str(uuid.uuid4())
+            return ctx.object_properties['owner']
             
-        def llGetRegionName():
+        def llGetRegionName(ctx):
             """Returns current region name"""
-            return self.object_properties.get('region_name', 'TestRegion')
+            return ctx.object_properties.get('region_name', 'TestRegion')
             
-        def llKey2Name(key):
+        def llKey2Name(ctx, key):
             """Converts UUID to avatar/object name"""
             # Simulate name lookup
             name_cache = {
@@ -1024,7 +1169,7 @@ class LSLAPIExpanded:
             }
             return name_cache.get(str(key), 'Unknown')
             
-        def llGetObjectDetails(key, params):
+        def llGetObjectDetails(ctx, key, params):
             """Gets object details"""
             # Simulate object details based on params
             result = []
@@ -1049,15 +1194,22 @@ class LSLAPIExpanded:
                     result.append("")
             return result
             
-        def llResetScript():
+        def llResetScript(ctx):
             """Resets the script"""
-            print("Script reset requested")
+            if API_LOG.info_on:
+                API_LOG.info("Script reset requested")
             # In a real implementation, this would restart the script
-            self.object_properties.clear()
-            self.inventory.clear()
-            self.sensors.clear()
-            self.animations.clear()
-            self.sounds.clear()
+            ctx.object_properties.clear()
+            ctx.inventory.clear()
+            ctx.sensors.clear()
+            ctx.animations.clear()
+            ctx.sounds.clear()
+
+        def osNpcSay(ctx, npc, *args):
+            """NPC chat: osNpcSay(npc, message) or osNpcSay(npc, channel, message)"""
+            channel, message = (0, args[0]) if len(args) == 1 else (int(args[0]), args[1])
+            if CHAT_LOG.info_on:
+                CHAT_LOG.info("[NPC %s Channel %s] %s", npc, channel, message)
 
         npc_funcs = {
             'llInstantMessage': llInstantMessage,
@@ -1069,9 +1221,10 @@ class LSLAPIExpanded:
             'llGetRegionName': llGetRegionName,
             'llKey2Name': llKey2Name,
             'llGetObjectDetails': llGetObjectDetails,
-            'llResetScript': llResetScript
+            'llResetScript': llResetScript,
+            'osNpcSay': osNpcSay
         }
-        self.functions.update(npc_funcs)
+        functions.update(npc_funcs)
 
     def get_implementation_stats(self) -> Dict[str, Any]:
         """Returns comprehensive statistics about implemented functions"""
@@ -1109,6 +1262,12 @@ class LSLAPIExpanded:
         
         return stats
 
+
+# Built once per process and shared by every instance; the functions take the
+# instance (the script's context) as their first argument
+FUNCTIONS = LSLAPIExpanded._build_function_table()
+LSLAPIExpanded.function_table = FUNCTIONS
+
 def test_lsl_api_expanded():
     """Test the expanded LSL API implementation"""
     print("=== Testing Expanded LSL API Implementation (80% Coverage) ===")
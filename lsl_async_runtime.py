@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+LSL Async Runtime
+Hosts many scripts on one asyncio event loop.
+
+Each script is an LSLSimulator whose event queue is replaced by an asyncio
+mailbox drained by one task, so a script still handles its events one at a
+time and in order, as under `LSLSimulator.run()`. Timers, sensor repeats and
+the simulated HTTP and dataserver latencies are loop callbacks (`call_at`)
+instead of entries on the shared scheduler thread. No script owns an OS
+thread, so ten thousand scripts are ten thousand small tasks.
+
+The scripts share one HttpClient (lsl_http.py), as a region's do. On the loop
+its round trips are tasks: a transport with a `send_async` coroutine is
+awaited directly, and a blocking one (SessionTransport) runs in the loop's
+default executor, so its thread count is bounded by that executor rather
+than by the number of scripts. Notecard reads are synchronous file reads
+whose dataserver replies are loop callbacks.
+
+Handlers are synchronous and run to completion on the loop. A script task
+yields after every event, so a busy script holds the loop for at most one
+handler at a time.
+
+    async def main():
+        runtime = AsyncRuntime()
+        for _ in range(10000):
+            runtime.add_script(parsed)
+        await runtime.run_for(60.0)
+        await runtime.stop()
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from lsl_http import HttpClient
+from lsl_log import category
+from lsl_simulator import LSLSimulator, SHUTDOWN
+
+RUNTIME_LOG = category("runtime")
+
+
+class LoopClock:
+    """Clock reading the event loop's time"""
+
+    virtual = False
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def __call__(self) -> float:
+        return self.loop.time()
+
+    def unix_time(self) -> float:
+        return time.time()
+
+
+class LoopTimer:
+    """A callback scheduled on the loop; cancel() stops it and any later repeats"""
+
+    __slots__ = ("when", "interval", "callback", "args", "cancelled", "_loop", "_handle")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, when: float, interval: Optional[float],
+                 callback: Callable, args: tuple):
+        self.when = when
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._loop = loop
+        self._handle = loop.call_at(when, self._fire)
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._handle.cancel()
+
+    def _fire(self):
+        if self.cancelled:
+            return
+        if self.interval is not None:
+            # Re-arm from the deadline, skipping ticks missed entirely (as Scheduler does)
+            missed = int((self._loop.time() - self.when) // self.interval)
+            self.when += self.interval * (missed + 1)
+            self._handle = self._loop.call_at(self.when, self._fire)
+        try:
+            self.callback(*self.args)
+        except Exception as e:
+            RUNTIME_LOG.error("Timer callback %s failed: %s", getattr(self.callback, '__name__', self.callback), e)
+
+
+class LoopScheduler:
+    """The `lsl_scheduler.Scheduler` interface on top of an asyncio loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.clock = LoopClock(loop)
+
+    def call_at(self, when: float, callback: Callable, *args: Any) -> LoopTimer:
+        return LoopTimer(self.loop, when, None, callback, args)
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> LoopTimer:
+        return self.call_at(self.loop.time() + max(0.0, delay), callback, *args)
+
+    def call_every(self, interval: float, callback: Callable, *args: Any,
+                   first_delay: Optional[float] = None) -> LoopTimer:
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        delay = interval if first_delay is None else max(0.0, first_delay)
+        return LoopTimer(self.loop, self.loop.time() + delay, interval, callback, args)
+
+
+class Mailbox:
+    """
+    A script's event queue: an asyncio.Queue with the put()/get_nowait()
+    surface LSLSimulator uses. put() is safe from other threads.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def put(self, item):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.queue.put_nowait(item)
+        else:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def get_nowait(self):
+        return self.queue.get_nowait()
+
+    def task_done(self):
+        self.queue.task_done()
+
+    def empty(self) -> bool:
+        return self.queue.empty()
+
+    def qsize(self) -> int:
+        return self.queue.qsize()
+
+
+class AsyncRuntime:
+    """Runs any number of scripts as tasks on the current event loop"""
+
+    def __init__(self, http_transport=None):
+        self.scripts: List[LSLSimulator] = []
+        self.tasks: List[asyncio.Task] = []
+        self.scheduler: Optional[LoopScheduler] = None
+        self.http_transport = http_transport
+        # One HTTP client for every script, so its limits cover the runtime
+        self.http: Optional[HttpClient] = None
+
+    def add_script(self, parsed_script: Dict[str, Any], **simulator_options) -> LSLSimulator:
+        """Load a script and start its task; must be called from the running loop"""
+        loop = asyncio.get_running_loop()
+        if self.scheduler is None or self.scheduler.loop is not loop:
+            self.scheduler = LoopScheduler(loop)
+            self.http = HttpClient(self.scheduler, self.http_transport)
+        simulator = LSLSimulator(parsed_script, scheduler=self.scheduler, **simulator_options)
+        simulator.event_queue = Mailbox(loop)
+        simulator.http = self.http
+        simulator.queue_event("state_entry")
+        self.scripts.append(simulator)
+        self.tasks.append(loop.create_task(self._run_script(simulator)))
+        return simulator
+
+    async def _run_script(self, simulator: LSLSimulator):
+        """One script's event loop: serial dispatch from its mailbox"""
+        mailbox = simulator.event_queue
+        while simulator._is_running:
+            event = await mailbox.get()
+            if event is SHUTDOWN:
+                mailbox.task_done()
+                break
+            simulator._dispatch_event(event)
+            await asyncio.sleep(0)
+
+    async def run_for(self, seconds: float):
+        """Let the scripts run for `seconds` of loop time"""
+        await asyncio.sleep(seconds)
+
+    async def wait_idle(self):
+        """Wait until every mailbox has been drained"""
+        for simulator in self.scripts:
+            await simulator.event_queue.queue.join()
+
+    async def stop(self):
+        """Stop every script, cancel its timers and wait for its task and HTTP requests to finish"""
+        for simulator in self.scripts:
+            simulator.stop()
+        await asyncio.gather(*self.tasks)
+        if self.http is not None:
+            await self.http.wait_closed()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals across the hosted scripts"""
+        return {
+            'scripts': len(self.scripts),
+            'running': sum(1 for task in self.tasks if not task.done()),
+            'events': sum(simulator.events_dispatched for simulator in self.scripts),
+            'errors': sum(simulator.dispatch_errors for simulator in self.scripts),
+            'queued': sum(simulator.event_queue.qsize() for simulator in self.scripts),
+            'http_requests': self.http.requests if self.http is not None else 0,
+        }
@@ -0,0 +1,783 @@
+#!/usr/bin/env python3
+"""
+LSL Bytecode VM (experimental)
+A compact, serializable code form for function and event bodies.
+
+Each body compiles to a CodeObject: a flat `array('H')` of (opcode, argument)
+word pairs plus side tables for constants, names and call sites. The VM is a
+stack machine with a single dispatch loop that replaces the statement walkers
+(`_execute_statements`, `_execute_for_loop`, `_execute_while_loop`) for
+compiled bodies.
+
+Because execution state is just (code, pc, value stack, scope) per call, a
+running body can be suspended after any instruction. `BytecodeVM.resume()`
+takes an instruction budget, which makes instruction counting and time-slicing
+cheap.
+
+Names are resolved to frame slots: a body's frames use `CodeObject.layout`,
+built from its name table with arguments first, so the argument of a name
+instruction is also the variable's slot in the current frame. Names the frame
+does not set (globals, callers' variables) fall back to a lookup by name.
+"""
+
+import pickle
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lsl_simulator import Frame, ReturnValue, SlotLayout, argument_names
+
+# =============================================================================
+# Opcodes - every instruction is two words: opcode, argument
+# =============================================================================
+
+NOP = 0
+LOAD_CONST = 1              # push consts[arg]
+LOAD_NAME = 2               # push variable names[arg]
+STORE_NAME = 3              # pop into the scope defining names[arg] (or the current scope)
+DECLARE_NAME = 4            # pop into the current scope as names[arg]
+POP = 5
+DUP = 6
+ADD = 7                     # numeric fast paths, falling back to the evaluator helpers
+SUB = 8
+MUL = 9
+LT = 10
+GT = 11
+LE = 12
+GE = 13
+EQ = 14
+NE = 15
+BINARY = 16                 # generic binary operator BINARY_OPERATORS[arg]
+NOT = 17
+BITNOT = 18
+NEG = 19
+TO_BOOL = 20                # replace top with 0/1
+CAST = 21                   # cast top to type consts[arg]
+GET_MEMBER = 22             # top = component names[arg] of top
+SET_MEMBER = 23             # pop value; set component arg of the vector on top
+INDEX = 24                  # pop index; top = top[index]
+BUILD_VECTOR = 25           # pop arg values, push them as a float list
+BUILD_LIST = 26             # pop arg values, push them as a list
+INC_NAME = 27               # push names[arg], then increment the variable
+DEC_NAME = 28               # push names[arg], then decrement the variable
+CALL = 29                   # call calls[arg] = (name, argc)
+JUMP = 30                   # pc = arg
+JUMP_IF_FALSE = 31          # pop; if falsy, pc = arg
+JUMP_IF_TRUE = 32           # pop; if truthy, pc = arg
+STATE_CHANGE = 33           # switch to state names[arg]
+RETURN_VALUE = 34
+RETURN_NONE = 35
+
+OPCODE_NAMES = {value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)}
+
+BYTECODE_MAGIC = b"LSLB"
+BYTECODE_VERSION = 3
+
+BINARY_OPERATORS = ["+", "-", "*", "/", "%", "<", ">", "<=", ">=", "==", "!=", "&", "|", "^", "<<", ">>"]
+
+FAST_BINARY = {"+": ADD, "-": SUB, "*": MUL, "<": LT, ">": GT, "<=": LE, ">=": GE, "==": EQ, "!=": NE}
+
+FAST_BINARY_SYMBOLS = {op: symbol for symbol, op in FAST_BINARY.items()}
+
+UNARY_OPCODES = {"!": NOT, "~": BITNOT, "-": NEG}
+
+DEFAULT_VALUES = {
+    "string": "",
+    "integer": 0,
+    "float": 0.0,
+    "key": "00000000-0000-0000-0000-000000000000",
+    "vector": [0.0, 0.0, 0.0],
+    "rotation": [0.0, 0.0, 0.0, 1.0],
+    "list": [],
+}
+
+COMPONENTS = "xyzs"
+WORD_MAX = 0xFFFF
+
+
+class BytecodeError(Exception):
+    """Raised for constructs the bytecode compiler does not support"""
+
+
+class CodeObject:
+    """One compiled body: instruction words plus constant, name and call-site tables"""
+
+    __slots__ = ("name", "code", "consts", "names", "calls", "arg_names", "layout")
+
+    def __init__(self, name: str, code: array, consts: List[Any], names: List[str],
+                 calls: List[Tuple[str, int]], arg_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.code = code
+        self.consts = consts
+        self.names = names
+        self.calls = calls
+        self.arg_names = arg_names
+        self.layout = SlotLayout(names)
+
+    def __getstate__(self):
+        return (self.name, self.code.tobytes(), self.consts, self.names, self.calls, self.arg_names)
+
+    def __setstate__(self, state):
+        name, code_bytes, self.consts, self.names, self.calls, self.arg_names = state
+        self.name = name
+        self.code = array("H")
+        self.code.frombytes(code_bytes)
+        self.layout = SlotLayout(self.names)
+
+    def __len__(self):
+        return len(self.code) // 2
+
+    def disassemble(self) -> str:
+        """Human-readable listing, one instruction per line"""
+        lines = []
+        for pc in range(0, len(self.code), 2):
+            op, arg = self.code[pc], self.code[pc + 1]
+            name = OPCODE_NAMES[op]
+            detail = ""
+            if op in (LOAD_CONST, CAST):
+                detail = repr(self.consts[arg])
+            elif op in (LOAD_NAME, STORE_NAME, DECLARE_NAME, INC_NAME, DEC_NAME, GET_MEMBER, STATE_CHANGE):
+                detail = self.names[arg]
+            elif op == CALL:
+                detail = "%s/%d" % self.calls[arg]
+            elif op == BINARY:
+                detail = BINARY_OPERATORS[arg]
+            lines.append(f"{pc:5d} {name:<22} {arg:5d} {detail}".rstrip())
+        return "\n".join(lines)
+
+
+class ScriptBytecode:
+    """Bytecode for a whole script; serializable for caching"""
+
+    def __init__(self, functions: Dict[str, CodeObject], handlers: Dict[Tuple[str, str], CodeObject]):
+        self.functions = functions
+        self.handlers = handlers
+
+    def to_bytes(self) -> bytes:
+        return BYTECODE_MAGIC + pickle.dumps(
+            (BYTECODE_VERSION, self.functions, self.handlers), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScriptBytecode":
+        if not data.startswith(BYTECODE_MAGIC):
+            raise BytecodeError("not LSL bytecode")
+        version, functions, handlers = pickle.loads(data[len(BYTECODE_MAGIC):])
+        if version != BYTECODE_VERSION:
+            raise BytecodeError(f"bytecode version {version}, expected {BYTECODE_VERSION}")
+        return cls(functions, handlers)
+
+
+# =============================================================================
+# Compiler
+# =============================================================================
+
+class BytecodeCompiler:
+    """Compiles parsed statement and expression nodes into CodeObjects"""
+
+    def __init__(self):
+        self.errors = []
+
+    def compile_script(self, parsed_script: Dict[str, Any]) -> ScriptBytecode:
+        """Compile every body that can be compiled; the rest stay interpreted"""
+        functions = {}
+        for name, func_def in parsed_script.get("functions", {}).items():
+            code = self._try_compile(name, func_def.get("body", []), argument_names(func_def.get("args", [])))
+            if code is not None:
+                functions[name] = code
+
+        handlers = {}
+        for state_name, events in parsed_script.get("states", {}).items():
+            for event_name, handler in events.items():
+                code = self._try_compile(f"{state_name}.{event_name}", handler.get("body", []),
+                                         argument_names(handler.get("args", [])))
+                if code is not None:
+                    handlers[(state_name, event_name)] = code
+
+        return ScriptBytecode(functions, handlers)
+
+    def _try_compile(self, name, body, arg_names=()):
+        try:
+            return self.compile_body(name, body, arg_names)
+        except BytecodeError as e:
+            self.errors.append(f"{name}: {e}")
+            return None
+
+    def compile_body(self, name: str, body: List[Any], arg_names: Sequence[str] = ()) -> CodeObject:
+        """Compile one statement list into a CodeObject"""
+        unit = _CodeUnit()
+        arg_names = tuple(arg_names)
+        for arg_name in arg_names:
+            unit.name(arg_name)
+        for stmt in body:
+            unit.statement(stmt)
+        unit.emit(RETURN_NONE)
+        unit.resolve_labels()
+        return CodeObject(name, unit.code, unit.consts, unit.names, unit.calls, arg_names)
+
+
+class _CodeUnit:
+    """Emission state for one body"""
+
+    def __init__(self):
+        self.code = array("H")
+        self.consts = []
+        self.const_index = {}
+        self.names = []
+        self.name_index = {}
+        self.calls = []
+        self.call_index = {}
+        self.loops = []           # (break patch list, continue patch list)
+        self.labels = {}
+        self.label_patches = []   # (position, label)
+
+    # -- emission -------------------------------------------------------------
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        if arg > WORD_MAX or len(self.code) >= WORD_MAX:
+            raise BytecodeError("body too large for 16-bit bytecode")
+        position = len(self.code)
+        self.code.append(op)
+        self.code.append(arg)
+        return position
+
+    def here(self) -> int:
+        return len(self.code)
+
+    def patch(self, position: int, target: int = None):
+        self.code[position + 1] = self.here() if target is None else target
+
+    def const(self, value) -> int:
+        key = (type(value), value) if not isinstance(value, list) else None
+        if key is not None and key in self.const_index:
+            return self.const_index[key]
+        self.consts.append(value)
+        if key is not None:
+            self.const_index[key] = len(self.consts) - 1
+        return len(self.consts) - 1
+
+    def name(self, name: str) -> int:
+        if name not in self.name_index:
+            self.name_index[name] = len(self.names)
+            self.names.append(name)
+        return self.name_index[name]
+
+    def call(self, name: str, argc: int) -> int:
+        key = (name, argc)
+        if key not in self.call_index:
+            self.call_index[key] = len(self.calls)
+            self.calls.append(key)
+        return self.call_index[key]
+
+    def resolve_labels(self):
+        for position, label in self.label_patches:
+            if label not in self.labels:
+                raise BytecodeError(f"jump to unknown label: {label}")
+            self.patch(position, self.labels[label])
+
+    # -- statements -----------------------------------------------------------
+
+    def body(self, body):
+        if body is None:
+            return
+        if isinstance(body, list):
+            for stmt in body:
+                self.statement(stmt)
+        else:
+            self.statement(body)
+
+    def statement(self, stmt):
+        if not isinstance(stmt, dict):
+            raise BytecodeError(f"unstructured statement: {str(stmt)[:40]!r}")
+        stmt_type = stmt.get("type")
+
+        if stmt_type == "expression_statement":
+            self.expression(stmt["expression"])
+            self.emit(POP)
+        elif stmt_type == "variable_declaration":
+            if stmt.get("value") is not None:
+                self.expression(stmt["value"])
+            else:
+                default = DEFAULT_VALUES.get(stmt.get("var_type", "string"), "")
+                if isinstance(default, list):
+                    # Rebuilt on every declaration so each variable gets a fresh list
+                    for component in default:
+                        self.emit(LOAD_CONST, self.const(component))
+                    self.emit(BUILD_VECTOR if default else BUILD_LIST, len(default))
+                else:
+                    self.emit(LOAD_CONST, self.const(default))
+            self.emit(DECLARE_NAME, self.name(stmt["name"]))
+        elif stmt_type == "assignment":
+            self.assignment(stmt)
+        elif stmt_type == "compound":
+            for inner in stmt.get("statements", []):
+                self.statement(inner)
+        elif stmt_type == "if_statement":
+            self.expression(stmt["condition"])
+            jump_else = self.emit(JUMP_IF_FALSE)
+            self.body(stmt.get("then_statement"))
+            if stmt.get("else_statement") is not None:
+                jump_end = self.emit(JUMP)
+                self.patch(jump_else)
+                self.body(stmt["else_statement"])
+                self.patch(jump_end)
+            else:
+                self.patch(jump_else)
+        elif stmt_type == "while_statement":
+            top = self.here()
+            self.expression(stmt["condition"])
+            jump_end = self.emit(JUMP_IF_FALSE)
+            self.loop_body(stmt.get("statement"), continue_target=top)
+            self.emit(JUMP, top)
+            self.patch(jump_end)
+            self.end_loop()
+        elif stmt_type == "do_while_statement":
+            top = self.here()
+            self.loop_body(stmt.get("statement"))
+            self.patch_continues()
+            self.expression(stmt["condition"])
+            self.emit(JUMP_IF_TRUE, top)
+            self.end_loop()
+        elif stmt_type == "for_statement":
+            if stmt.get("init"):
+                self.statement(stmt["init"])
+            top = self.here()
+            jump_end = None
+            if stmt.get("condition"):
+                self.expression(stmt["condition"])
+                jump_end = self.emit(JUMP_IF_FALSE)
+            self.loop_body(stmt.get("statement"))
+            self.patch_continues()
+            if stmt.get("update"):
+                self.expression(stmt["update"])
+                self.emit(POP)
+            self.emit(JUMP, top)
+            if jump_end is not None:
+                self.patch(jump_end)
+            self.end_loop()
+        elif stmt_type == "return_statement":
+            if stmt.get("expression") is not None:
+                self.expression(stmt["expression"])
+                self.emit(RETURN_VALUE)
+            else:
+                self.emit(RETURN_NONE)
+        elif stmt_type == "state_change":
+            self.emit(STATE_CHANGE, self.name(stmt["state"]))
+            self.emit(RETURN_NONE)
+        elif stmt_type in ("break", "continue"):
+            if not self.loops:
+                raise BytecodeError(f"{stmt_type} outside a loop")
+            self.loops[-1][0 if stmt_type == "break" else 1].append(self.emit(JUMP))
+        elif stmt_type == "jump":
+            self.label_patches.append((self.emit(JUMP), stmt["label"]))
+        elif stmt_type == "label":
+            self.labels[stmt["name"]] = self.here()
+        else:
+            raise BytecodeError(f"unsupported statement type: {stmt_type}")
+
+    def loop_body(self, body, continue_target=None):
+        self.loops.append(([], []))
+        self.body(body)
+        if continue_target is not None:
+            for position in self.loops[-1][1]:
+                self.patch(position, continue_target)
+            self.loops[-1][1].clear()
+
+    def patch_continues(self):
+        for position in self.loops[-1][1]:
+            self.patch(position)
+        self.loops[-1][1].clear()
+
+    def end_loop(self):
+        breaks, _ = self.loops.pop()
+        for position in breaks:
+            self.patch(position)
+
+    def assignment(self, stmt):
+        var_name, _, component = stmt["lvalue"].partition(".")
+        operator = stmt["operator"]
+        name = self.name(var_name)
+
+        if component:
+            index = COMPONENTS.find(component)
+            if index < 0:
+                raise BytecodeError(f"unknown component: {component}")
+            self.emit(LOAD_NAME, name)
+            if operator != "=":
+                self.emit(LOAD_NAME, name)
+                self.emit(GET_MEMBER, self.name(component))
+            self.expression(stmt["expression"])
+            if operator != "=":
+                self.binary(operator[:-1])
+            self.emit(SET_MEMBER, index)
+        else:
+            if operator != "=":
+                self.emit(LOAD_NAME, name)
+            self.expression(stmt["expression"])
+            if operator != "=":
+                self.binary(operator[:-1])
+        self.emit(STORE_NAME, name)
+
+    # -- expressions ----------------------------------------------------------
+
+    def binary(self, op: str):
+        if op in FAST_BINARY:
+            self.emit(FAST_BINARY[op])
+        elif op in BINARY_OPERATORS:
+            self.emit(BINARY, BINARY_OPERATORS.index(op))
+        else:
+            raise BytecodeError(f"unsupported operator: {op}")
+
+    def expression(self, node):
+        if not isinstance(node, dict):
+            raise BytecodeError(f"unstructured expression: {str(node)[:40]!r}")
+        node_type = node.get("type")
+
+        if node_type == "literal":
+            self.emit(LOAD_CONST, self.const(node["value"]))
+        elif node_type == "identifier":
+            self.emit(LOAD_NAME, self.name(node["name"]))
+        elif node_type == "binary":
+            op = node["op"]
+            if op in ("&&", "||"):
+                # LSL does not short-circuit: both sides run, then combine as 0/1
+                self.expression(node["left"])
+                self.emit(TO_BOOL)
+                self.expression(node["right"])
+                self.emit(TO_BOOL)
+                self.binary("&" if op == "&&" else "|")
+            else:
+                self.expression(node["left"])
+                self.expression(node["right"])
+                self.binary(op)
+        elif node_type == "unary":
+            self.expression(node["operand"])
+            if node["op"] in UNARY_OPCODES:
+                self.emit(UNARY_OPCODES[node["op"]])
+        elif node_type == "call":
+            for arg in node["args"]:
+                self.expression(arg)
+            self.emit(CALL, self.call(node["name"], len(node["args"])))
+        elif node_type == "cast":
+            self.expression(node["expression"])
+            self.emit(CAST, self.const(node["cast_type"]))
+        elif node_type == "member":
+            self.expression(node["object"])
+            self.emit(GET_MEMBER, self.name(node["member"]))
+        elif node_type == "index":
+            self.expression(node["object"])
+            self.expression(node["index"])
+            self.emit(INDEX)
+        elif node_type in ("vector", "rotation", "list"):
+            for element in node["elements"]:
+                self.expression(element)
+            self.emit(BUILD_LIST if node_type == "list" else BUILD_VECTOR, len(node["elements"]))
+        elif node_type == "postfix":
+            target = node["operand"]
+            if target.get("type") != "identifier":
+                raise BytecodeError(f"cannot increment {target.get('type')}")
+            self.emit(INC_NAME if node["op"] == "++" else DEC_NAME, self.name(target["name"]))
+        elif node_type == "assign":
+            target = node["target"]
+            if target.get("type") != "identifier":
+                raise BytecodeError(f"cannot assign to {target.get('type')}")
+            name = self.name(target["name"])
+            if node["op"] != "=":
+                self.emit(LOAD_NAME, name)
+            self.expression(node["value"])
+            if node["op"] != "=":
+                self.binary(node["op"][:-1])
+            self.emit(DUP)
+            self.emit(STORE_NAME, name)
+        else:
+            raise BytecodeError(f"unsupported expression type: {node_type}")
+
+
+# =============================================================================
+# Virtual machine
+# =============================================================================
+
+class _Activation:
+    """Execution state of one body: code, program counter, value stack and scope"""
+
+    __slots__ = ("code", "pc", "stack", "scope", "owns_scope")
+
+    def __init__(self, code: CodeObject, scope, owns_scope: bool):
+        self.code = code
+        self.pc = 0
+        self.stack = []
+        self.scope = scope
+        self.owns_scope = owns_scope
+
+
+class Task:
+    """A suspendable bytecode execution; `result` is set once `done`"""
+
+    __slots__ = ("activations", "done", "result")
+
+    def __init__(self, activation: _Activation):
+        self.activations = [activation]
+        self.done = False
+        self.result = None
+
+
+class BytecodeVM:
+    """Stack machine executing CodeObjects against one simulator"""
+
+    def __init__(self, simulator, bytecode: Optional[ScriptBytecode] = None):
+        self.simulator = simulator
+        self.functions = bytecode.functions if bytecode else {}
+        self.instructions_executed = 0
+
+    def execute(self, code: CodeObject):
+        """
+        Run a body to completion in the current scope; returns a ReturnValue.
+        The current frame must use `code.layout`; otherwise the body gets a
+        child frame of its own.
+        """
+        scope = self.simulator.call_stack.get_current_scope()
+        if scope.layout is code.layout:
+            task = Task(_Activation(code, scope, owns_scope=False))
+        else:
+            task = Task(_Activation(code, Frame(parent_scope=scope, layout=code.layout), owns_scope=True))
+        self.resume(task)
+        return task.result
+
+    def start(self, code: CodeObject) -> Task:
+        """Create a task for a body with its own scope, to be run with resume()"""
+        return Task(_Activation(code, Frame(parent_scope=self.simulator.global_scope, layout=code.layout),
+                                owns_scope=True))
+
+    def resume(self, task: Task, budget: Optional[int] = None) -> bool:
+        """
+        Run a task for at most `budget` instructions (unbounded if None).
+        Returns True once the task has finished.
+        """
+        if task.done:
+            return True
+
+        simulator = self.simulator
+        evaluator = simulator.expression_evaluator
+        binary_operators = evaluator._binary_operators
+        lookup = evaluator._lookup_variable
+        call_api = simulator._call_api_function
+        call_user = simulator._call_user_function
+        get_component = simulator._get_component
+        user_functions = simulator.user_functions
+        functions = self.functions
+        scope_frames = simulator.call_stack.frames
+        number_types = (int, float)
+
+        for activation in task.activations:
+            if activation.owns_scope:
+                scope_frames.append(activation.scope)
+
+        activation = task.activations[-1]
+        code_object = activation.code
+        code = code_object.code
+        consts = code_object.consts
+        names = code_object.names
+        stack = activation.stack
+        scope = activation.scope
+        pc = activation.pc
+        executed = 0
+        limit = -1 if budget is None else budget
+
+        try:
+            while True:
+                if executed == limit:
+                    activation.pc = pc
+                    return False
+                op = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+                executed += 1
+
+                if op == LOAD_NAME:
+                    value = scope.values[arg]
+                    if value is None:
+                        name = names[arg]
+                        current = scope.parent
+                        while current is not None:
+                            value = current.get(name)
+                            if value is not None:
+                                break
+                            current = current.parent
+                        else:
+                            value = lookup(name)
+                    stack.append(value)
+                elif op == LOAD_CONST:
+                    stack.append(consts[arg])
+                elif op == STORE_NAME:
+                    values = scope.values
+                    if values[arg] is not None:
+                        values[arg] = stack.pop()
+                    else:
+                        name = names[arg]
+                        current = scope.parent
+                        while current is not None and not current.has(name):
+                            current = current.parent
+                        if current is None:
+                            values[arg] = stack.pop()
+                        else:
+                            current.set(name, stack.pop())
+                elif op == JUMP_IF_FALSE:
+                    if not stack.pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == ADD:
+                    right = stack.pop()
+                    left = stack[-1]
+                    if left.__class__ in number_types and right.__class__ in number_types:
+                        stack[-1] = left + right
+                    else:
+                        stack[-1] = evaluator._add(left, right)
+                elif op == LT or op == GT or op == LE or op == GE or op == EQ or op == NE:
+                    right = stack.pop()
+                    left = stack[-1]
+                    if left.__class__ in number_types and right.__class__ in number_types:
+                        if op == LT:
+                            stack[-1] = 1 if left < right else 0
+                        elif op == GT:
+                            stack[-1] = 1 if left > right else 0
+                        elif op == LE:
+                            stack[-1] = 1 if left <= right else 0
+                        elif op == GE:
+                            stack[-1] = 1 if left >= right else 0
+                        elif op == EQ:
+                            stack[-1] = 1 if left == right else 0
+                        else:
+                            stack[-1] = 1 if left != right else 0
+                    else:
+                        stack[-1] = binary_operators[FAST_BINARY_SYMBOLS[op]](evaluator, left, right)
+                elif op == SUB or op == MUL:
+                    right = stack.pop()
+                    left = stack[-1]
+                    if left.__class__ in number_types and right.__class__ in number_types:
+                        stack[-1] = left - right if op == SUB else left * right
+                    else:
+                        stack[-1] = binary_operators[FAST_BINARY_SYMBOLS[op]](evaluator, left, right)
+                elif op == INC_NAME or op == DEC_NAME:
+                    values = scope.values
+                    value = values[arg]
+                    if value is not None:
+                        values[arg] = value + 1 if op == INC_NAME else value - 1
+                    else:
+                        name = names[arg]
+                        current = scope.parent
+                        while current is not None and not current.has(name):
+                            current = current.parent
+                        value = current.get(name) if current is not None else None
+                        if value is None:
+                            value = 0
+                        if current is None:
+                            values[arg] = value + 1 if op == INC_NAME else value - 1
+                        else:
+                            current.set(name, value + 1 if op == INC_NAME else value - 1)
+                    stack.append(value)
+                elif op == POP:
+                    stack.pop()
+                elif op == DECLARE_NAME:
+                    scope.values[arg] = stack.pop()
+                elif op == BINARY:
+                    right = stack.pop()
+                    stack[-1] = binary_operators[BINARY_OPERATORS[arg]](evaluator, stack[-1], right)
+                elif op == CALL:
+                    func_name, argc = code_object.calls[arg]
+                    if argc:
+                        args = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        args = []
+                    callee = functions.get(func_name)
+                    if callee is not None and func_name in user_functions:
+                        # Enter the callee inside this loop so it can be suspended too
+                        activation.pc = pc
+                        new_scope = Frame(parent_scope=scope, layout=callee.layout)
+                        slots = new_scope.values
+                        for slot in range(min(len(args), len(callee.arg_names))):
+                            slots[slot] = args[slot]
+                        scope_frames.append(new_scope)
+                        activation = _Activation(callee, new_scope, owns_scope=True)
+                        task.activations.append(activation)
+                        code_object = callee
+                        code = callee.code
+                        consts = callee.consts
+                        names = callee.names
+                        stack = activation.stack
+                        scope = new_scope
+                        pc = 0
+                    elif func_name in user_functions:
+                        stack.append(call_user(func_name, args))
+                    else:
+                        stack.append(call_api(func_name, args))
+                elif op == RETURN_VALUE or op == RETURN_NONE:
+                    value = stack.pop() if op == RETURN_VALUE else None
+                    if len(task.activations) == 1:
+                        task.done = True
+                        task.result = ReturnValue(value)
+                        return True
+                    task.activations.pop()
+                    scope_frames.pop()
+                    activation = task.activations[-1]
+                    code_object = activation.code
+                    code = code_object.code
+                    consts = code_object.consts
+                    names = code_object.names
+                    stack = activation.stack
+                    scope = activation.scope
+                    pc = activation.pc
+                    stack.append(value)
+                elif op == DUP:
+                    stack.append(stack[-1])
+                elif op == TO_BOOL:
+                    stack[-1] = 1 if stack[-1] else 0
+                elif op == JUMP_IF_TRUE:
+                    if stack.pop():
+                        pc = arg
+                elif op == NOT:
+                    stack[-1] = 0 if stack[-1] else 1
+                elif op == NEG or op == BITNOT:
+                    stack[-1] = evaluator._unary("-" if op == NEG else "~", stack[-1])
+                elif op == CAST:
+                    stack[-1] = evaluator._cast(consts[arg], stack[-1])
+                elif op == GET_MEMBER:
+                    stack[-1] = get_component(stack[-1], names[arg])
+                elif op == SET_MEMBER:
+                    value = stack.pop()
+                    current = stack[-1]
+                    vector = list(current) if isinstance(current, list) else [0.0, 0.0, 0.0]
+                    if arg < len(vector):
+                        vector[arg] = float(value)
+                    stack[-1] = vector
+                elif op == INDEX:
+                    index = stack.pop()
+                    try:
+                        stack[-1] = stack[-1][index]
+                    except (IndexError, KeyError, TypeError):
+                        stack[-1] = None
+                elif op == BUILD_VECTOR:
+                    values = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    vector = []
+                    for value in values:
+                        try:
+                            vector.append(float(value))
+                        except (ValueError, TypeError):
+                            vector.append(0.0)
+                    stack.append(vector)
+                elif op == BUILD_LIST:
+                    values = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    stack.append(values)
+                elif op == STATE_CHANGE:
+                    simulator._change_state(names[arg])
+                elif op == NOP:
+                    pass
+                else:
+                    raise BytecodeError(f"bad opcode {op} at {pc - 2} in {code_object.name}")
+        finally:
+            self.instructions_executed += executed
+            for activation in task.activations:
+                if activation.owns_scope:
+                    scope_frames.pop()
+
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+LSL Chat Bus
+Shared-memory ring buffers that carry chat between region worker processes.
+
+Every worker owns one ring in a `multiprocessing.shared_memory` block and is
+its only writer; every other worker reads it with its own cursor. A message is
+a tuple of LSL values in a small tagged binary encoding, so nothing is
+pickled and no broker process sits in the middle. Chat records,
+`(channel, name, key, message)`, optionally followed by the speaker's
+position and hearing range `x, y, z, range`, are by far the most common
+message and get a fixed layout of their own: one struct header followed by
+the three UTF-8 strings. A writer copies a whole batch into the ring in one slice assignment;
+a reader copies its unread span out in one piece and decodes from that.
+
+Ring layout, all little-endian:
+
+    0    capacity      u64   size of the data area
+    8    write_pos     u64   bytes ever written (only the owner stores it)
+    16   readers       u32
+    64*(1+i)           u64   bytes reader i has consumed (one cache line each)
+    64*(1+readers)     data: records of [u32 length][u8 kind][body]
+
+A RECORD_CHAT body is `<iHHH` (channel and the three string lengths) and the
+strings; RECORD_CHAT_AT adds `<dddd` (position and range) before the strings.
+A RECORD_VALUES body is the values, each a tag byte and its data.
+
+Positions only grow; `position % capacity` is the offset into the data area.
+A record never straddles the end of the ring: the writer skips to the start,
+leaving a WRAP length (or fewer than four bytes) behind. Records are written
+before `write_pos` is published and cursors are stored after the records are
+read. An aligned 8-byte store is a single store on the platforms this runs on,
+so a reader never sees a half-published position.
+
+A full ring is not waited on: `publish()` reports how many records fit and
+the caller sends the rest some other way.
+"""
+
+import argparse
+import math
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Sequence, Tuple
+
+# Value tags
+TAG_INTEGER = 1
+TAG_FLOAT = 2
+TAG_STRING = 3
+TAG_VECTOR = 4
+TAG_ROTATION = 5
+TAG_LIST = 6
+
+# Record kinds
+RECORD_VALUES = 0
+RECORD_CHAT = 1
+RECORD_CHAT_AT = 2
+
+WRAP = 0xFFFFFFFF
+DEFAULT_RING_SIZE = 1 << 22
+CACHE_LINE = 64
+
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_INTEGER = struct.Struct("<Bi")
+_FLOAT = struct.Struct("<Bd")
+_STRING = struct.Struct("<BI")
+_VECTOR = struct.Struct("<Bddd")
+_ROTATION = struct.Struct("<Bdddd")
+_LIST = _STRING
+_HEADER = struct.Struct("<QQI")
+_CHAT = struct.Struct("<BiHHH")
+_CHAT_AT = struct.Struct("<BiHHHdddd")
+
+
+def _encode_value(out: bytearray, value: Any):
+    kind = type(value)
+    if kind is str:
+        data = value.encode("utf-8")
+        out += _STRING.pack(TAG_STRING, len(data))
+        out += data
+    elif kind is int or kind is bool:
+        # LSL integers are 32-bit and wrap
+        out += _INTEGER.pack(TAG_INTEGER, ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000)
+    elif kind is float:
+        out += _FLOAT.pack(TAG_FLOAT, value)
+    elif kind is tuple and len(value) == 3:
+        out += _VECTOR.pack(TAG_VECTOR, *value)
+    elif kind is tuple and len(value) == 4:
+        out += _ROTATION.pack(TAG_ROTATION, *value)
+    elif kind is list or kind is tuple:
+        out += _LIST.pack(TAG_LIST, len(value))
+        for item in value:
+            _encode_value(out, item)
+    else:
+        # Keys and anything else travel as strings, as LSL casts them
+        _encode_value(out, str(value))
+
+
+def encode_values(values: Sequence[Any]) -> bytes:
+    """Encode a sequence of LSL values; tuples of 3 and 4 floats are vectors and rotations"""
+    out = bytearray()
+    for value in values:
+        _encode_value(out, value)
+    return bytes(out)
+
+
+def _decode_value(buffer, offset: int) -> Tuple[Any, int]:
+    tag = buffer[offset]
+    if tag == TAG_STRING:
+        length = _U32.unpack_from(buffer, offset + 1)[0]
+        start = offset + 5
+        return str(buffer[start:start + length], "utf-8"), start + length
+    if tag == TAG_INTEGER:
+        return _INTEGER.unpack_from(buffer, offset)[1], offset + 5
+    if tag == TAG_FLOAT:
+        return _FLOAT.unpack_from(buffer, offset)[1], offset + 9
+    if tag == TAG_VECTOR:
+        return _VECTOR.unpack_from(buffer, offset)[1:], offset + 25
+    if tag == TAG_ROTATION:
+        return _ROTATION.unpack_from(buffer, offset)[1:], offset + 33
+    if tag == TAG_LIST:
+        count = _U32.unpack_from(buffer, offset + 1)[0]
+        offset += 5
+        items = []
+        for _ in range(count):
+            item, offset = _decode_value(buffer, offset)
+            items.append(item)
+        return items, offset
+    raise ValueError(f"Unknown value tag {tag} at offset {offset}")
+
+
+def decode_values(buffer, offset: int = 0, end: Optional[int] = None) -> Tuple[Any, ...]:
+    """Decode the values encoded in `buffer[offset:end]`"""
+    if end is None:
+        end = len(buffer)
+    values = []
+    while offset < end:
+        value, offset = _decode_value(buffer, offset)
+        values.append(value)
+    return tuple(values)
+
+
+def encode_record(record: Sequence[Any]) -> bytes:
+    """Encode one bus record, using a chat layout when it has a chat shape"""
+    size = len(record)
+    if size == 4 or (size == 8 and all(type(value) is float for value in record[4:])):
+        channel, name, key, message = record[:4]
+        if type(channel) is int and type(name) is str and type(key) is str and type(message) is str:
+            name, key, message = name.encode("utf-8"), key.encode("utf-8"), message.encode("utf-8")
+            if len(name) <= 0xFFFF and len(key) <= 0xFFFF and len(message) <= 0xFFFF:
+                if size == 4:
+                    header = _CHAT.pack(RECORD_CHAT, channel, len(name), len(key), len(message))
+                else:
+                    header = _CHAT_AT.pack(RECORD_CHAT_AT, channel, len(name), len(key), len(message), *record[4:])
+                return header + name + key + message
+    return bytes((RECORD_VALUES,)) + encode_values(record)
+
+
+def decode_record(buffer, offset: int, end: int) -> Tuple[Any, ...]:
+    """Decode the record in `buffer[offset:end]`"""
+    kind = buffer[offset]
+    if kind == RECORD_CHAT or kind == RECORD_CHAT_AT:
+        layout = _CHAT if kind == RECORD_CHAT else _CHAT_AT
+        _, channel, name, key, message, *where = layout.unpack_from(buffer, offset)
+        name += offset + layout.size
+        key += name
+        message += key
+        return (channel, bytes(buffer[offset + layout.size:name]).decode("utf-8"),
+                bytes(buffer[name:key]).decode("utf-8"), bytes(buffer[key:message]).decode("utf-8"), *where)
+    return decode_values(buffer, offset + 1, end)
+
+
+class RingBuffer:
+    """A single-writer, multi-reader ring of encoded records in shared memory"""
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        self.buffer = memory.buf
+        self.capacity, _, self.readers = _HEADER.unpack_from(self.buffer, 0)
+        self.data = CACHE_LINE * (1 + self.readers)
+        self.records_written = 0
+        self.records_read = 0
+
+    @classmethod
+    def create(cls, readers: int, size: int = DEFAULT_RING_SIZE, name: Optional[str] = None) -> "RingBuffer":
+        """Allocate a ring with `size` bytes of data for `readers` readers"""
+        header = CACHE_LINE * (1 + readers)
+        memory = shared_memory.SharedMemory(name=name, create=True, size=header + size)
+        memory.buf[:header] = bytes(header)
+        _HEADER.pack_into(memory.buf, 0, size, 0, readers)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "RingBuffer":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def write_position(self) -> int:
+        return _U64.unpack_from(self.buffer, 8)[0]
+
+    def read_position(self, reader: int) -> int:
+        return _U64.unpack_from(self.buffer, CACHE_LINE * (1 + reader))[0]
+
+    def write(self, payloads: Sequence[bytes]) -> int:
+        """Append encoded records; returns how many fitted (a prefix of `payloads`)"""
+        buffer, capacity, data = self.buffer, self.capacity, self.data
+        position = start = self.write_position
+        oldest = min((self.read_position(reader) for reader in range(self.readers)), default=position)
+        limit = oldest + capacity
+        pack = _U32.pack
+        chunk_start = position
+        chunk = []
+        written = 0
+        for payload in payloads:
+            size = 4 + len(payload)
+            offset = position % capacity
+            if offset + size > capacity:
+                if position + capacity - offset + size > limit:
+                    break
+                self._store(chunk_start, chunk)
+                if capacity - offset >= 4:
+                    _U32.pack_into(buffer, data + offset, WRAP)
+                position += capacity - offset
+                chunk_start, chunk = position, []
+            elif position + size > limit:
+                break
+            chunk.append(pack(len(payload)))
+            chunk.append(payload)
+            position += size
+            written += 1
+        self._store(chunk_start, chunk)
+        if position != start:
+            _U64.pack_into(buffer, 8, position)
+        self.records_written += written
+        return written
+
+    def _store(self, position: int, chunk: List[bytes]):
+        if chunk:
+            block = b"".join(chunk)
+            offset = self.data + position % self.capacity
+            self.buffer[offset:offset + len(block)] = block
+
+    def read(self, reader: int, limit: Optional[int] = None) -> List[Tuple[Any, ...]]:
+        """Decode this reader's unread records, up to position `limit` (default: everything written)"""
+        buffer, capacity, data = self.buffer, self.capacity, self.data
+        cursor = CACHE_LINE * (1 + reader)
+        position = _U64.unpack_from(buffer, cursor)[0]
+        end = self.write_position if limit is None else limit
+        records = []
+        append = records.append
+        unpack_length = _U32.unpack_from
+        unpack_chat = _CHAT.unpack_from
+        chat_size = _CHAT.size
+        unpack_chat_at = _CHAT_AT.unpack_from
+        chat_at_size = _CHAT_AT.size
+        while position < end:
+            offset = position % capacity
+            span = min(end - position, capacity - offset)
+            chunk = bytes(buffer[data + offset:data + offset + span])
+            i = 0
+            while i + 4 <= span:
+                length = unpack_length(chunk, i)[0]
+                if length == WRAP:
+                    break
+                start = i + 4
+                i = start + length
+                kind = chunk[start]
+                # decode_record's chat branches, inlined
+                if kind == RECORD_CHAT_AT:
+                    _, channel, name, key, message, x, y, z, radius = unpack_chat_at(chunk, start)
+                    name += start + chat_at_size
+                    key += name
+                    append((channel, chunk[start + chat_at_size:name].decode("utf-8"),
+                            chunk[name:key].decode("utf-8"), chunk[key:i].decode("utf-8"), x, y, z, radius))
+                elif kind == RECORD_CHAT:
+                    _, channel, name, key, message = unpack_chat(chunk, start)
+                    name += start + chat_size
+                    key += name
+                    append((channel, chunk[start + chat_size:name].decode("utf-8"),
+                            chunk[name:key].decode("utf-8"), chunk[key:i].decode("utf-8")))
+                else:
+                    append(decode_record(chunk, start, i))
+            # Whatever is left of a span that reached the end of the ring is wrap padding
+            position += span
+        _U64.pack_into(buffer, cursor, position)
+        self.records_read += len(records)
+        return records
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class ChatBus:
+    """One ring per worker; created by the coordinator, which also removes them"""
+
+    def __init__(self, workers: int, size: int = DEFAULT_RING_SIZE):
+        self.workers = workers
+        self.rings = [RingBuffer.create(max(workers - 1, 1), size) for _ in range(workers)]
+
+    @property
+    def names(self) -> List[str]:
+        return [ring.name for ring in self.rings]
+
+    def close(self):
+        for ring in self.rings:
+            ring.close()
+        self.rings = []
+
+
+class BusEndpoint:
+    """A worker's view of the bus: writes its own ring and reads everyone else's"""
+
+    def __init__(self, names: Sequence[str], shard: int):
+        self.shard = shard
+        self.rings = [RingBuffer.attach(name) for name in names]
+        self.own = self.rings[shard]
+
+    def _reader(self, owner: int) -> int:
+        # Each ring has a cursor for every shard except its owner
+        return self.shard if self.shard < owner else self.shard - 1
+
+    def publish(self, records: Sequence[Sequence[Any]]) -> int:
+        """Write records to this worker's ring; returns how many fitted"""
+        return self.own.write([encode_record(record) for record in records])
+
+    def position(self) -> int:
+        return self.own.write_position
+
+    def consume(self, limits: Optional[Sequence[int]] = None) -> List[Tuple[Any, ...]]:
+        """Records other workers published, each ring read up to its entry in `limits`"""
+        records = []
+        for owner, ring in enumerate(self.rings):
+            if owner != self.shard:
+                records.extend(ring.read(self._reader(owner), None if limits is None else limits[owner]))
+        return records
+
+    def close(self):
+        for ring in self.rings:
+            ring.close()
+
+
+# =============================================================================
+# Throughput benchmark
+# =============================================================================
+
+def _publisher(names: List[str], shard: int, count: int, batch: int, ready, go):
+    endpoint = BusEndpoint(names, shard)
+    records = [(5, f"Speaker{shard}", "00000000-0000-0000-0000-00000000000%d" % shard, f"message {i}")
+               for i in range(batch)]
+    ready.wait()
+    go.wait()
+    sent = 0
+    while sent < count:
+        sent += endpoint.publish(records[:min(batch, count - sent)])
+    endpoint.close()
+
+
+def _consumer(names: List[str], shard: int, expected: int, ready, go, result):
+    endpoint = BusEndpoint(names, shard)
+    ready.wait()
+    go.wait()
+    received = 0
+    start = time.perf_counter()
+    while received < expected:
+        received += len(endpoint.consume())
+    result.put((shard, received, time.perf_counter() - start))
+    endpoint.close()
+
+
+def benchmark(workers: int = 2, records: int = 200000, batch: int = 256,
+              size: int = DEFAULT_RING_SIZE) -> dict:
+    """
+    Every worker publishes `records` chat records while reading everyone
+    else's; returns deliveries (records decoded by a reader) per second.
+    """
+    context = multiprocessing.get_context()
+    bus = ChatBus(workers, size)
+    ready = context.Barrier(workers * 2 + 1)
+    go = context.Barrier(workers * 2 + 1)
+    result = context.Queue()
+    processes = []
+    for shard in range(workers):
+        processes.append(context.Process(target=_publisher, args=(bus.names, shard, records, batch, ready, go)))
+        processes.append(context.Process(target=_consumer, args=(bus.names, shard, records * (workers - 1),
+                                                                  ready, go, result)))
+    try:
+        for process in processes:
+            process.start()
+        ready.wait()
+        start = time.perf_counter()
+        go.wait()
+        timings = [result.get() for _ in range(workers)]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+    finally:
+        bus.close()
+    deliveries = sum(received for _, received, _ in timings)
+    return {
+        'workers': workers,
+        'deliveries': deliveries,
+        'seconds': elapsed,
+        'deliveries_per_second': deliveries / elapsed if elapsed else math.inf,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat bus throughput benchmark")
+    parser.add_argument("--workers", type=int, default=2, help="processes publishing and reading")
+    parser.add_argument("--records", type=int, default=200000, help="records each worker publishes")
+    parser.add_argument("--batch", type=int, default=256, help="records per publish call")
+    args = parser.parse_args()
+
+    row = benchmark(args.workers, args.records, args.batch)
+    print(f"{row['deliveries']} deliveries across {row['workers']} workers in {row['seconds']:.2f}s: "
+          f"{row['deliveries_per_second']:.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+LSL Closure Compiler
+Turns parsed function and event bodies into trees of pre-bound Python closures.
+
+Compilation happens once when a script is loaded. Executing a handler is then a
+straight call into nested closures: no statement-type dispatch, no regex
+matching and no node walking at run time. Compiled statements follow the same
+protocol as `LSLSimulator._execute_statements`: they return None to continue or
+a ReturnValue / BREAK / CONTINUE signal.
+
+Variables are resolved to slots at compile time. Each body gets a SlotLayout
+(arguments first, then every local it declares) and its frames are created
+with that layout, so a local is read as `frames[-1].values[slot]`. Other names
+get a slot in the global frame. An unset slot (None) falls back to the
+interpreter's name lookup, which keeps its scoping rules for odd cases.
+
+Anything the compiler does not understand (legacy string statements, jumps,
+labels) raises CompileError and the body is left to the interpreter.
+"""
+
+from operator import add, mul, sub
+from typing import Any, Callable, Dict, List, Optional
+
+from lsl_simulator import API_LOG, Frame, ReturnValue, SlotLayout, BREAK, CONTINUE, argument_names
+
+DEFAULT_VALUES = {
+    "string": "",
+    "integer": 0,
+    "float": 0.0,
+    "key": "00000000-0000-0000-0000-000000000000",
+}
+
+MUTABLE_DEFAULTS = {
+    "vector": [0.0, 0.0, 0.0],
+    "rotation": [0.0, 0.0, 0.0, 1.0],
+    "list": [],
+}
+
+COMPONENTS = "xyzs"
+
+NUMBER_TYPES = (int, float)
+
+# Inline fast paths for numeric operands; anything else goes through the
+# evaluator's operator helpers so string/list semantics stay identical.
+NUMERIC_OPERATORS = {
+    "+": "l + r",
+    "-": "l - r",
+    "*": "l * r",
+    "<": "1 if l < r else 0",
+    ">": "1 if l > r else 0",
+    "<=": "1 if l <= r else 0",
+    ">=": "1 if l >= r else 0",
+    "==": "1 if l == r else 0",
+    "!=": "1 if l != r else 0",
+}
+
+FAST_COMPOUND = {
+    "+=": add,
+    "-=": sub,
+    "*=": mul,
+}
+
+_BINARY_TEMPLATE = """
+def factory(left, right, fallback, evaluator):
+    def binary():
+        l = left()
+        r = {right}
+        if l.__class__ in NUMBER_TYPES and r.__class__ in NUMBER_TYPES:
+            return {expression}
+        return fallback(evaluator, l, r)
+    return binary
+"""
+
+
+def _binary_factory(expression: str, constant_right: bool) -> Callable:
+    """Build a closure factory for one numeric operator from source"""
+    source = _BINARY_TEMPLATE.format(expression=expression, right="right" if constant_right else "right()")
+    namespace = {"NUMBER_TYPES": NUMBER_TYPES}
+    exec(compile(source, f"<lsl binary {expression}>", "exec"), namespace)
+    return namespace["factory"]
+
+
+BINARY_FACTORIES = {
+    (op, constant): _binary_factory(expression, constant)
+    for op, expression in NUMERIC_OPERATORS.items()
+    for constant in (False, True)
+}
+
+
+class CompileError(Exception):
+    """Raised for constructs the closure compiler does not support"""
+
+
+class CompiledBody:
+    """A compiled function or handler body and the slot layout its frames use"""
+    __slots__ = ("run", "layout")
+
+    def __init__(self, run: Callable, layout: SlotLayout):
+        self.run = run
+        self.layout = layout
+
+    def __call__(self):
+        return self.run()
+
+
+def declared_names(node: Any, names: List[str]):
+    """Collect the names of variable declarations anywhere inside a statement tree"""
+    if isinstance(node, list):
+        for item in node:
+            declared_names(item, names)
+    elif isinstance(node, dict):
+        if node.get("type") == "variable_declaration":
+            names.append(node["name"])
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                declared_names(value, names)
+
+
+class ScriptCompiler:
+    """Compiles statement and expression nodes into closures bound to one simulator"""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.evaluator = simulator.expression_evaluator
+        self.call_stack = simulator.call_stack
+        self.errors = []
+        self.layout = SlotLayout()
+
+    # =========================================================================
+    # Script level
+    # =========================================================================
+
+    def compile_script(self, user_functions: Dict[str, Any], states: Dict[str, Any]):
+        """
+        Compile every function and event body.
+        Returns (functions, handlers) where handlers is keyed by (state, event).
+        Bodies that fail to compile are omitted and run on the interpreter.
+        """
+        functions = {}
+        for name, func_def in user_functions.items():
+            compiled = self.try_compile_body(func_def.get("body", []), f"function {name}",
+                                             argument_names(func_def.get("args", [])))
+            if compiled is not None:
+                functions[name] = compiled
+
+        handlers = {}
+        for state_name, events in states.items():
+            for event_name, handler in events.items():
+                compiled = self.try_compile_body(handler.get("body", []), f"{state_name}.{event_name}",
+                                                 argument_names(handler.get("args", [])))
+                if compiled is not None:
+                    handlers[(state_name, event_name)] = compiled
+
+        return functions, handlers
+
+    def try_compile_body(self, body: List[Any], where: str = "",
+                         arg_names: List[str] = ()) -> Optional[CompiledBody]:
+        """Compile a body, recording the reason and returning None on failure"""
+        names = list(arg_names)
+        declared_names(body, names)
+        self.layout = SlotLayout(names)
+        try:
+            return CompiledBody(self.compile_block(body), self.layout)
+        except CompileError as e:
+            self.errors.append(f"{where}: {e}")
+            return None
+
+    # =========================================================================
+    # Statements
+    # =========================================================================
+
+    def compile_block(self, statements: List[Any]) -> Callable:
+        """Compile a statement list into one closure"""
+        compiled = tuple(self.compile_statement(stmt) for stmt in statements)
+
+        if not compiled:
+            return lambda: None
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def block():
+            for stmt in compiled:
+                result = stmt()
+                if result is not None:
+                    return result
+            return None
+        return block
+
+    def compile_statement(self, stmt: Any) -> Callable:
+        """Compile a single statement node"""
+        if not isinstance(stmt, dict):
+            raise CompileError(f"unstructured statement: {str(stmt)[:40]!r}")
+
+        stmt_type = stmt.get("type")
+        method = getattr(self, f"_compile_{stmt_type}", None)
+        if method is None:
+            raise CompileError(f"unsupported statement type: {stmt_type}")
+        return method(stmt)
+
+    def _compile_body(self, body: Any) -> Callable:
+        """Compile a branch or loop body given as a list or a single statement"""
+        if body is None:
+            return lambda: None
+        if isinstance(body, list):
+            return self.compile_block(body)
+        return self.compile_statement(body)
+
+    def _compile_expression_statement(self, stmt):
+        expr = self.compile_expression(stmt["expression"])
+
+        def expression_statement():
+            expr()
+        return expression_statement
+
+    def _compile_variable_declaration(self, stmt):
+        index = self.layout.slot(stmt["name"])
+        frames = self.call_stack.frames
+        var_type = stmt.get("var_type") or stmt.get("lsl_type", "string")
+
+        if stmt.get("value") is not None:
+            value = self.compile_expression(stmt["value"])
+        elif var_type in MUTABLE_DEFAULTS:
+            default = MUTABLE_DEFAULTS[var_type]
+            value = lambda: list(default)
+        else:
+            default = DEFAULT_VALUES.get(var_type, "")
+            value = lambda: default
+
+        def declare():
+            frames[-1].values[index] = value()
+        return declare
+
+    def _compile_assignment(self, stmt):
+        var_name, _, component = stmt["lvalue"].partition(".")
+        operator = stmt["operator"]
+        value = self.compile_expression(stmt["expression"])
+        load, store = self._variable(var_name)
+        evaluator = self.evaluator
+
+        if operator == "=":
+            op_func = None
+        else:
+            try:
+                op_func = evaluator._binary_operators[operator[:-1]]
+            except KeyError:
+                raise CompileError(f"unsupported assignment operator: {operator}")
+
+        if not component:
+            if op_func is None:
+                def assign():
+                    store(value())
+                return assign
+
+            fast = FAST_COMPOUND.get(operator)
+
+            def compound_assign():
+                new_value = value()
+                current = load()
+                if current is None:
+                    current = "" if isinstance(new_value, str) else 0
+                if fast and current.__class__ in NUMBER_TYPES and new_value.__class__ in NUMBER_TYPES:
+                    store(fast(current, new_value))
+                else:
+                    store(op_func(evaluator, current, new_value))
+            return compound_assign
+
+        index = COMPONENTS.find(component)
+
+        def assign_component():
+            new_value = value()
+            current = load()
+            vector = list(current) if isinstance(current, list) else [0.0, 0.0, 0.0]
+            if 0 <= index < len(vector):
+                if op_func is not None:
+                    new_value = op_func(evaluator, vector[index], new_value)
+                vector[index] = float(new_value)
+            store(vector)
+        return assign_component
+
+    def _compile_compound(self, stmt):
+        return self.compile_block(stmt.get("statements", []))
+
+    def _compile_if_statement(self, stmt):
+        condition = self.compile_expression(stmt["condition"])
+        then_branch = self._compile_body(stmt.get("then_statement"))
+        if stmt.get("else_statement") is None:
+            def if_then():
+                if condition():
+                    return then_branch()
+                return None
+            return if_then
+
+        else_branch = self._compile_body(stmt["else_statement"])
+
+        def if_else():
+            if condition():
+                return then_branch()
+            return else_branch()
+        return if_else
+
+    def _compile_while_statement(self, stmt):
+        condition = self.compile_expression(stmt["condition"])
+        body = self._compile_body(stmt.get("statement"))
+        simulator = self.simulator
+
+        def while_loop():
+            while simulator._is_running and condition():
+                result = body()
+                if result is not None and result is not CONTINUE:
+                    return None if result is BREAK else result
+            return None
+        return while_loop
+
+    def _compile_do_while_statement(self, stmt):
+        condition = self.compile_expression(stmt["condition"])
+        body = self._compile_body(stmt.get("statement"))
+        simulator = self.simulator
+
+        def do_while_loop():
+            while simulator._is_running:
+                result = body()
+                if result is not None and result is not CONTINUE:
+                    return None if result is BREAK else result
+                if not condition():
+                    break
+            return None
+        return do_while_loop
+
+    def _compile_for_statement(self, stmt):
+        init = self.compile_statement(stmt["init"]) if stmt.get("init") else (lambda: None)
+        condition = self.compile_expression(stmt["condition"]) if stmt.get("condition") else (lambda: 1)
+        update = self.compile_expression(stmt["update"]) if stmt.get("update") else (lambda: None)
+        body = self._compile_body(stmt.get("statement"))
+        simulator = self.simulator
+
+        def for_loop():
+            init()
+            while simulator._is_running and condition():
+                result = body()
+                if result is not None and result is not CONTINUE:
+                    return None if result is BREAK else result
+                update()
+            return None
+        return for_loop
+
+    def _compile_return_statement(self, stmt):
+        if stmt.get("expression") is None:
+            return lambda: ReturnValue()
+        value = self.compile_expression(stmt["expression"])
+        return lambda: ReturnValue(value())
+
+    def _compile_state_change(self, stmt):
+        state = stmt["state"]
+        simulator = self.simulator
+
+        def state_change():
+            simulator._change_state(state)
+            return ReturnValue()
+        return state_change
+
+    def _compile_break(self, stmt):
+        return lambda: BREAK
+
+    def _compile_continue(self, stmt):
+        return lambda: CONTINUE
+
+    # =========================================================================
+    # Expressions
+    # =========================================================================
+
+    def compile_expression(self, node: Any) -> Callable:
+        """Compile an expression node into a zero-argument closure"""
+        if not isinstance(node, dict):
+            raise CompileError(f"unstructured expression: {str(node)[:40]!r}")
+
+        node_type = node.get("type")
+        method = getattr(self, f"_compile_expr_{node_type}", None)
+        if method is None:
+            raise CompileError(f"unsupported expression type: {node_type}")
+        return method(node)
+
+    def _compile_expr_literal(self, node):
+        value = node["value"]
+        return lambda: value
+
+    def _compile_expr_identifier(self, node):
+        name = node["name"]
+        lookup = self.evaluator._lookup_variable
+        index = self.layout.index.get(name)
+
+        if index is not None:
+            frames = self.call_stack.frames
+
+            def local_identifier():
+                value = frames[-1].values[index]
+                return lookup(name) if value is None else value
+            return local_identifier
+
+        global_scope = self.simulator.global_scope
+        global_values = global_scope.values
+        global_index = global_scope.reserve(name)
+
+        def global_identifier():
+            value = global_values[global_index]
+            return lookup(name) if value is None else value
+        return global_identifier
+
+    def _compile_expr_binary(self, node):
+        op = node["op"]
+        left = self.compile_expression(node["left"])
+        right = self.compile_expression(node["right"])
+
+        # LSL does not short-circuit: both sides run, for their side effects too
+        if op == "&&":
+            def logical_and():
+                left_value = left()
+                return int(bool(right()) and bool(left_value))
+            return logical_and
+        if op == "||":
+            def logical_or():
+                left_value = left()
+                return int(bool(right()) or bool(left_value))
+            return logical_or
+
+        try:
+            op_func = self.evaluator._binary_operators[op]
+        except KeyError:
+            raise CompileError(f"unsupported operator: {op}")
+        evaluator = self.evaluator
+
+        if op in NUMERIC_OPERATORS:
+            if node["right"]["type"] == "literal":
+                return BINARY_FACTORIES[(op, True)](left, node["right"]["value"], op_func, evaluator)
+            return BINARY_FACTORIES[(op, False)](left, right, op_func, evaluator)
+        return lambda: op_func(evaluator, left(), right())
+
+    def _compile_expr_unary(self, node):
+        op = node["op"]
+        operand = self.compile_expression(node["operand"])
+        unary = self.evaluator._unary
+        return lambda: unary(op, operand())
+
+    def _compile_expr_cast(self, node):
+        cast_type = node["cast_type"]
+        expression = self.compile_expression(node["expression"])
+        cast = self.evaluator._cast
+        return lambda: cast(cast_type, expression())
+
+    def _compile_expr_member(self, node):
+        member = node["member"]
+        obj = self.compile_expression(node["object"])
+        get_component = self.simulator._get_component
+        return lambda: get_component(obj(), member)
+
+    def _compile_expr_index(self, node):
+        obj = self.compile_expression(node["object"])
+        index = self.compile_expression(node["index"])
+
+        def index_access():
+            try:
+                return obj()[index()]
+            except (IndexError, KeyError, TypeError):
+                return None
+        return index_access
+
+    def _compile_expr_vector(self, node):
+        elements = tuple(self.compile_expression(e) for e in node["elements"])
+
+        def vector():
+            result = []
+            for element in elements:
+                try:
+                    result.append(float(element()))
+                except (ValueError, TypeError):
+                    result.append(0.0)
+            return result
+        return vector
+
+    _compile_expr_rotation = _compile_expr_vector
+
+    def _compile_expr_list(self, node):
+        elements = tuple(self.compile_expression(e) for e in node["elements"])
+        return lambda: [element() for element in elements]
+
+    def _compile_expr_call(self, node):
+        name = node["name"]
+        args = tuple(self.compile_expression(arg) for arg in node["args"])
+        simulator = self.simulator
+
+        if name in simulator.user_functions:
+            return self._compile_user_call(name, args)
+
+        # The call site keeps its slot in the linker's dispatch array, so a relink reaches it
+        slot = simulator.linker.slot(name)
+        targets = simulator.linker.targets
+
+        def api_call():
+            values = [arg() for arg in args]
+            if API_LOG.debug_on:
+                API_LOG.debug("%s called with %s", name, values)
+            return targets[slot](*values)
+        return api_call
+
+    def _compile_user_call(self, name, args):
+        """Call a user function, entering its compiled body directly when there is one"""
+        simulator = self.simulator
+        frames = self.call_stack.frames
+        global_scope = simulator.global_scope
+        call_user = simulator._call_user_function
+        # Arguments occupy the first slots of the callee's layout
+        args = args[:len(argument_names(simulator.user_functions[name].get("args", [])))]
+
+        def user_call():
+            body = simulator.compiled_functions.get(name)
+            if body is None:
+                return call_user(name, [arg() for arg in args])
+            frame = Frame(frames[-1] if frames else global_scope, body.layout)
+            values = frame.values
+            for index, arg in enumerate(args):
+                values[index] = arg()
+            frames.append(frame)
+            try:
+                result = body.run()
+            finally:
+                frames.pop()
+            return result.value if result.__class__ is ReturnValue else None
+        return user_call
+
+    def _compile_expr_postfix(self, node):
+        load, store = self._variable(self._target_name(node["operand"]))
+        delta = 1 if node["op"] == "++" else -1
+
+        def postfix():
+            value = load()
+            if value is None:
+                value = 0
+            store(value + delta)
+            return value
+        return postfix
+
+    def _compile_expr_assign(self, node):
+        name = self._target_name(node["target"])
+        op = node["op"]
+        value = self.compile_expression(node["value"])
+        store = self._variable(name)[1]
+        evaluator = self.evaluator
+
+        if op == "=":
+            def assign():
+                result = value()
+                store(result)
+                return result
+            return assign
+
+        try:
+            op_func = evaluator._binary_operators[op[:-1]]
+        except KeyError:
+            raise CompileError(f"unsupported assignment operator: {op}")
+
+        def compound_assign():
+            result = op_func(evaluator, evaluator._lookup_variable(name), value())
+            store(result)
+            return result
+        return compound_assign
+
+    # =========================================================================
+    # Helpers
+    # =========================================================================
+
+    def _target_name(self, node: Dict[str, Any]) -> str:
+        if node.get("type") != "identifier":
+            raise CompileError(f"cannot assign to {node.get('type')}")
+        return node["name"]
+
+    def _variable(self, name: str):
+        """
+        (load, store) closures for a variable resolved to its slot.
+        load returns None for an unset variable; storing to an unset one assigns
+        wherever the interpreter would (an enclosing scope, else the current frame).
+        """
+        call_stack = self.call_stack
+        frames = call_stack.frames
+        find_variable = call_stack.find_variable
+        find_scope = self.simulator._find_variable_scope
+        index = self.layout.index.get(name)
+
+        if index is not None:
+            def load_local():
+                value = frames[-1].values[index]
+                return find_variable(name) if value is None else value
+
+            def store_local(value):
+                values = frames[-1].values
+                if values[index] is None:
+                    scope = find_scope(name)
+                    if scope is not None:
+                        scope.set(name, value)
+                        return
+                values[index] = value
+            return load_local, store_local
+
+        global_scope = self.simulator.global_scope
+        global_values = global_scope.values
+        global_index = global_scope.reserve(name)
+
+        def load_global():
+            value = global_values[global_index]
+            return find_variable(name) if value is None else value
+
+        def store_global(value):
+            if global_values[global_index] is None:
+                (find_scope(name) or call_stack.get_current_scope()).set(name, value)
+            else:
+                global_values[global_index] = value
+        return load_global, store_global
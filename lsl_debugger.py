@@ -2,7 +2,8 @@ import argparse
 import threading
 import time
 import readline
-from lsl_antlr_parser import LSLParser
+from lsl_log import LogWriter, configure
+from lsl_script_cache import load_script
 from lsl_simulator import LSLSimulator
 
 def print_source_line_with_context(simulator):
@@ -302,7 +303,11 @@ def setup_autocompletion(simulator):
 def main():
     parser = argparse.ArgumentParser(description="Debug an LSL script step-by-step.")
     parser.add_argument("filename", help="The LSL script file to debug.")
+    parser.add_argument("--log", metavar="SPEC",
+                        help="Log levels, e.g. 'debug' or 'event=debug,api=info' (default: warnings, plus chat)")
     args = parser.parse_args()
+    # Interactive: write each line as it comes rather than in batches
+    configure(args.log, writer=LogWriter(capacity=1))
 
     try:
         with open(args.filename, "r") as f:
@@ -312,8 +317,7 @@ def main():
         return
 
     print("--- LSL Debugger ---")
-    lsl_parser = LSLParser()
-    parsed_script = lsl_parser.parse(lsl_code)
+    parsed_script = load_script(args.filename, lsl_code)
     
     simulator = LSLSimulator(parsed_script, debug_mode=True, source_code=lsl_code)
     
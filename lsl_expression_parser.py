@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+LSL Expression Parser
+Single-pass tokenizer plus precedence-climbing parser for expression strings.
+
+Produces the same typed expression nodes as the ANTLR visitor
+(`lsl_antlr_parser`), so `SimpleExpressionEvaluator.evaluate_node` runs both.
+Tokenizing and parsing are linear in the length of the expression; long
+`+`-chained messages no longer rescan their prefix for every operator.
+
+Casts bind like unary operators, as in LSL: `(string)a + b` casts only `a`.
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+NULL_KEY = "00000000-0000-0000-0000-000000000000"
+
+LSL_TYPES = {"integer", "float", "string", "key", "vector", "rotation", "list"}
+
+LITERAL_NAMES = {"TRUE": 1, "FALSE": 0, "NULL_KEY": NULL_KEY}
+
+COMPONENTS = {"x", "y", "z", "s"}
+
+# Binary operator precedence, loosest first (matches LSL.g4)
+BINARY_PRECEDENCE = {
+    "||": 1,
+    "&&": 2,
+    "|": 3,
+    "^": 4,
+    "&": 5,
+    "==": 6, "!=": 6,
+    "<": 7, "<=": 7, ">": 7, ">=": 7,
+    "<<": 8, ">>": 8,
+    "+": 9, "-": 9,
+    "*": 10, "/": 10, "%": 10,
+}
+
+ASSIGNMENT_OPERATORS = {"=", "+=", "-=", "*=", "/=", "%="}
+
+# Vector components stop at relational operators so the closing '>' ends the literal
+VECTOR_ELEMENT_PRECEDENCE = BINARY_PRECEDENCE["<<"]
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<float>(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|\d+[eE][-+]?\d+)
+      | (?P<hex>0[xX][0-9a-fA-F]+)
+      | (?P<int>\d+)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op>\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%]=|[-+*/%<>=!~&|^(),.\[\]])
+    )""", re.VERBOSE)
+
+_END = ("end", None)
+
+
+class ExpressionSyntaxError(ValueError):
+    """Raised when a string is not a well-formed LSL expression"""
+
+
+def unescape_string(text: str) -> str:
+    """Apply LSL string escapes (\\n, \\t, \\", \\\\) to the body of a string literal"""
+    if "\\" not in text:
+        return text
+    result = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            i += 1
+            char = {"n": "\n", "t": "    "}.get(text[i], text[i])
+        result.append(char)
+        i += 1
+    return "".join(result)
+
+
+def tokenize(expr: str) -> List[Tuple[str, Any]]:
+    """Split an expression into (kind, value) tokens in one pass"""
+    tokens = []
+    position = 0
+    length = len(expr)
+    while position < length:
+        match = _TOKEN_RE.match(expr, position)
+        if match is None or match.end() == position:
+            if expr[position:].strip():
+                raise ExpressionSyntaxError(f"unexpected character at {position}: {expr[position:position + 10]!r}")
+            break
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "int":
+            tokens.append(("number", int(text)))
+        elif kind == "hex":
+            tokens.append(("number", int(text, 16)))
+        elif kind == "float":
+            tokens.append(("number", float(text)))
+        elif kind == "string":
+            tokens.append(("string", unescape_string(text[1:-1])))
+        else:
+            tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+def parse_expression(expr: str) -> Dict[str, Any]:
+    """Parse an LSL expression string into a typed expression node"""
+    return _Parser(tokenize(expr)).parse()
+
+
+class _Parser:
+    """Precedence-climbing parser over a token list"""
+
+    def __init__(self, tokens: List[Tuple[str, Any]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Tuple[str, Any]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return _END
+
+    def advance(self) -> Tuple[str, Any]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, op: str):
+        token = self.advance()
+        if token != ("op", op):
+            raise ExpressionSyntaxError(f"expected {op!r}, found {token[1]!r}")
+
+    def accept(self, op: str) -> bool:
+        if self.peek() == ("op", op):
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Dict[str, Any]:
+        if not self.tokens:
+            raise ExpressionSyntaxError("empty expression")
+        node = self.assignment()
+        if self.position != len(self.tokens):
+            raise ExpressionSyntaxError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def assignment(self) -> Dict[str, Any]:
+        """Assignments are right associative and bind loosest"""
+        node = self.binary(1)
+        kind, value = self.peek()
+        if kind == "op" and value in ASSIGNMENT_OPERATORS:
+            if node["type"] != "identifier":
+                raise ExpressionSyntaxError("invalid assignment target")
+            self.position += 1
+            return {"type": "assign", "op": value, "target": node, "value": self.assignment()}
+        return node
+
+    def binary(self, min_precedence: int) -> Dict[str, Any]:
+        node = self.unary()
+        while True:
+            kind, op = self.peek()
+            precedence = BINARY_PRECEDENCE.get(op) if kind == "op" else None
+            if precedence is None or precedence < min_precedence:
+                return node
+            self.position += 1
+            right = self.binary(precedence + 1)
+            node = {"type": "binary", "op": op, "left": node, "right": right}
+
+    def unary(self) -> Dict[str, Any]:
+        kind, value = self.peek()
+        if kind == "op":
+            if value in ("-", "!", "~", "+"):
+                self.position += 1
+                operand = self.unary()
+                if value == "+":
+                    return operand
+                if value == "-" and operand["type"] == "literal" and isinstance(operand["value"], (int, float)):
+                    return {"type": "literal", "value": -operand["value"]}
+                return {"type": "unary", "op": value, "operand": operand}
+            if value == "(" and self._is_cast():
+                cast_type = self.tokens[self.position + 1][1]
+                self.position += 3
+                return {"type": "cast", "cast_type": cast_type, "expression": self.unary()}
+        return self.postfix()
+
+    def _is_cast(self) -> bool:
+        tokens = self.tokens
+        i = self.position
+        return (i + 2 < len(tokens) and tokens[i + 1][0] == "name" and tokens[i + 1][1] in LSL_TYPES
+                and tokens[i + 2] == ("op", ")"))
+
+    def postfix(self) -> Dict[str, Any]:
+        node = self.primary()
+        while True:
+            kind, value = self.peek()
+            if kind != "op":
+                return node
+            if value == "(" and node["type"] == "identifier":
+                self.position += 1
+                node = {"type": "call", "name": node["name"], "args": self.arguments(")")}
+            elif value == ".":
+                self.position += 1
+                kind, member = self.advance()
+                if kind != "name" or member not in COMPONENTS:
+                    raise ExpressionSyntaxError(f"invalid component {member!r}")
+                node = {"type": "member", "object": node, "member": member}
+            elif value in ("++", "--"):
+                self.position += 1
+                node = {"type": "postfix", "op": value, "operand": node}
+            else:
+                return node
+
+    def primary(self) -> Dict[str, Any]:
+        kind, value = self.advance()
+        if kind in ("number", "string"):
+            return {"type": "literal", "value": value}
+        if kind == "name":
+            if value in LITERAL_NAMES:
+                return {"type": "literal", "value": LITERAL_NAMES[value]}
+            return {"type": "identifier", "name": value}
+        if kind == "op":
+            if value == "(":
+                node = self.assignment()
+                self.expect(")")
+                return node
+            if value == "[":
+                return {"type": "list", "elements": self.arguments("]")}
+            if value == "<":
+                return self.vector()
+        raise ExpressionSyntaxError(f"unexpected {value!r}")
+
+    def arguments(self, closing: str) -> List[Dict[str, Any]]:
+        """Comma separated expressions up to the closing bracket"""
+        items = []
+        if self.accept(closing):
+            return items
+        while True:
+            items.append(self.assignment())
+            if self.accept(closing):
+                return items
+            self.expect(",")
+
+    def vector(self) -> Dict[str, Any]:
+        elements = [self.binary(VECTOR_ELEMENT_PRECEDENCE)]
+        while self.accept(","):
+            elements.append(self.binary(VECTOR_ELEMENT_PRECEDENCE))
+        self.expect(">")
+        if len(elements) == 3:
+            return {"type": "vector", "elements": elements}
+        if len(elements) == 4:
+            return {"type": "rotation", "elements": elements}
+        raise ExpressionSyntaxError(f"vector literal with {len(elements)} components")
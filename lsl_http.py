@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+LSL HTTP Client
+llHTTPRequest through one shared client, with LSL's throttle and concurrency limits.
+
+Every script of a region (or a standalone script) sends its requests through
+an HttpClient. The key llHTTPRequest returns is the request's id, and the
+http_response event for it carries the same key. Like a prim in Second Life,
+a script may start at most THROTTLE_REQUESTS requests per THROTTLE_WINDOW
+seconds; past that llHTTPRequest returns NULL_KEY and nothing is sent.
+Requests that pass the throttle wait in one FIFO queue until both a global
+slot (max_in_flight) and one of the script's own slots (max_per_script) are
+free, so one chatty script cannot hold every connection.
+
+Where a request goes is up to the client's transport:
+
+  CannedTransport   the built-in answers for /register, /hook and /talk
+                    (the default, so scripts run with no backend at all)
+  WSGITransport     calls a WSGI application - such as the Flask app in
+                    mock_nexus_server.py - in-process, with no sockets
+  SessionTransport  real HTTP over one pooled, keep-alive requests.Session
+  Recorder          wraps another transport and appends every exchange,
+                    with its latency, to a JSONL cassette
+  Cassette          replays a cassette with no backend, at recorded
+                    latency or at a fixed one (0 for full speed)
+
+A cassette has one JSON object per line: method, url, body, status,
+response, headers and latency. Replay matches a request by method and URL,
+taking that URL's recordings in order but preferring one recorded with the
+same body, so runs whose bodies carry fresh object keys still line up.
+
+In-process transports answer at once and the client delivers the response
+after the transport's latency on the scheduler, so a region on a virtual
+clock stays deterministic. SessionTransport requests run on a thread pool
+sized to max_in_flight and are delivered when they finish; failures become
+status 499, as in LSL.
+
+On an asyncio loop (a scheduler with a `loop`, as AsyncRuntime's), a request
+that does not answer inline is a task on that loop instead: it awaits the
+transport's `send_async(request)` coroutine if it has one, so the round trip
+needs no thread at all, and otherwise runs `send` in the loop's executor.
+"""
+
+import asyncio
+
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+NULL_KEY = "00000000-0000-0000-0000-000000000000"
+
+# llHTTPRequest parameters (the simulator also accepts its older string names)
+HTTP_METHOD = 0
+HTTP_MIMETYPE = 1
+HTTP_BODY_MAXLENGTH = 2
+HTTP_VERIFY_CERT = 3
+HTTP_VERBOSE_THROTTLE = 4
+HTTP_CUSTOM_HEADER = 5
+HTTP_PRAGMA_NO_CACHE = 6
+PARAMETER_NAMES = {"method": HTTP_METHOD, "mimetype": HTTP_MIMETYPE, "body_maxlength": HTTP_BODY_MAXLENGTH,
+                   "verify_cert": HTTP_VERIFY_CERT, "header": HTTP_CUSTOM_HEADER}
+# http_response metadata: the body was cut at this many characters
+HTTP_BODY_TRUNCATED = 0
+
+DEFAULT_MIMETYPE = "text/plain;charset=utf-8"
+DEFAULT_BODY_MAXLENGTH = 2048
+# Status LSL reports when a request fails without a response
+FAILED_STATUS = 499
+
+# Per-script throttle, as Second Life applies per prim
+THROTTLE_REQUESTS = 25
+THROTTLE_WINDOW = 20.0
+MAX_IN_FLIGHT = 32
+MAX_PER_SCRIPT = 4
+
+# Simulated round trip of the in-process transports, in seconds
+SIMULATED_LATENCY = 0.5
+DEFAULT_TIMEOUT = 60.0
+
+
+class HttpRequest:
+    """One llHTTPRequest, from the script that made it"""
+
+    __slots__ = ("request_id", "owner", "url", "method", "headers", "body", "max_body", "verify")
+
+    def __init__(self, request_id: str, owner: Any, url: str, method: str, headers: Dict[str, str],
+                 body: str, max_body: int = DEFAULT_BODY_MAXLENGTH, verify: bool = True):
+        self.request_id = request_id
+        self.owner = owner
+        self.url = url
+        self.method = method
+        self.headers = headers
+        self.body = body
+        self.max_body = max_body
+        self.verify = verify
+
+
+class HttpResponse:
+    """What a transport got back, and how long it took (or is to take) in seconds"""
+
+    __slots__ = ("status", "body", "headers", "latency")
+
+    def __init__(self, status: int, body: str, headers: Optional[Dict[str, str]] = None, latency: float = 0.0):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.latency = latency
+
+
+def parse_parameters(parameters: List[Any]) -> Dict[str, Any]:
+    """llHTTPRequest's parameter list as method, headers, max_body and verify"""
+    options = {'method': "GET", 'headers': {"Content-Type": DEFAULT_MIMETYPE},
+               'max_body': DEFAULT_BODY_MAXLENGTH, 'verify': True}
+    items = list(parameters or [])
+    i = 0
+    while i < len(items):
+        flag = PARAMETER_NAMES.get(items[i], items[i])
+        if flag == HTTP_CUSTOM_HEADER and i + 2 < len(items):
+            options['headers'][str(items[i + 1])] = str(items[i + 2])
+            i += 3
+            continue
+        value = items[i + 1] if i + 1 < len(items) else None
+        if flag == HTTP_METHOD and value is not None:
+            options['method'] = str(value).upper()
+        elif flag == HTTP_MIMETYPE and value is not None:
+            options['headers']["Content-Type"] = str(value)
+        elif flag == HTTP_BODY_MAXLENGTH and value is not None:
+            options['max_body'] = int(value)
+        elif flag == HTTP_VERIFY_CERT and value is not None:
+            options['verify'] = bool(value)
+        i += 2
+    return options
+
+
+# =============================================================================
+# Transports
+# =============================================================================
+
+class CannedTransport:
+    """Fixed answers by URL, for running NPC scripts with no backend"""
+
+    inline = True
+
+    def __init__(self, latency: float = SIMULATED_LATENCY):
+        self.latency = latency
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        url = request.url
+        if "/register" in url:
+            status, body = 200, '{"status": "registered", "message": "NPC registered successfully"}'
+        elif "/hook" in url:
+            status, body = 200, '{"say": "Hello! How can I help you today?", "text_display": "Ready to assist"}'
+        elif "/talk" in url:
+            status, body = 200, '{"say": "That\'s interesting! Tell me more.", "text_display": "Listening..."}'
+        else:
+            status, body = 404, '{"error": "Endpoint not found"}'
+        return HttpResponse(status, body, {"Content-Type": "application/json"}, self.latency)
+
+
+class WSGITransport:
+    """Calls a WSGI application in-process: the URL's path and query go to `app`, no socket is opened"""
+
+    inline = True
+
+    def __init__(self, app: Callable, latency: float = SIMULATED_LATENCY):
+        self.app = app
+        self.latency = latency
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        parts = urlsplit(request.url)
+        data = request.body.encode("utf-8")
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote(parts.path) or "/",
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": parts.hostname or "localhost",
+            "SERVER_PORT": str(parts.port or (443 if parts.scheme == "https" else 80)),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(data)),
+            "HTTP_HOST": parts.netloc or "localhost",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": parts.scheme or "http",
+            "wsgi.input": io.BytesIO(data),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in request.headers.items():
+            field = name.upper().replace("-", "_")
+            if field == "CONTENT_TYPE":
+                environ[field] = value
+            else:
+                environ["HTTP_" + field] = value
+
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        chunks = self.app(environ, start_response)
+        try:
+            body = b"".join(chunks)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        status, headers = started
+        return HttpResponse(int(status.split()[0]), body.decode("utf-8", "replace"), dict(headers), self.latency)
+
+
+class SessionTransport:
+    """Real HTTP over one requests.Session, keeping up to `pool_size` connections per host alive"""
+
+    inline = False
+
+    def __init__(self, pool_size: int = MAX_IN_FLIGHT, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = self.session.request(request.method, request.url, data=request.body.encode("utf-8"),
+                                        headers=request.headers, timeout=self.timeout, verify=request.verify)
+        return HttpResponse(response.status_code, response.text, dict(response.headers),
+                            time.perf_counter() - start)
+
+    def close(self):
+        self.session.close()
+
+
+class CassetteMiss(LookupError):
+    """A replayed request that the cassette has no (more) recordings for"""
+
+
+class Recorder:
+    """Sends through `transport` and appends each exchange to the cassette at `path`"""
+
+    def __init__(self, transport, path: str):
+        self.transport = transport
+        self.inline = transport.inline
+        self.path = path
+        self.lock = threading.Lock()
+        self.recorded = 0
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        response = self.transport.send(request)
+        line = json.dumps({'method': request.method, 'url': request.url, 'body': request.body,
+                           'status': response.status, 'response': response.body,
+                           'headers': response.headers, 'latency': response.latency})
+        with self.lock, open(self.path, "a", encoding="utf-8") as cassette:
+            cassette.write(line + "\n")
+            self.recorded += 1
+        return response
+
+    def close(self):
+        if hasattr(self.transport, "close"):
+            self.transport.close()
+
+
+class Cassette:
+    """
+    Replays a recorded cassette in-process. `latency=None` keeps each
+    exchange's recorded latency; a number replaces it (0 replays at full
+    speed).
+    """
+
+    inline = True
+
+    def __init__(self, path: str, latency: Optional[float] = None):
+        self.path = path
+        self.latency = latency
+        self.exchanges: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        with open(path, encoding="utf-8") as cassette:
+            for line in cassette:
+                if line.strip():
+                    exchange = json.loads(line)
+                    self.exchanges.setdefault((exchange['method'], exchange['url']), []).append(exchange)
+        self.replayed = 0
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        recordings = self.exchanges.get((request.method, request.url))
+        if not recordings:
+            raise CassetteMiss(f"no recording left for {request.method} {request.url}")
+        index = next((i for i, exchange in enumerate(recordings) if exchange['body'] == request.body), 0)
+        exchange = recordings.pop(index)
+        self.replayed += 1
+        latency = exchange['latency'] if self.latency is None else self.latency
+        return HttpResponse(exchange['status'], exchange['response'], exchange['headers'], latency)
+
+    def remaining(self) -> int:
+        return sum(len(recordings) for recordings in self.exchanges.values())
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+class HttpClient:
+    """llHTTPRequest for a set of scripts sharing one transport and one set of limits"""
+
+    def __init__(self, scheduler, transport=None, max_in_flight: int = MAX_IN_FLIGHT,
+                 max_per_script: int = MAX_PER_SCRIPT, throttle_requests: int = THROTTLE_REQUESTS,
+                 throttle_window: float = THROTTLE_WINDOW):
+        self.scheduler = scheduler
+        self.transport = transport if transport is not None else CannedTransport()
+        self.max_in_flight = max_in_flight
+        self.max_per_script = max_per_script
+        self.throttle_requests = throttle_requests
+        self.throttle_window = throttle_window
+        self.lock = threading.Lock()
+        self.waiting: Deque[HttpRequest] = deque()
+        self.in_flight = 0
+        self.script_in_flight: Dict[int, int] = {}
+        # Start times of each script's recent requests, for the throttle
+        self.recent: Dict[int, Deque[float]] = {}
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # An asyncio scheduler's loop: round trips are tasks on it rather than pool threads
+        self.loop: Optional[asyncio.AbstractEventLoop] = getattr(scheduler, "loop", None)
+        self.tasks = set()
+        self.requests = 0
+        self.throttled = 0
+        self.completed = 0
+        self.failed = 0
+        self.peak_in_flight = 0
+
+    def request(self, owner: Any, url: str, parameters: List[Any], body: str) -> str:
+        """llHTTPRequest from script `owner`: the request key, or NULL_KEY when throttled"""
+        now = self.scheduler.clock()
+        with self.lock:
+            recent = self.recent.setdefault(id(owner), deque())
+            while recent and recent[0] <= now - self.throttle_window:
+                recent.popleft()
+            if len(recent) >= self.throttle_requests:
+                self.throttled += 1
+                return NULL_KEY
+            recent.append(now)
+            self.requests += 1
+
+        options = parse_parameters(parameters)
+        headers = options['headers']
+        headers.setdefault("X-SecondLife-Object-Key", getattr(owner, "object_key", NULL_KEY))
+        headers.setdefault("X-SecondLife-Object-Name", getattr(owner, "object_name", "Object"))
+        request = HttpRequest(str(uuid.uuid4()), owner, url, options['method'], headers, body,
+                              options['max_body'], options['verify'])
+        with self.lock:
+            self.waiting.append(request)
+        self._start_waiting()
+        return request.request_id
+
+    def _start_waiting(self):
+        """Send waiting requests, oldest first, while global and per-script slots are free"""
+        ready = []
+        with self.lock:
+            held = deque()
+            while self.waiting and self.in_flight < self.max_in_flight:
+                request = self.waiting.popleft()
+                script = id(request.owner)
+                count = self.script_in_flight.get(script, 0)
+                if count >= self.max_per_script:
+                    held.append(request)
+                    continue
+                self.script_in_flight[script] = count + 1
+                self.in_flight += 1
+                ready.append(request)
+            held.extend(self.waiting)
+            self.waiting = held
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        for request in ready:
+            if self.transport.inline:
+                response = self._send(request)
+                self.scheduler.call_later(response.latency, self._complete, request, response)
+            elif self.loop is not None:
+                task = self.loop.create_task(self._run_async(request))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+            else:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix="lsl-http")
+                self.executor.submit(self._run, request)
+
+    def _send(self, request: HttpRequest) -> HttpResponse:
+        try:
+            return self.transport.send(request)
+        except Exception as error:
+            with self.lock:
+                self.failed += 1
+            return HttpResponse(FAILED_STATUS, str(error))
+
+    def _run(self, request: HttpRequest):
+        """Pool thread: a blocking transport's round trip"""
+        self._complete(request, self._send(request))
+
+    async def _run_async(self, request: HttpRequest):
+        """Loop task: a transport's round trip, awaited on the scheduler's loop"""
+        send_async = getattr(self.transport, "send_async", None)
+        if send_async is None:
+            response = await self.loop.run_in_executor(None, self._send, request)
+        else:
+            try:
+                response = await send_async(request)
+            except Exception as error:
+                with self.lock:
+                    self.failed += 1
+                response = HttpResponse(FAILED_STATUS, str(error))
+        self._complete(request, response)
+
+    async def wait_closed(self):
+        """Wait for the round trips running as loop tasks, then close"""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.close()
+
+    def _complete(self, request: HttpRequest, response: HttpResponse):
+        with self.lock:
+            script = id(request.owner)
+            self.in_flight -= 1
+            self.script_in_flight[script] -= 1
+            if not self.script_in_flight[script]:
+                del self.script_in_flight[script]
+            self.completed += 1
+        body, metadata = response.body, []
+        if len(body) > request.max_body:
+            body, metadata = body[:request.max_body], [HTTP_BODY_TRUNCATED, request.max_body]
+        owner = request.owner
+        if getattr(owner, "_is_running", True):
+            owner.queue_event("http_response", [request.request_id, response.status, metadata, body])
+        self._start_waiting()
+
+    def cancel_owner(self, owner: Any):
+        """Drop a stopped script's waiting requests and its throttle history"""
+        with self.lock:
+            self.waiting = deque(request for request in self.waiting if request.owner is not owner)
+            self.recent.pop(id(owner), None)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if hasattr(self.transport, "close"):
+            self.transport.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'completed': self.completed,
+            'failed': self.failed,
+            'waiting': len(self.waiting),
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+        }
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+LSL Call-Site Linker
+Resolves every function a script calls to a bound callable once, at load time.
+
+Without it each call searched the user functions, then the simulator's
+attributes, then the API object, and the simulator's `__getattr__` built a
+fresh closure for llSay, llListen and the others every time. The linker walks
+the parsed script, gives each called name a slot and stores the resolved
+callable in `targets`, the dispatch array: compiled call sites hold a slot
+number and call `targets[slot](*args)`, and the interpreter looks names up
+through the same table.
+
+Resolution honours the active dialect (lsl_dialect) and a SimulatorMode. A
+function the dialect or mode does not offer, or that nothing implements, is
+reported once when it is linked: as a warning, after which it is bound anyway
+(or to a placeholder returning None), or, in LSL_STRICT mode, as a LinkError
+raised from the simulator's constructor.
+
+Some implementations depend on the script's host (a RegionHost routes chat and
+sensors), so attaching a script to a region relinks it. Relinking replaces the
+targets in place and the compiled call sites, holding the array, follow.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from lsl_dialect import LSLDialect, dialect_manager, get_dialect
+from lsl_log import category
+from lsl_ossl_compatibility import SimulatorMode
+
+LINKER_LOG = category("linker")
+
+# Warnings already given, so a region of copies of one script warns once
+_reported = set()
+
+
+class LinkError(Exception):
+    """A called function that the script's dialect or mode does not allow"""
+
+
+def called_names(node: Any, names: List[str]):
+    """Collect the names of every call anywhere inside a parsed tree, in order"""
+    if isinstance(node, list):
+        for item in node:
+            called_names(item, names)
+    elif isinstance(node, dict):
+        if node.get("type") == "call" and "name" in node:
+            names.append(node["name"])
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                called_names(value, names)
+
+
+def is_ossl_only(name: str) -> bool:
+    return name.startswith("os") or name in dialect_manager.os_specific_functions
+
+
+def is_lsl_only(name: str) -> bool:
+    return name in dialect_manager.sl_specific_functions
+
+
+class Linker:
+    """The call targets of one simulator, each name resolved once"""
+
+    def __init__(self, simulator, dialect: Optional[LSLDialect] = None, mode: Optional[SimulatorMode] = None):
+        self.simulator = simulator
+        self.dialect = dialect if dialect is not None else get_dialect()
+        self.mode = mode if mode is not None else SimulatorMode.HYBRID
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        # The dispatch array: targets[index[name]] is the callable for name
+        self.targets: List[Callable] = []
+        self.problems: Dict[str, str] = {}
+
+    def link_script(self, parsed_script: Dict[str, Any]) -> "Linker":
+        """Link every call in the script's functions, handlers and global initializers"""
+        names: List[str] = []
+        called_names(parsed_script.get("globals", []), names)
+        for func_def in parsed_script.get("functions", {}).values():
+            called_names(func_def.get("body", []), names)
+        for events in parsed_script.get("states", {}).values():
+            for handler in events.values():
+                called_names(handler.get("body", []), names)
+        for name in names:
+            self.slot(name)
+        return self
+
+    def slot(self, name: str) -> int:
+        """The dispatch array index for `name`, linking it on first use"""
+        index = self.index.get(name)
+        if index is None:
+            target = self._resolve(name)
+            index = self.index[name] = len(self.targets)
+            self.names.append(name)
+            self.targets.append(target)
+        return index
+
+    def target(self, name: str) -> Callable:
+        index = self.index.get(name)
+        return self.targets[index] if index is not None else self.targets[self.slot(name)]
+
+    def relink(self):
+        """Resolve every linked name again, in place"""
+        for index, name in enumerate(self.names):
+            self.targets[index] = self._resolve(name, report=False)
+
+    def _resolve(self, name: str, report: bool = True) -> Callable:
+        simulator = self.simulator
+        if name in simulator.user_functions:
+            call_user = simulator._call_user_function
+            return lambda *args: call_user(name, list(args))
+
+        implementation = simulator._resolve_api(name)
+        problem = self._unavailable(name)
+        if implementation is None:
+            problem = problem or "not implemented"
+        if problem is not None and report:
+            self.problems[name] = problem
+            if self.mode is SimulatorMode.LSL_STRICT:
+                raise LinkError(f"{name}: {problem}")
+            if (name, problem) not in _reported:
+                _reported.add((name, problem))
+                LINKER_LOG.warning("%s: %s", name, problem)
+        if implementation is None:
+            implementation = simulator._placeholder(name)
+        return implementation
+
+    def _unavailable(self, name: str) -> Optional[str]:
+        """Why the dialect or mode does not offer `name`, or None if it does"""
+        if self.mode is SimulatorMode.LSL_STRICT and is_ossl_only(name):
+            return "OpenSimulator function, not available in LSL_STRICT mode"
+        if self.dialect is LSLDialect.SECONDLIFE and is_ossl_only(name):
+            return "OpenSimulator function, not available in Second Life"
+        if (self.dialect is LSLDialect.OPENSIMULATOR or self.mode is SimulatorMode.OSSL_EXTENDED) \
+                and is_lsl_only(name):
+            return "Second Life function, not available in OpenSimulator"
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'linked': len(self.targets), 'problems': dict(self.problems)}
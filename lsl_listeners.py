@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+LSL Listener Registry
+Channel-indexed llListen bookkeeping shared by every script in a region.
+
+Listeners are filed by channel and, within a channel, by the most selective
+filter they have: the speaker key if one was given, otherwise the speaker
+name, otherwise an unfiltered bucket. Saying something on a channel therefore
+looks at three buckets - the one for the speaker's key, the one for their
+name and the unfiltered one - and never at listeners on other channels or for
+other speakers. What is left of a listener's filter (a message, or a name
+next to a key) is checked when the listener is found. As in LSL, a NULL_KEY
+speaker filter means any speaker, the same as "".
+
+Handles are small integers per script. A script may hold at most
+MAX_LISTENS listeners; llListenRemove drops the listener from the index and
+returns its handle for reuse, lowest first. A disabled listener
+(llListenControl) stays filed but is skipped.
+"""
+
+import heapq
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# LSL's per-script limit on open listens
+MAX_LISTENS = 65
+NULL_KEY = "00000000-0000-0000-0000-000000000000"
+
+
+class TooManyListens(RuntimeError):
+    """Raised by llListen past MAX_LISTENS, which is a script error in LSL"""
+
+
+class Listener:
+    """One llListen registration"""
+
+    __slots__ = ("owner", "handle", "channel", "name", "key", "message", "active")
+
+    def __init__(self, owner: Any, handle: int, channel: int, name: str, key: str, message: str):
+        self.owner = owner
+        self.handle = handle
+        self.channel = channel
+        self.name = name
+        self.key = key
+        self.message = message
+        self.active = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'handle': self.handle, 'channel': self.channel, 'name': self.name,
+                'key': self.key, 'message': self.message, 'active': self.active}
+
+
+class _Handles:
+    """A script's listeners by handle, and the handles it has given back"""
+
+    __slots__ = ("listeners", "free", "next")
+
+    def __init__(self):
+        self.listeners: Dict[int, Listener] = {}
+        self.free: List[int] = []
+        self.next = 1
+
+
+class ListenerRegistry:
+    """Every listener in a region (or of one standalone script), indexed by channel"""
+
+    def __init__(self, max_listens: int = MAX_LISTENS):
+        self.max_listens = max_listens
+        # channel -> (by key, by name, unfiltered); buckets are dicts used as ordered sets
+        self.channels: Dict[int, tuple] = {}
+        self.owners: Dict[int, _Handles] = {}
+        self.lock = threading.Lock()
+        self.dispatches = 0
+        self.deliveries = 0
+        self.checked = 0
+
+    def add(self, owner: Any, channel: int, name: str = "", key: str = "", message: str = "") -> int:
+        """Register a listener for `owner`; returns its handle"""
+        if key == NULL_KEY:
+            key = ""
+        with self.lock:
+            handles = self.owners.get(id(owner))
+            if handles is None:
+                handles = self.owners[id(owner)] = _Handles()
+            if len(handles.listeners) >= self.max_listens:
+                raise TooManyListens(f"Too many listens (limit {self.max_listens})")
+            if handles.free:
+                handle = heapq.heappop(handles.free)
+            else:
+                handle = handles.next
+                handles.next += 1
+            listener = Listener(owner, handle, channel, name, key, message)
+            handles.listeners[handle] = listener
+            self._bucket(listener, create=True)[listener] = None
+            return handle
+
+    def _bucket(self, listener: Listener, create: bool = False) -> Optional[Dict[Listener, None]]:
+        index = self.channels.get(listener.channel)
+        if index is None:
+            if not create:
+                return None
+            index = self.channels[listener.channel] = ({}, {}, {})
+        by_key, by_name, unfiltered = index
+        if listener.key:
+            table, field = by_key, listener.key
+        elif listener.name:
+            table, field = by_name, listener.name
+        else:
+            return unfiltered
+        bucket = table.get(field)
+        if bucket is None and create:
+            bucket = table[field] = {}
+        return bucket
+
+    def remove(self, owner: Any, handle: int) -> bool:
+        """llListenRemove: unfile the listener and free its handle"""
+        with self.lock:
+            handles = self.owners.get(id(owner))
+            listener = handles.listeners.pop(handle, None) if handles is not None else None
+            if listener is None:
+                return False
+            self._unfile(listener)
+            heapq.heappush(handles.free, handle)
+            return True
+
+    def _unfile(self, listener: Listener):
+        bucket = self._bucket(listener)
+        del bucket[listener]
+        if bucket:
+            return
+        by_key, by_name, unfiltered = self.channels[listener.channel]
+        if listener.key:
+            del by_key[listener.key]
+        elif listener.name:
+            del by_name[listener.name]
+        if not (by_key or by_name or unfiltered):
+            del self.channels[listener.channel]
+
+    def remove_owner(self, owner: Any):
+        """Drop all of a script's listeners (state change, reset or stop)"""
+        with self.lock:
+            handles = self.owners.pop(id(owner), None)
+            if handles is not None:
+                for listener in handles.listeners.values():
+                    self._unfile(listener)
+
+    def control(self, owner: Any, handle: int, active: bool) -> bool:
+        """llListenControl: enable or disable a listener without unfiling it"""
+        handles = self.owners.get(id(owner))
+        listener = handles.listeners.get(handle) if handles is not None else None
+        if listener is None:
+            return False
+        listener.active = bool(active)
+        return True
+
+    def listeners_of(self, owner: Any) -> List[Listener]:
+        handles = self.owners.get(id(owner))
+        return list(handles.listeners.values()) if handles is not None else []
+
+    def match(self, channel: int, name: str, key: str, message: str) -> List[Listener]:
+        """The active listeners that hear `message` from speaker `name`/`key` on `channel`"""
+        self.dispatches += 1
+        matched = []
+        with self.lock:
+            index = self.channels.get(channel)
+            if index is None:
+                return matched
+            by_key, by_name, unfiltered = index
+            for bucket in (by_key.get(key), by_name.get(name), unfiltered):
+                if not bucket:
+                    continue
+                self.checked += len(bucket)
+                for listener in bucket:
+                    if (listener.active
+                            and (not listener.message or listener.message == message)
+                            and (not listener.name or listener.name == name)):
+                        matched.append(listener)
+        return matched
+
+    def dispatch(self, channel: int, name: str, key: str, message: str,
+                 in_range: Optional[Callable[[Any], bool]] = None) -> int:
+        """
+        Queue a listen event for every listener that hears this; a prim never
+        hears itself. `in_range(owner)` narrows delivery to scripts within
+        earshot.
+        """
+        delivered = 0
+        for listener in self.match(channel, name, key, message):
+            owner = listener.owner
+            if owner.object_key != key and (in_range is None or in_range(owner)):
+                owner.queue_event("listen", [channel, name, key, message])
+                delivered += 1
+        self.deliveries += delivered
+        return delivered
+
+    def __len__(self) -> int:
+        return sum(len(handles.listeners) for handles in self.owners.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'listeners': len(self),
+            'channels': len(self.channels),
+            'scripts': len(self.owners),
+            'dispatches': self.dispatches,
+            'deliveries': self.deliveries,
+            'checked': self.checked,
+        }
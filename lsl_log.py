@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+LSL Log
+Leveled, per-category diagnostics for the simulator's hot paths.
+
+Each subsystem logs through a Category ("event", "api", "sensor", ...) with
+its own threshold. The category keeps one boolean per level, so a hot path
+guards its message with a single attribute test and a disabled category
+costs that branch and nothing else: no call, no formatting:
+
+    if EVENT.debug_on:
+        EVENT.debug("Triggering %s with %d args", event_name, len(args))
+
+Rare messages (warnings, errors) can call the level method directly, which
+makes the same test itself.
+
+Every record that passes its category's threshold is counted, whether or not
+it is written, so `get_stats()` keeps reporting how busy each category was
+after text output is switched off with `configure(output=False)`. Written
+records go to a LogWriter, which collects lines and writes them in batches,
+at once for warnings and errors, and at exit. Chat, which is a script's
+visible output, is written through line by line.
+
+The LSL_LOG environment variable configures logging at import, as does
+lsl.py's --log option: "debug" sets every category, "event=debug,api=info"
+sets some, "off" silences all. Categories start at WARNING, except chat,
+which carries what scripts say and starts at INFO.
+"""
+
+import atexit
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+DEBUG, INFO, WARNING, ERROR, OFF = range(5)
+LEVEL_NAMES = ("debug", "info", "warning", "error", "off")
+
+DEFAULT_LEVEL = WARNING
+DEFAULT_LEVELS = {'chat': INFO}
+# Categories written through at once rather than batched: chat is what scripts say
+IMMEDIATE_CATEGORIES = frozenset({'chat'})
+# Lines held before the writer writes them out
+WRITER_CAPACITY = 256
+
+
+class LogWriter:
+    """Lines collected in memory and written to a stream in batches"""
+
+    def __init__(self, stream=None, capacity: int = WRITER_CAPACITY, flush_level: int = WARNING):
+        # No stream means sys.stdout as it is at write time (so redirection still works)
+        self.stream = stream
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.lines = []
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def write(self, level: int, line: str, immediate: bool = False):
+        with self.lock:
+            self.lines.append(line)
+            if immediate or len(self.lines) >= self.capacity or level >= self.flush_level:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.lines:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("\n".join(self.lines) + "\n")
+        stream.flush()
+        self.written += len(self.lines)
+        self.lines = []
+
+
+class Category:
+    """One subsystem's threshold, per-level switches and record counts"""
+
+    __slots__ = ("name", "logger", "level", "debug_on", "info_on", "warning_on", "error_on", "counts",
+                 "immediate")
+
+    def __init__(self, name: str, logger: "Logger", level: int):
+        self.name = name
+        self.logger = logger
+        self.immediate = name in IMMEDIATE_CATEGORIES
+        self.counts = [0] * OFF
+        self.set_level(level)
+
+    def set_level(self, level: int):
+        self.level = level
+        self.debug_on = level <= DEBUG
+        self.info_on = level <= INFO
+        self.warning_on = level <= WARNING
+        self.error_on = level <= ERROR
+
+    def log(self, level: int, message: str, *args):
+        """Count and write a record; `message % args` is only formatted when written"""
+        if level < self.level:
+            return
+        self.counts[level] += 1
+        writer = self.logger.writer
+        if writer is not None:
+            writer.write(level, f"[{self.name.upper()}] {message % args if args else message}", self.immediate)
+
+    def debug(self, message: str, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message: str, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message: str, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message: str, *args):
+        self.log(ERROR, message, *args)
+
+
+class Logger:
+    """The categories and the writer their records go to"""
+
+    def __init__(self, writer: Optional[LogWriter] = None):
+        self.writer = writer if writer is not None else LogWriter()
+        self.categories: Dict[str, Category] = {}
+        # Levels configured before their category was first used
+        self.levels: Dict[str, int] = dict(DEFAULT_LEVELS)
+        self.default_level = DEFAULT_LEVEL
+        self.lock = threading.Lock()
+
+    def category(self, name: str) -> Category:
+        with self.lock:
+            category = self.categories.get(name)
+            if category is None:
+                category = self.categories[name] = Category(name, self, self.levels.get(name, self.default_level))
+            return category
+
+    def set_level(self, name: Optional[str], level: int):
+        """Set one category's level, or every category's when `name` is None"""
+        with self.lock:
+            if name is None:
+                self.default_level = level
+                self.levels = {}
+                targets = list(self.categories.values())
+            else:
+                self.levels[name] = level
+                targets = [self.categories[name]] if name in self.categories else []
+        for category in targets:
+            category.set_level(level)
+
+    def configure(self, spec: Optional[str] = None, output: Optional[bool] = None, writer: Optional[LogWriter] = None):
+        """
+        Apply a level spec such as "debug" or "event=debug,api=info", and
+        switch text output on or off (counting goes on either way)
+        """
+        for part in (spec or "").split(","):
+            part = part.strip().lower()
+            if not part:
+                continue
+            name, _, level = part.rpartition("=")
+            if level not in LEVEL_NAMES:
+                raise ValueError(f"Unknown log level: {level!r}")
+            self.set_level(name if name not in ("", "*") else None, LEVEL_NAMES.index(level))
+        if writer is not None:
+            self.flush()
+            self.writer = writer
+        elif output is not None:
+            self.flush()
+            self.writer = (self.writer or LogWriter()) if output else None
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Records per category and level since start (or reset_stats())"""
+        return {name: {LEVEL_NAMES[level]: count for level, count in enumerate(category.counts) if count}
+                for name, category in sorted(self.categories.items()) if any(category.counts)}
+
+    def reset_stats(self):
+        for category in list(self.categories.values()):
+            category.counts = [0] * OFF
+
+
+_logger = Logger()
+_logger.configure(os.environ.get("LSL_LOG"))
+atexit.register(_logger.flush)
+
+
+def get_logger() -> Logger:
+    """The process-wide logger"""
+    return _logger
+
+
+def category(name: str) -> Category:
+    """The process-wide logger's category `name`"""
+    return _logger.category(name)
+
+
+def configure(spec: Optional[str] = None, output: Optional[bool] = None, writer: Optional[LogWriter] = None):
+    _logger.configure(spec, output, writer)
+
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    return _logger.get_stats()
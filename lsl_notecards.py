@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+LSL Notecard Store
+Notecards from an inventory directory, read through mmap with a per-notecard line index.
+
+A NotecardStore serves the notecards in one directory: the notecard "config"
+is the file `config.txt`, and other files (scripts, data) are not notecards.
+The first read of a notecard maps the file and scans it once for line
+starts, keeping the offsets in an array; after that a line is a slice of the
+mapping between two offsets and the line count is the array's length,
+whatever the notecard's size. Like Second Life, a line is cut at
+MAX_LINE_BYTES bytes.
+
+Stores are shared: `open_store()` returns one store per directory, so a
+region of scripts reading the same profile notecard indexes it once. The
+simulator delivers what a store reads as dataserver events through its
+scheduler.
+"""
+
+import mmap
+import os
+import threading
+from array import array
+from typing import Dict, Optional
+
+# What llGetNotecardLine's dataserver event carries past the last line
+EOF = "\n\n\n"
+# Bytes of a line llGetNotecardLine returns
+MAX_LINE_BYTES = 1024
+NOTECARD_EXTENSION = ".txt"
+
+
+class Notecard:
+    """One notecard file, mapped, with the byte offset of every line start"""
+
+    __slots__ = ("name", "path", "data", "offsets", "_file")
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # An empty file cannot be mapped, and has no lines anyway
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.offsets = self._index(self.data, size)
+
+    @staticmethod
+    def _index(data, size: int) -> array:
+        """Line starts, plus a final entry one past the last line's newline"""
+        offsets = array("q", [0] if size else [])
+        find = data.find
+        start = 0
+        while start < size:
+            newline = find(b"\n", start)
+            start = size + 1 if newline < 0 else newline + 1
+            offsets.append(start)
+        return offsets
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def line(self, number: int) -> Optional[str]:
+        """Line `number` (from 0) without its line ending, or None past the end"""
+        if not 0 <= number < len(self.offsets) - 1:
+            return None
+        start, end = self.offsets[number], self.offsets[number + 1] - 1
+        raw = self.data[start:min(end, start + MAX_LINE_BYTES)]
+        if raw.endswith(b"\r"):
+            raw = raw[:-1]
+        return raw.decode("utf-8", "replace")
+
+    def read(self) -> str:
+        """The whole notecard, as osGetNotecard returns it"""
+        return "\n".join(self.line(number) for number in range(len(self)))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+
+class NotecardStore:
+    """The notecards of one inventory directory, each mapped and indexed on first use"""
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        self.notecards: Dict[str, Optional[Notecard]] = {}
+        self.lock = threading.Lock()
+        self.reads = 0
+
+    def _path(self, name: str) -> Optional[str]:
+        # Inventory names are plain names; anything path-like never leaves the directory
+        if not name or "/" in name or "\\" in name or name in (".", ".."):
+            return None
+        path = os.path.join(self.directory, name + NOTECARD_EXTENSION)
+        return path if os.path.isfile(path) else None
+
+    def get(self, name: str) -> Optional[Notecard]:
+        """The notecard called `name`, or None if the inventory has none"""
+        notecard = self.notecards.get(name)
+        if notecard is None:
+            with self.lock:
+                notecard = self.notecards.get(name)
+                if notecard is None:
+                    path = self._path(name)
+                    if path is None:
+                        return None
+                    notecard = self.notecards[name] = Notecard(name, path)
+        return notecard
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def line(self, name: str, number: int) -> Optional[str]:
+        """llGetNotecardLine's data: the line, EOF past the end, None if there is no such notecard"""
+        notecard = self.get(name)
+        if notecard is None:
+            return None
+        self.reads += 1
+        line = notecard.line(number)
+        return EOF if line is None else line
+
+    def count(self, name: str) -> Optional[int]:
+        """llGetNumberOfNotecardLines' data, or None if there is no such notecard"""
+        notecard = self.get(name)
+        return len(notecard) if notecard is not None else None
+
+    def reload(self, name: str):
+        """Forget an indexed notecard so the next read maps the file again"""
+        with self.lock:
+            notecard = self.notecards.pop(name, None)
+        if notecard is not None:
+            notecard.close()
+
+    def close(self):
+        with self.lock:
+            notecards, self.notecards = self.notecards, {}
+        for notecard in notecards.values():
+            notecard.close()
+
+
+_stores: Dict[str, NotecardStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(directory: str) -> NotecardStore:
+    """The shared store for `directory`"""
+    directory = os.path.abspath(directory)
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = NotecardStore(directory)
+        return store
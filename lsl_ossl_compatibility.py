@@ -8,6 +8,7 @@ import uuid
 import time as time_module
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
+from types import MappingProxyType
 from lsl_api_expanded import LSLAPIExpanded
 
 class SimulatorMode(Enum):
@@ -26,12 +27,19 @@ class CompatibilityLevel(Enum):
 class LSLOSSLCompatibility(LSLAPIExpanded):
     """Extended LSL API with OSSL compatibility and mode switching"""
     
+    # The compatibility matrix (COMPATIBILITY_INFO), shared like the function table
+    compatibility_info: Dict[str, Dict[str, Any]] = {}
+
     def __init__(self, mode: SimulatorMode = SimulatorMode.HYBRID):
         super().__init__()
         self.mode = mode
-        self.compatibility_info = {}
-        self._register_ossl_functions()
-        self._register_compatibility_matrix()
+
+    @classmethod
+    def _build_function_table(cls):
+        """The LSL table plus the OSSL functions, again read-only"""
+        functions = dict(super()._build_function_table())
+        cls._register_ossl_functions(functions)
+        return MappingProxyType(functions)
     
     def set_mode(self, mode: SimulatorMode):
         """Switch simulator compatibility mode"""
@@ -132,16 +140,17 @@ class LSLOSSLCompatibility(LSLAPIExpanded):
             # LSL standard behavior
             return super().call_function('llParseString2List', args)
     
-    def _register_ossl_functions(self):
+    @staticmethod
+    def _register_ossl_functions(functions):
         """Register OSSL-specific functions"""
         
         # OSSL-only functions
-        def osSetSpeed(speed):
+        def osSetSpeed(ctx, speed):
             """OSSL: Set avatar movement speed"""
             print(f"OSSL: Set speed to {speed}")
             return speed
         
-        def osGetRegionStats():
+        def osGetRegionStats(ctx):
             """OSSL: Get region performance statistics"""
             return {
                 'time_dilation': 0.99,
@@ -160,43 +169,43 @@ class LSLOSSLCompatibility(LSLAPIExpanded):
                 'script_ms': 15.9
             }
         
-        def osMessageObject(key, message):
+        def osMessageObject(ctx, key, message):
             """OSSL: Send message to object via key"""
             print(f"OSSL: Message to {key}: {message}")
             return 1
         
-        def osGetNotecard(name):
+        def osGetNotecard(ctx, name):
             """OSSL: Read entire notecard content"""
             # Simulate notecard content
             return f"This is the content of notecard: {name}"
         
-        def osSetDynamicTextureURL(face, contentType, url, extraParams, timer):
+        def osSetDynamicTextureURL(ctx, face, contentType, url, extraParams, timer):
             """OSSL: Set dynamic texture from URL"""
             print(f"OSSL: Set dynamic texture on face {face} from {url}")
             return str(uuid.uuid4())
         
-        def osConsoleCommand(command):
+        def osConsoleCommand(ctx, command):
             """OSSL: Execute console command"""
             print(f"OSSL: Console command: {command}")
             return f"Executed: {command}"
         
-        def osGetSimulatorVersion():
+        def osGetSimulatorVersion(ctx):
             """OSSL: Get OpenSimulator version"""
             return "OpenSimulator 0.9.2.2 (Python Simulator)"
         
-        def osGetAvatarList():
+        def osGetAvatarList(ctx):
             """OSSL: Get list of avatars in region"""
             return [
                 {'name': 'John Doe', 'key': str(uuid.uuid4()), 'position': (128.0, 128.0, 22.0)},
                 {'name': 'Jane Smith', 'key': str(uuid.uuid4()), 'position': (100.0, 150.0, 22.0)}
             ]
         
-        def osSetParcelDetails(position, rules):
+        def osSetParcelDetails(ctx, position, rules):
             """OSSL: Set parcel details"""
             print(f"OSSL: Set parcel details at {position}: {rules}")
             return True
         
-        def osGetDrawStringSize(text, fontName, fontSize):
+        def osGetDrawStringSize(ctx, text, fontName, fontSize):
             """OSSL: Calculate text rendering dimensions"""
             # Simulate text size calculation
             char_width = fontSize * 0.6
@@ -216,11 +225,12 @@ class LSLOSSLCompatibility(LSLAPIExpanded):
             'osSetParcelDetails': osSetParcelDetails,
             'osGetDrawStringSize': osGetDrawStringSize
         }
-        self.functions.update(ossl_funcs)
+        functions.update(ossl_funcs)
     
-    def _register_compatibility_matrix(self):
-        """Register function compatibility information"""
-        self.compatibility_info = {
+    @staticmethod
+    def _build_compatibility_matrix() -> Dict[str, Dict[str, Any]]:
+        """Function compatibility information"""
+        return {
             # LSL Standard Functions
             'llSay': {'level': CompatibilityLevel.BOTH, 'notes': 'Works identically'},
             'llOwnerSay': {'level': CompatibilityLevel.BOTH, 'notes': 'Works identically'},
@@ -348,6 +358,12 @@ class LSLOSSLCompatibility(LSLAPIExpanded):
         
         return "\n".join(report)
 
+# Built once per process, like lsl_api_expanded.FUNCTIONS
+OSSL_FUNCTIONS = LSLOSSLCompatibility._build_function_table()
+LSLOSSLCompatibility.function_table = OSSL_FUNCTIONS
+COMPATIBILITY_INFO = MappingProxyType(LSLOSSLCompatibility._build_compatibility_matrix())
+LSLOSSLCompatibility.compatibility_info = COMPATIBILITY_INFO
+
 def test_compatibility_system():
     """Test the LSL/OSSL compatibility system"""
     print("🔧 Testing LSL/OSSL Compatibility System")
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+LSL Region Host
+Runs a whole region's scripts in one process, or sharded across worker processes.
+
+RegionHost loads any number of scripts (often many copies of one script) onto
+a single scheduler and a virtual clock. It routes what scripts say to each
+other: chat reaches every other script with a matching listener within
+earshot, link messages reach the scripts in the sender's link set, HTTP
+requests share one client (lsl_http.py) and its limits, and sensors
+query the region's World (lsl_world.py) of avatars and prims. Sensors are not
+swept one by one: every sweep requested at the same instant (llSensor calls
+and llSensorRepeat ticks alike) is collected and answered by one batched
+`World.sense_batch` at the end of that tick. `run_for()` dispatches every
+queued event and then jumps the clock to the next deadline, so the region
+runs as fast as its handlers do.
+
+ShardedRegion spreads the objects over a `multiprocessing` pool. Each worker
+runs a RegionHost for its share, and the coordinator in the parent process
+runs them in lockstep steps of virtual time. After every step the coordinator
+pushes avatar updates to every shard, and each shard's prims that moved or
+changed to the other shards, so sensors and lookups see the whole region; like
+chat, a prim's change reaches the other shards one step late. Chat between
+shards goes over a shared-memory chat bus (lsl_chat_bus.py): each shard writes
+what its scripts said to its own ring and reads the other shards' rings at the
+start of the next step, so cross-shard chat arrives one step later than local
+chat. The coordinator only passes each ring's end position along, so a fast
+shard never reads a record from a step it has not reached. Records that do not
+fit in a full ring fall back to the coordinator's pipes. A link set always
+stays on one shard, so link messages never cross a process boundary.
+
+    python lsl_region.py --copies 400 --workers 4    # scaling benchmark
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from lsl_chat_bus import DEFAULT_RING_SIZE, BusEndpoint, ChatBus
+from lsl_http import HttpClient
+from lsl_listeners import ListenerRegistry
+from lsl_world import CHAT_RANGES, PASSIVE, SAY_RANGE, SCRIPTED, AGENT, ZERO_ROTATION, ZERO_VECTOR, World
+from lsl_scheduler import Scheduler, VirtualClock
+from lsl_simulator import LSLSimulator, SHUTDOWN
+
+LINK_ROOT = 1
+LINK_SET = -1
+LINK_ALL_OTHERS = -2
+LINK_ALL_CHILDREN = -3
+LINK_THIS = -4
+
+# Where scripts rez when no position is given: the middle of the region
+DEFAULT_POSITION = (128.0, 128.0, 25.0)
+
+# (channel, speaker name, speaker key, message, x, y, z, range) - plain tuples so
+# they cross processes cheaply; a range of 0 is the whole region
+ChatRecord = Tuple[int, str, str, str, float, float, float, float]
+# (key, name, type, position, rotation, owner, velocity) - a prim as the World holds it
+PrimRecord = Tuple[str, str, int, tuple, tuple, str, tuple]
+# (parsed script, object id, object name, position, owner) - a script as dealt to a shard
+ShardScript = Tuple[Dict[str, Any], str, str, tuple, Optional[str]]
+
+
+class RegionHost:
+    """Scripts sharing one scheduler, with chat, link message and sensor routing"""
+
+    def __init__(self, clock=None, http_transport=None):
+        self.scheduler = Scheduler(clock if clock is not None else VirtualClock())
+        self.scripts: List[LSLSimulator] = []
+        self.listeners = ListenerRegistry()
+        # One HTTP client, so the concurrency limits cover the whole region
+        self.http = HttpClient(self.scheduler, http_transport)
+        self.world = World()
+        self.objects: Dict[str, List[LSLSimulator]] = {}
+        self.avatars: List[Dict[str, Any]] = []
+        # When sharded, chat is also collected here for the coordinator to forward
+        self.forward_chat = False
+        self.outbox: List[ChatRecord] = []
+        # Prims as last reported to other shards, so only changes are sent
+        self.reported_prims: Dict[str, PrimRecord] = {}
+        self.chat_messages = 0
+        self.link_messages = 0
+        # Sensors requested this tick, swept together by flush_sensors
+        self.pending_sensors: List[Tuple[LSLSimulator, Dict[str, Any]]] = []
+        self.sensor_flushes = 0
+        self.sensor_sweeps = 0
+
+    def add_script(self, parsed_script: Dict[str, Any], object_id: Optional[str] = None,
+                   object_name: str = "Object", position=DEFAULT_POSITION, rotation=ZERO_ROTATION,
+                   owner: Optional[str] = None, **simulator_options) -> LSLSimulator:
+        """
+        Load a script into its own prim of `object_id` (a new object by
+        default) at `position`, owned by the avatar keyed `owner`
+        """
+        simulator = LSLSimulator(parsed_script, scheduler=self.scheduler, **simulator_options)
+        if owner is not None:
+            simulator.lsl_api.object_properties['owner'] = owner
+        owner = simulator.lsl_api.functions['llGetOwner']()
+        linkset = self.objects.setdefault(object_id or simulator.object_key, [])
+        linkset.append(simulator)
+        simulator.region = self
+        simulator.listeners = self.listeners
+        simulator.http = self.http
+        simulator.object_id = object_id or simulator.object_key
+        simulator.object_name = object_name
+        simulator.link_number = len(linkset)
+        # Chat, sensors and lookups resolve to the region's versions now
+        simulator.linker.relink()
+        self.world.add(simulator.object_key, object_name, PASSIVE | SCRIPTED, position, rotation, owner)
+        simulator.queue_event("state_entry")
+        self.scripts.append(simulator)
+        return simulator
+
+    # =========================================================================
+    # Routing
+    # =========================================================================
+
+    def chat(self, sender: LSLSimulator, function: str, channel: int, message: str) -> int:
+        """Called by a script's llSay/llShout/llWhisper/llRegionSay"""
+        return self.say(sender.object_name, sender.object_key, channel, message, function)
+
+    def say(self, name: str, key: str, channel: int, message: str, function: str = "llSay") -> int:
+        """Chat from the entity keyed `key`, heard as far as `function` carries"""
+        position = self.world.position(key)
+        radius = CHAT_RANGES.get(function, SAY_RANGE)
+        if position is None or radius is None:
+            record = (channel, name, key, message, 0.0, 0.0, 0.0, 0.0)
+        else:
+            record = (channel, name, key, message) + position + (float(radius),)
+        if self.forward_chat:
+            self.outbox.append(record)
+        return self.deliver_chat(*record)
+
+    def deliver_chat(self, channel: int, name: str, key: str, message: str,
+                     x: float = 0.0, y: float = 0.0, z: float = 0.0, radius: float = 0.0) -> int:
+        """
+        Queue a listen event for every matching listener within `radius` of
+        (x, y, z), or anywhere when `radius` is 0; a speaker never hears itself.
+        """
+        self.chat_messages += 1
+        if not radius:
+            return self.listeners.dispatch(channel, name, key, message)
+        entities = self.world.entities
+        limit = radius * radius
+
+        def in_range(owner):
+            entity = entities.get(owner.object_key)
+            if entity is None:
+                return True
+            ex, ey, ez = entity.position
+            return (ex - x) ** 2 + (ey - y) ** 2 + (ez - z) ** 2 <= limit
+        return self.listeners.dispatch(channel, name, key, message, in_range)
+
+    def link_message(self, sender: LSLSimulator, link: int, num: int, text: str, key: str):
+        """Called by llMessageLinked; delivers link_message within the sender's link set"""
+        self.link_messages += 1
+        for simulator in self.objects.get(sender.object_id, ()):
+            number = simulator.link_number
+            if (link == LINK_SET
+                    or (link == LINK_ALL_OTHERS and simulator is not sender)
+                    or (link == LINK_ALL_CHILDREN and number > LINK_ROOT)
+                    or (link == LINK_THIS and simulator is sender)
+                    or link == number):
+                simulator.queue_event("link_message", [sender.link_number, num, text, key])
+
+    def request_sensor(self, simulator: LSLSimulator, sensor: Dict[str, Any]):
+        """Called by llSensor and llSensorRepeat; the sweep runs with the rest of this tick's"""
+        if not self.pending_sensors:
+            self.scheduler.call_later(0, self.flush_sensors)
+        self.pending_sensors.append((simulator, sensor))
+
+    def flush_sensors(self) -> int:
+        """Sweep every pending sensor in one batch and queue sensor/no_sensor events"""
+        pending, self.pending_sensors = self.pending_sensors, []
+        pending = [(simulator, sensor) for simulator, sensor in pending if simulator._is_running]
+        if not pending:
+            return 0
+        results = self.world.sense_batch([
+            (simulator.object_key, sensor['name'], sensor['key'], sensor['type'], sensor['range'], sensor['arc'])
+            for simulator, sensor in pending])
+        for (simulator, _), found in zip(pending, results):
+            simulator.detected_avatars = [entity.as_detected(distance) for distance, entity in found]
+            if found:
+                simulator.queue_event("sensor", [len(found)])
+            else:
+                simulator.queue_event("no_sensor")
+        self.sensor_flushes += 1
+        self.sensor_sweeps += len(pending)
+        return len(pending)
+
+    def set_avatars(self, avatars: List[Dict[str, Any]]):
+        """Replace the region's avatars: dicts with "key", "name", "position" and optionally "velocity" """
+        for avatar in self.avatars:
+            self.world.remove(avatar["key"])
+        self.avatars = list(avatars)
+        for avatar in self.avatars:
+            # An avatar owns itself, as far as llGetObjectDetails is concerned
+            self.world.add(avatar["key"], avatar["name"], AGENT, avatar.get("position", DEFAULT_POSITION),
+                           avatar.get("rotation", ZERO_ROTATION), avatar["key"],
+                           avatar.get("velocity", ZERO_VECTOR))
+
+    def prim_updates(self) -> List[PrimRecord]:
+        """This host's prims that are new or changed since the last call, for the other shards"""
+        updates = []
+        for simulator in self.scripts:
+            entity = self.world.get(simulator.object_key)
+            if entity is None:
+                continue
+            record = (entity.key, entity.name, entity.type, entity.position, entity.rotation, entity.owner,
+                      entity.velocity)
+            if self.reported_prims.get(entity.key) != record:
+                self.reported_prims[entity.key] = record
+                updates.append(record)
+        return updates
+
+    def update_prims(self, prims: List[PrimRecord]):
+        """Add or update prims hosted by other shards, so sensors and lookups see them"""
+        for key, name, type, position, rotation, owner, velocity in prims:
+            self.world.add(key, name, type, position, rotation, owner, velocity)
+
+    # =========================================================================
+    # Running
+    # =========================================================================
+
+    def dispatch_pending(self) -> int:
+        """Dispatch queued events until every script's queue is empty"""
+        dispatched = 0
+        busy = True
+        while busy:
+            busy = False
+            for simulator in self.scripts:
+                queue = simulator.event_queue
+                while not queue.empty():
+                    event = queue.get_nowait()
+                    if event is SHUTDOWN:
+                        queue.task_done()
+                        continue
+                    simulator._dispatch_event(event)
+                    dispatched += 1
+                    busy = True
+        return dispatched
+
+    def run_for(self, seconds: float) -> int:
+        """Run every script for `seconds` of virtual time; returns events dispatched"""
+        scheduler = self.scheduler
+        end = scheduler.clock() + seconds
+        dispatched = self.dispatch_pending()
+        while scheduler.advance(until=end):
+            dispatched += self.dispatch_pending()
+        scheduler.clock.advance_to(end)
+        return dispatched
+
+    def stop(self):
+        for simulator in self.scripts:
+            simulator.stop()
+        self.http.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'scripts': len(self.scripts),
+            'objects': len(self.objects),
+            'events': sum(simulator.events_dispatched for simulator in self.scripts),
+            'errors': sum(simulator.dispatch_errors for simulator in self.scripts),
+            'entities': len(self.world),
+            'chat_messages': self.chat_messages,
+            'listen_deliveries': self.listeners.deliveries,
+            'link_messages': self.link_messages,
+            'sensor_sweeps': self.sensor_sweeps,
+            'sensor_flushes': self.sensor_flushes,
+            'http_requests': self.http.requests,
+            'http_throttled': self.http.throttled,
+        }
+
+
+# =============================================================================
+# Sharding
+# =============================================================================
+
+def _shard_main(connection, scripts: List[ShardScript], quiet: bool, shard: int = 0,
+                bus_names: Optional[List[str]] = None):
+    """Worker process: host one shard and run it one step at a time for the coordinator"""
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    bus = BusEndpoint(bus_names, shard) if bus_names else None
+    host = RegionHost()
+    host.forward_chat = True
+    for parsed_script, object_id, object_name, position, owner in scripts:
+        host.add_script(parsed_script, object_id=object_id, object_name=object_name, position=position,
+                        owner=owner)
+    connection.send(host.prim_updates())
+
+    while True:
+        command, *payload = connection.recv()
+        if command == "step":
+            seconds, inbound, avatars, prims, limits = payload
+            if avatars is not None:
+                host.set_avatars(avatars)
+            host.update_prims(prims)
+            if bus is not None:
+                for record in bus.consume(limits):
+                    host.deliver_chat(*record)
+            for record in inbound:
+                host.deliver_chat(*record)
+            dispatched = host.run_for(seconds)
+            outbox, host.outbox = host.outbox, []
+            sent = bus.publish(outbox) if bus is not None else 0
+            connection.send((dispatched, sent, outbox[sent:], bus.position() if bus is not None else 0,
+                             host.prim_updates()))
+        elif command == "stop":
+            host.stop()
+            connection.send(host.get_stats())
+            break
+    if bus is not None:
+        bus.close()
+    connection.close()
+
+
+class ShardedRegion:
+    """A region whose objects are spread over worker processes"""
+
+    def __init__(self, workers: int, quiet: bool = True, bus_size: Optional[int] = DEFAULT_RING_SIZE):
+        self.workers = workers
+        self.quiet = quiet
+        # Bytes per shard ring; None routes all chat through the coordinator's pipes
+        self.bus_size = bus_size
+        self.bus: Optional[ChatBus] = None
+        self.bus_limits: Optional[List[int]] = None
+        self.shard_scripts: List[List[ShardScript]] = [[] for _ in range(workers)]
+        self.object_shards: Dict[str, int] = {}
+        self.connections = []
+        self.processes = []
+        # Chat that did not fit on the bus, for delivery with the next step
+        self.inbound: List[List[ChatRecord]] = [[] for _ in range(workers)]
+        self.avatars: Optional[List[Dict[str, Any]]] = None
+        # Other shards' prim changes, for delivery with the next step
+        self.prims: List[List[PrimRecord]] = [[] for _ in range(workers)]
+        self.routed_chat = 0
+        self.shard_stats: List[Dict[str, Any]] = []
+
+    def add_script(self, parsed_script: Dict[str, Any], object_id: Optional[str] = None,
+                   object_name: str = "Object", position=DEFAULT_POSITION, owner: Optional[str] = None):
+        """Add a script before start(); objects are dealt to shards round-robin"""
+        if self.processes:
+            raise RuntimeError("scripts must be added before start()")
+        if object_id is None:
+            object_id = f"object-{sum(len(scripts) for scripts in self.shard_scripts)}"
+        shard = self.object_shards.setdefault(object_id, len(self.object_shards) % self.workers)
+        self.shard_scripts[shard].append((parsed_script, object_id, object_name, tuple(position), owner))
+
+    def set_avatars(self, avatars: List[Dict[str, Any]]):
+        """Avatars for every shard's sensors, sent with the next step"""
+        self.avatars = list(avatars)
+
+    def start(self):
+        """Start the workers and wait until each has loaded its scripts"""
+        context = multiprocessing.get_context()
+        if self.bus_size and self.workers > 1:
+            self.bus = ChatBus(self.workers, self.bus_size)
+            self.bus_limits = [0] * self.workers
+        bus_names = self.bus.names if self.bus is not None else None
+        for shard, scripts in enumerate(self.shard_scripts):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_main, args=(child, scripts, self.quiet, shard, bus_names),
+                                      daemon=True)
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+        for shard, connection in enumerate(self.connections):
+            self._route_prims(shard, connection.recv())
+
+    def _route_prims(self, shard: int, prims: List[PrimRecord]):
+        for other in range(self.workers):
+            if other != shard:
+                self.prims[other].extend(prims)
+
+    def run_for(self, seconds: float, step: float = 1.0) -> int:
+        """Run every shard for `seconds` of virtual time in `step` increments; returns events dispatched"""
+        dispatched = 0
+        for _ in range(max(1, math.ceil(seconds / step))):
+            avatars, self.avatars = self.avatars, None
+            for shard, connection in enumerate(self.connections):
+                connection.send(("step", step, self.inbound[shard], avatars, self.prims[shard], self.bus_limits))
+            self.inbound = [[] for _ in self.connections]
+            self.prims = [[] for _ in self.connections]
+            limits = [0] * self.workers
+            for shard, connection in enumerate(self.connections):
+                count, sent, overflow, limits[shard], prims = connection.recv()
+                dispatched += count
+                self._route_prims(shard, prims)
+                self.routed_chat += (sent + len(overflow)) * (self.workers - 1)
+                for other in range(self.workers):
+                    if other != shard:
+                        self.inbound[other].extend(overflow)
+            if self.bus is not None:
+                self.bus_limits = limits
+        return dispatched
+
+    def stop(self):
+        """Stop the workers and collect their final statistics"""
+        for connection in self.connections:
+            connection.send(("stop",))
+        self.shard_stats = [connection.recv() for connection in self.connections]
+        for process in self.processes:
+            process.join()
+        self.connections, self.processes = [], []
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.processes:
+            self.stop()
+
+
+# =============================================================================
+# Scaling benchmark
+# =============================================================================
+
+BENCHMARK_SCRIPT = """
+integer total = 0;
+default {
+    state_entry() { llSetTimerEvent(1.0); }
+    timer() {
+        integer i;
+        for (i = 0; i < 200; i++) { total += i; }
+    }
+}
+"""
+
+
+def benchmark(source: str = BENCHMARK_SCRIPT, copies: int = 200, max_workers: Optional[int] = None,
+              seconds: float = 30.0, step: float = 5.0) -> List[Dict[str, Any]]:
+    """Events per second for `copies` scripts on 1..max_workers shards"""
+    from lsl_antlr_parser import LSLParser
+    parsed = LSLParser(single_pass=True).parse(source)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    results = []
+    for workers in range(1, max_workers + 1):
+        region = ShardedRegion(workers)
+        for _ in range(copies):
+            region.add_script(parsed)
+        with region:
+            start = time.perf_counter()
+            events = region.run_for(seconds, step)
+            elapsed = time.perf_counter() - start
+        rate = events / elapsed if elapsed else 0.0
+        results.append({
+            'workers': workers,
+            'events': events,
+            'seconds': elapsed,
+            'events_per_second': rate,
+            'speedup': rate / results[0]['events_per_second'] if results else 1.0,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Region host scaling benchmark")
+    parser.add_argument("script", nargs="?", help="LSL script to run (default: built-in timer workload)")
+    parser.add_argument("--copies", type=int, default=200, help="number of script copies")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="largest shard count to try")
+    parser.add_argument("--seconds", type=float, default=30.0, help="virtual seconds to simulate")
+    parser.add_argument("--step", type=float, default=5.0, help="virtual seconds per lockstep step")
+    args = parser.parse_args()
+
+    source = BENCHMARK_SCRIPT
+    if args.script:
+        with open(args.script) as f:
+            source = f.read()
+
+    print(f"{'workers':>7} {'events':>9} {'seconds':>8} {'events/s':>10} {'speedup':>8}")
+    for row in benchmark(source, args.copies, args.workers, args.seconds, args.step):
+        print(f"{row['workers']:>7} {row['events']:>9} {row['seconds']:>8.2f} "
+              f"{row['events_per_second']:>10.0f} {row['speedup']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+LSL Scheduler
+One process-wide timer heap for every simulator's timers, sensor repeats and
+delayed events.
+
+Entries live in a binary heap ordered by deadline. A single daemon thread
+sleeps until the earliest deadline (or until an earlier entry arrives), runs
+the due callbacks and goes back to sleep, so a timed script costs no thread of
+its own. Cancelling marks an entry dead in O(1); dead entries are dropped when
+they reach the top of the heap, or all at once when they pile up. Re-arming is
+a cancel plus an O(log n) push.
+
+Periodic entries are re-armed from their previous deadline rather than from
+the time the callback ran, so periods do not drift. An entry that falls more
+than a period behind skips the missed ticks instead of firing a burst, like an
+LSL timer.
+
+Callbacks run on the scheduler thread and must be short; the simulator's only
+put an event on the script's queue.
+
+Time comes from a clock object. WallClock follows real time. VirtualClock only
+moves when told to; a scheduler on a virtual clock has no worker thread and
+`advance()` jumps the clock straight to the next deadline, so hours of timers
+and simulated latencies run in as long as their callbacks take, in the same
+order every run.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from lsl_log import category
+
+SCHEDULER_LOG = category("scheduler")
+
+# Rebuild the heap once this many entries (and over half of it) are cancelled
+COMPACT_THRESHOLD = 64
+
+# Unix time at which a VirtualClock starts: 2024-01-01T00:00:00Z
+VIRTUAL_EPOCH = 1704067200.0
+
+
+class WallClock:
+    """Real time: monotonic seconds for scheduling, time.time() for dates"""
+
+    virtual = False
+
+    def __call__(self) -> float:
+        return time.monotonic()
+
+    def unix_time(self) -> float:
+        return time.time()
+
+
+class VirtualClock:
+    """Simulated time that only moves through advance()/advance_to()"""
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0, epoch: float = VIRTUAL_EPOCH):
+        self.now = start
+        self.epoch = epoch
+
+    def __call__(self) -> float:
+        return self.now
+
+    def unix_time(self) -> float:
+        return self.epoch + self.now
+
+    def advance_to(self, when: float):
+        """Move forward to `when`; the clock never goes backwards"""
+        if when > self.now:
+            self.now = when
+
+    def advance(self, seconds: float):
+        self.advance_to(self.now + seconds)
+
+
+class TimerHandle:
+    """A scheduled callback; cancel() stops it and any later repeats"""
+
+    __slots__ = ("when", "interval", "callback", "args", "cancelled", "pending", "_scheduler")
+
+    def __init__(self, scheduler: "Scheduler", when: float, interval: Optional[float],
+                 callback: Callable, args: tuple):
+        self.when = when
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.pending = False
+        self._scheduler = scheduler
+
+    def cancel(self):
+        if not self.cancelled:
+            self._scheduler._cancelled(self)
+
+
+class Scheduler:
+    """Deadline heap, served by one worker thread unless the clock is virtual"""
+
+    def __init__(self, clock=None, threaded: Optional[bool] = None):
+        self.clock = clock if clock is not None else WallClock()
+        # Nothing would wake a worker on a virtual clock; advance() drives it instead
+        self.threaded = not getattr(self.clock, "virtual", False) if threaded is None else threaded
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._dead = 0
+        self.fired = 0
+        self.errors = 0
+
+    def __len__(self):
+        """Number of live (not cancelled) entries"""
+        with self._condition:
+            return len(self._heap) - self._dead
+
+    # =========================================================================
+    # Scheduling
+    # =========================================================================
+
+    def call_at(self, when: float, callback: Callable, *args: Any) -> TimerHandle:
+        """Run callback(*args) once at clock time `when`"""
+        handle = TimerHandle(self, when, None, callback, args)
+        self._push(handle)
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        """Run callback(*args) once after `delay` seconds"""
+        return self.call_at(self.clock() + max(0.0, delay), callback, *args)
+
+    def call_every(self, interval: float, callback: Callable, *args: Any,
+                   first_delay: Optional[float] = None) -> TimerHandle:
+        """Run callback(*args) every `interval` seconds, first after `first_delay` (default one interval)"""
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        delay = interval if first_delay is None else max(0.0, first_delay)
+        handle = TimerHandle(self, self.clock() + delay, interval, callback, args)
+        self._push(handle)
+        return handle
+
+    def next_deadline(self) -> Optional[float]:
+        """Deadline of the earliest live entry, or None if nothing is scheduled"""
+        with self._condition:
+            return self._peek()
+
+    # =========================================================================
+    # Running
+    # =========================================================================
+
+    def run_pending(self) -> Optional[float]:
+        """Run every callback that is due now; returns the next deadline"""
+        due = []
+        with self._condition:
+            now = self.clock()
+            while True:
+                deadline = self._peek()
+                if deadline is None or deadline > now:
+                    break
+                handle = heapq.heappop(self._heap)[2]
+                handle.pending = False
+                due.append(handle)
+                if handle.interval is not None:
+                    # Next tick counts from the deadline, skipping any ticks missed entirely
+                    missed = int((now - handle.when) // handle.interval)
+                    handle.when += handle.interval * (missed + 1)
+                    self._push_locked(handle)
+
+        for handle in due:
+            if handle.cancelled:
+                continue
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                self.errors += 1
+                SCHEDULER_LOG.error("Callback %s failed: %s", getattr(handle.callback, '__name__', handle.callback), e)
+            self.fired += 1
+
+        return self.next_deadline()
+
+    def advance(self, until: Optional[float] = None) -> bool:
+        """
+        Jump a virtual clock to the next deadline and run what is due there.
+        Returns False, without moving the clock, if nothing is scheduled at or
+        before `until`.
+        """
+        deadline = self.next_deadline()
+        if deadline is None or (until is not None and deadline > until):
+            return False
+        self.clock.advance_to(deadline)
+        self.run_pending()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry counts for this scheduler"""
+        with self._condition:
+            return {
+                'scheduled': len(self._heap) - self._dead,
+                'cancelled_pending': self._dead,
+                'fired': self.fired,
+                'errors': self.errors,
+            }
+
+    # =========================================================================
+    # Internals
+    # =========================================================================
+
+    def _push(self, handle: TimerHandle):
+        with self._condition:
+            self._push_locked(handle)
+            if self.threaded and self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="lsl-scheduler", daemon=True)
+                self._thread.start()
+
+    def _push_locked(self, handle: TimerHandle):
+        wakes_worker = not self._heap or handle.when < self._heap[0][0]
+        heapq.heappush(self._heap, (handle.when, next(self._sequence), handle))
+        handle.pending = True
+        if wakes_worker:
+            self._condition.notify()
+
+    def _peek(self) -> Optional[float]:
+        """Earliest live deadline, discarding cancelled entries on top; lock held"""
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)[2].pending = False
+            self._dead -= 1
+        return heap[0][0] if heap else None
+
+    def _cancelled(self, handle: TimerHandle):
+        # The flag is set under the lock, so _peek never discards an entry the count missed
+        with self._condition:
+            if handle.cancelled:
+                return
+            handle.cancelled = True
+            if not handle.pending:
+                return
+            self._dead += 1
+            if self._dead > COMPACT_THRESHOLD and self._dead * 2 > len(self._heap):
+                live = []
+                for entry in self._heap:
+                    if entry[2].cancelled:
+                        entry[2].pending = False
+                    else:
+                        live.append(entry)
+                heapq.heapify(live)
+                self._heap = live
+                self._dead = 0
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while True:
+                    deadline = self._peek()
+                    if deadline is None:
+                        self._condition.wait()
+                        continue
+                    delay = deadline - self.clock()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+            self.run_pending()
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """The process-wide scheduler shared by all simulators"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = Scheduler()
+        return _default_scheduler
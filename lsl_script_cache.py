@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+LSL Script Cache
+On-disk cache of parsed scripts - an `__pycache__` for LSL.
+
+Each script gets one cache file in `__lslcache__/` next to it (or in a
+configured cache directory). The file carries a key built from the source
+content hash, the parser version and the active dialect; any mismatch is a
+miss and the entry is rewritten, so invalidation is automatic.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from lsl_antlr_parser import LSLParser, PARSER_VERSION
+from lsl_dialect import get_dialect
+
+CACHE_DIR_NAME = "__lslcache__"
+CACHE_MAGIC = b"LSLC"
+CACHE_SUFFIX = ".lslc"
+
+
+class ScriptCache:
+    """Parse-once cache for LSL scripts keyed by source hash, parser version and dialect"""
+
+    def __init__(self, cache_dir: Optional[str] = None, single_pass: bool = True):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.single_pass = single_pass
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset hit/miss statistics"""
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+            self.writes = 0
+            self.errors = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics for this cache"""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'writes': self.writes,
+                'errors': self.errors,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def cache_key(self, source: str, dialect=None) -> str:
+        """Cache key: content hash + parser version + dialect"""
+        dialect = dialect or get_dialect()
+        digest = hashlib.sha256()
+        digest.update(f"{PARSER_VERSION}\0{dialect.value}\0".encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def cache_path(self, script_path: str, dialect=None) -> Path:
+        """Location of the cache file for a script"""
+        dialect = dialect or get_dialect()
+        script_path = Path(script_path)
+        cache_dir = self.cache_dir or script_path.parent / CACHE_DIR_NAME
+        return cache_dir / f"{script_path.stem}.{dialect.value}-p{PARSER_VERSION}{CACHE_SUFFIX}"
+
+    def load(self, script_path: str, dialect=None) -> Dict[str, Any]:
+        """Read a script from disk and return its parsed form"""
+        with open(script_path, "r") as f:
+            source = f.read()
+        return self.parse(source, script_path, dialect)
+
+    def parse(self, source: str, script_path: str, dialect=None) -> Dict[str, Any]:
+        """Return the parsed form of `source`, from cache when the key matches"""
+        key = self.cache_key(source, dialect)
+        path = self.cache_path(script_path, dialect)
+
+        entry = self._read(path)
+        if entry is not None and entry.get('key') == key:
+            self._count('hits')
+            return entry['parsed']
+
+        self._count('misses')
+        if entry is not None:
+            self._count('invalidations')
+
+        parsed = LSLParser(single_pass=self.single_pass).parse(source)
+        self._write(path, {'key': key, 'parsed': parsed})
+        return parsed
+
+    def clear(self, script_path: str, dialect=None):
+        """Remove the cache entry for a script"""
+        try:
+            self.cache_path(script_path, dialect).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Read a cache entry; unreadable entries are treated as absent"""
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                    return None
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._count('errors')
+            return None
+
+    def _write(self, path: Path, entry: Dict[str, Any]):
+        """Write a cache entry atomically; failures only cost the next load a reparse"""
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(CACHE_MAGIC)
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._count('writes')
+        except Exception:
+            self._count('errors')
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            setattr(self, stat, getattr(self, stat) + 1)
+
+
+# Process-wide cache used by the command line tools
+script_cache = ScriptCache()
+
+def load_script(script_path: str, source: Optional[str] = None, dialect=None) -> Dict[str, Any]:
+    """Parse a script through the process-wide cache"""
+    if source is None:
+        return script_cache.load(script_path, dialect)
+    return script_cache.parse(source, script_path, dialect)
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of the process-wide cache"""
+    return script_cache.get_stats()
@@ -9,18 +9,210 @@ from queue import Queue
 from simple_expression_evaluator import SimpleExpressionEvaluator
 from lsl_statement_executor import StatementExecutor
 from lsl_api_expanded import LSLAPIExpanded
+from lsl_scheduler import get_scheduler
+from lsl_listeners import ListenerRegistry
+from lsl_http import HttpClient
+from lsl_notecards import EOF, NotecardStore, open_store
+from lsl_log import category
+from lsl_linker import Linker
+
+# Simulated latency for mocked notecard reads, in seconds (HTTP's is lsl_http.SIMULATED_LATENCY)
+NOTECARD_READ_DELAY = 0.1
+# Idle frames kept per handler; more are only needed while a handler re-enters itself
+FRAME_POOL_SIZE = 4
+
+API_LOG = category("api")
+CHAT_LOG = category("chat")
+COMPILER_LOG = category("compiler")
+DATASERVER_LOG = category("dataserver")
+EVENT_LOG = category("event")
+HTTP_LOG = category("http")
+SENSOR_LOG = category("sensor")
+SIMULATOR_LOG = category("simulator")
+
+# LSL constants; every script's global scope starts with these, in their slots
+LSL_CONSTANTS = {
+    "PI": 3.141592653589793,
+    "PI_BY_TWO": 3.141592653589793 / 2,
+    "TRUE": 1,
+    "FALSE": 0,
+    "NULL_KEY": "00000000-0000-0000-0000-000000000000",
+    "ZERO_VECTOR": [0.0, 0.0, 0.0],
+
+    # Object constants
+    "AGENT": 1,
+    "ACTIVE": 2,
+    "PASSIVE": 4,
+    "SCRIPTED": 8,
+    "ALL_SIDES": -1,
+    "OBJECT_NAME": 1,
+    "OBJECT_DESC": 2,
+    "OBJECT_POS": 3,
+    "OBJECT_ROT": 4,
+    "OBJECT_VELOCITY": 5,
+    "OBJECT_OWNER": 6,
+    "OBJECT_GROUP": 7,
+    "OBJECT_CREATOR": 8,
+
+    # Link constants
+    "LINK_ROOT": 1,
+    "LINK_SET": -1,
+    "LINK_ALL_OTHERS": -2,
+    "LINK_ALL_CHILDREN": -3,
+    "LINK_THIS": -4,
+
+    # Inventory constants
+    "INVENTORY_NOTECARD": 7,
+
+    # HTTP constants
+    "HTTP_METHOD": 0,
+    "HTTP_MIMETYPE": 1,
+    "HTTP_BODY_MAXLENGTH": 2,
+    "HTTP_VERIFY_CERT": 3,
+    "HTTP_CUSTOM_HEADER": 5,
+    "HTTP_BODY_TRUNCATED": 0,
+
+    # JSON constants
+    "JSON_OBJECT": "object",
+    "JSON_ARRAY": "array",
+    "JSON_INVALID": "invalid",
+
+    # Changed constants
+    "CHANGED_REGION_RESTART": 1024,
+    "CHANGED_OWNER": 128,
+
+    # String constants
+    "STRING_TRIM": 0,
+    "EOF": EOF,
+}
+
+class SlotLayout:
+    """Variable name to slot index mapping, shared by every frame of one body."""
+    __slots__ = ('names', 'index')
+
+    def __init__(self, names=()):
+        self.names = []
+        self.index = {}
+        for name in names:
+            self.slot(name)
+
+    def slot(self, name):
+        """Slot index for a name, allocating a new slot if needed."""
+        index = self.index.get(name)
+        if index is None:
+            index = self.index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def copy(self):
+        """A layout with the same slots that can grow on its own"""
+        layout = SlotLayout()
+        layout.names = list(self.names)
+        layout.index = dict(self.index)
+        return layout
+
+CONSTANTS_LAYOUT = SlotLayout(LSL_CONSTANTS)
 
 class Frame:
-    """A single frame on the call stack, holding local variables."""
-    def __init__(self, parent_scope):
-        self.locals = {}
+    """
+    A single frame on the call stack, holding local variables.
+    Values live in a list indexed by the slots of the frame's layout; compiled
+    code reads and writes `values[slot]` directly. None marks an unset slot.
+    """
+    __slots__ = ('values', 'layout', 'parent')
+
+    def __init__(self, parent_scope, layout=None):
+        self.layout = layout if layout is not None else SlotLayout()
+        self.values = [None] * len(self.layout.names)
         self.parent = parent_scope
 
     def get(self, name):
-        return self.locals.get(name)
+        index = self.layout.index.get(name)
+        if index is not None and index < len(self.values):
+            return self.values[index]
+        return None
 
     def set(self, name, value):
-        self.locals[name] = value
+        index = self.layout.index.get(name)
+        if index is None or index >= len(self.values):
+            index = self.reserve(name)
+        self.values[index] = value
+
+    def has(self, name):
+        """True if this frame itself defines the variable."""
+        index = self.layout.index.get(name)
+        return index is not None and index < len(self.values) and self.values[index] is not None
+
+    def reserve(self, name):
+        """Slot index for a name, growing `values` in place so held references stay valid."""
+        index = self.layout.slot(name)
+        if index >= len(self.values):
+            self.values.extend([None] * (index + 1 - len(self.values)))
+        return index
+
+    @property
+    def locals(self):
+        """Snapshot of the variables set in this frame, by name."""
+        return {name: value for name, value in zip(self.layout.names, self.values) if value is not None}
+
+def argument_names(args):
+    """Parameter names from ANTLR dicts, "type name" strings or a comma separated string"""
+    if isinstance(args, str):
+        args = args.split(",")
+    names = []
+    for arg in args or []:
+        if isinstance(arg, dict):
+            if "name" in arg:
+                names.append(arg["name"])
+        elif str(arg).strip():
+            names.append(str(arg).split()[-1])
+    return names
+
+class EventHandler:
+    """
+    One state's handler for one event, resolved at load time: the compiled body
+    (or the statements to interpret), the slot each argument binds to and a
+    pool of frames that are cleared and reused instead of allocated per event.
+    """
+    __slots__ = ('event', 'compiled', 'body', 'layout', 'arg_slots', 'pool')
+
+    def __init__(self, event, handler, compiled=None):
+        names = argument_names(handler.get("args", []))
+        self.event = event
+        self.compiled = compiled
+        self.body = handler.get("body", [])
+        # Interpreted handlers get a layout of their own, shared by their frames
+        self.layout = getattr(compiled, 'layout', None) or SlotLayout(names)
+        self.arg_slots = tuple(self.layout.slot(name) for name in names)
+        self.pool = []
+
+    def acquire(self, parent):
+        """A frame for one run of the handler, with `args` still to bind"""
+        if self.pool:
+            frame = self.pool.pop()
+            frame.parent = parent
+            return frame
+        return Frame(parent, self.layout)
+
+    def release(self, frame):
+        # Cleared now so a pooled frame holds no values alive; the layout may have grown
+        frame.values = [None] * len(self.layout.names)
+        if len(self.pool) < FRAME_POOL_SIZE:
+            self.pool.append(frame)
+
+class ReturnValue:
+    """Signals a `return` out of nested statement blocks, carrying its value."""
+    __slots__ = ('value',)
+
+    def __init__(self, value=None):
+        self.value = value
+
+# Loop control signals returned by _execute_statements
+BREAK = object()
+CONTINUE = object()
+
+# Put on the event queue by stop() to wake a blocked event loop
+SHUTDOWN = object()
 
 class CallStack:
     def __init__(self, global_scope):
@@ -38,8 +230,9 @@ class CallStack:
         return None
 
 class LSLSimulator:
-    def __init__(self, parsed_script, debug_mode=False, source_code="", breakpoints=None):
-        self.global_scope = Frame(None)
+    def __init__(self, parsed_script, debug_mode=False, source_code="", breakpoints=None, use_compiler=True, use_bytecode=False,
+                 scheduler=None, inventory=None, dialect=None, mode=None):
+        self.global_scope = Frame(None, CONSTANTS_LAYOUT.copy())
         self.call_stack = CallStack(self.global_scope)
         self.user_functions = parsed_script.get("functions", {})
         self.states = parsed_script.get("states", {})
@@ -48,12 +241,23 @@ class LSLSimulator:
         self.event_queue = Queue()
         self.event_queue_lock = threading.Lock()
         self._is_running = True
+        self._reset_dispatch_stats()
         
         # Thread-safe shared state
-        self.active_listeners = []  # List of listener dictionaries
-        self.listeners_lock = threading.Lock()
-        self.listener_handle_counter = 1  # Counter for generating unique handles
+        self.listeners = ListenerRegistry()  # replaced by the region's registry when hosted
         self.counter_lock = threading.Lock()
+        
+        # Timers, sensor repeats and delayed events share one process-wide scheduler
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.timer_handle = None
+        self.sensor_repeat_handle = None
+        self.sensor_ranges = {}
+        # llHTTPRequest's client; a region gives all its scripts one shared client
+        self.http = HttpClient(self.scheduler)
+        # Notecards come from a directory (the working directory by default), indexed once per store
+        if not isinstance(inventory, NotecardStore):
+            inventory = open_store(inventory if inventory is not None else ".")
+        self.notecards = inventory
         # Initialize simple expression evaluator (replaces pyparsing)
         self.expression_evaluator = SimpleExpressionEvaluator(self)
         self.debug_mode = debug_mode
@@ -70,54 +274,87 @@ class LSLSimulator:
         # Sensor detection data for llDetectedKey/llDetectedDist functions
         self.detected_avatars = []  # List of detected avatar data: [{"key": "...", "name": "...", "distance": 2.5}, ...]
         
+        # Set by a RegionHost: chat, link messages and sensor data then go through the region
+        self.region = None
+        self.object_id = None  # link set the script's prim belongs to
+        self.object_name = "Object"
+        self.object_key = str(uuid.uuid4())
+        self.link_number = 1
+        
         # Initialize statement executor
         self.statement_executor = StatementExecutor()
         
-        # Initialize comprehensive LSL API (single source of truth)
-        self.lsl_api = LSLAPIExpanded()
+        # Initialize comprehensive LSL API (single source of truth); its time
+        # functions read the scheduler's clock
+        self.lsl_api = LSLAPIExpanded(clock=self.scheduler.clock)
+
+        # Every called name is resolved once, for the active dialect and mode (default HYBRID)
+        self.linker = Linker(self, dialect, mode).link_script(parsed_script)
         
         # Initialize LSL constants in global scope
         self._initialize_lsl_constants()
         
+        # Globals without an initializer get their type's default value
         for var in parsed_script.get("globals", []):
-            self.global_scope.set(var['name'], self._evaluate_expression(var.get('value')))
+            self._execute_simple_statement({
+                "type": "declaration",
+                "lsl_type": var.get('type'),
+                "name": var['name'],
+                "value": var.get('value')
+            })
+        
+        # Compile bodies to closures once; the debugger needs per-statement
+        # hooks, so debug sessions stay on the interpreter
+        self.compiled_functions = {}
+        self.compiled_handlers = {}
+        self.bytecode_vm = None
+        if use_bytecode and not debug_mode:
+            self._compile_bytecode(parsed_script)
+        elif use_compiler and not debug_mode:
+            self._compile_script()
+        self._build_dispatch_tables()
 
-    def _initialize_lsl_constants(self):
-        """Initialize LSL constants in the global scope"""
-        # Basic constants
-        self.global_scope.set("PI", 3.141592653589793)
-        self.global_scope.set("PI_BY_TWO", 3.141592653589793 / 2)
-        self.global_scope.set("TRUE", 1)
-        self.global_scope.set("FALSE", 0)
-        self.global_scope.set("NULL_KEY", "00000000-0000-0000-0000-000000000000")
-        self.global_scope.set("ZERO_VECTOR", [0.0, 0.0, 0.0])
-        
-        # Object constants
-        self.global_scope.set("AGENT", 1)
-        self.global_scope.set("ALL_SIDES", -1)
-        self.global_scope.set("OBJECT_POS", 1)
-        
-        # Inventory constants
-        self.global_scope.set("INVENTORY_NOTECARD", 7)
-        
-        # HTTP constants
-        self.global_scope.set("HTTP_METHOD", "method")
-        self.global_scope.set("HTTP_MIMETYPE", "mimetype")
-        self.global_scope.set("HTTP_CUSTOM_HEADER", "header")
-        
-        # JSON constants
-        self.global_scope.set("JSON_OBJECT", "object")
-        self.global_scope.set("JSON_ARRAY", "array")
-        self.global_scope.set("JSON_INVALID", "invalid")
-        
-        # Changed constants
-        self.global_scope.set("CHANGED_REGION_RESTART", 1024)
-        self.global_scope.set("CHANGED_OWNER", 128)
-        
-        # String constants
-        self.global_scope.set("STRING_TRIM", 0)
-        self.global_scope.set("EOF", "EOF")
+    def _compile_script(self):
+        """Compile user functions and event handlers; unsupported bodies stay interpreted."""
+        from lsl_compiler import ScriptCompiler
+        compiler = ScriptCompiler(self)
+        self.compiled_functions, self.compiled_handlers = compiler.compile_script(self.user_functions, self.states)
+        for error in compiler.errors:
+            COMPILER_LOG.info("Interpreting %s", error)
+
+    def _build_dispatch_tables(self):
+        """Resolve every state's handlers once, so dispatch is a dict lookup and a call."""
+        self.dispatch_tables = {
+            state_name: {event_name: EventHandler(event_name, handler,
+                                                  self.compiled_handlers.get((state_name, event_name)))
+                         for event_name, handler in events.items()}
+            for state_name, events in self.states.items()
+        }
+        self.state_handlers = self.dispatch_tables.get(self.current_state, {})
+
+    def _compile_bytecode(self, parsed_script):
+        """Compile bodies to bytecode and run them on the VM; unsupported bodies stay interpreted."""
+        from functools import partial
+        from lsl_bytecode import BytecodeCompiler, BytecodeVM
+        compiler = BytecodeCompiler()
+        bytecode = compiler.compile_script(parsed_script)
+        self.bytecode_vm = BytecodeVM(self, bytecode)
+
+        def entry(code):
+            # Frames for the body are created with the layout its name slots index
+            run = partial(self.bytecode_vm.execute, code)
+            run.layout = code.layout
+            return run
+        self.compiled_functions = {name: entry(code) for name, code in bytecode.functions.items()}
+        self.compiled_handlers = {key: entry(code) for key, code in bytecode.handlers.items()}
+        for error in compiler.errors:
+            COMPILER_LOG.info("Bytecode: interpreting %s", error)
 
+    def _initialize_lsl_constants(self):
+        """Initialize LSL constants in the global scope (their slots come with its layout)"""
+        values = self.global_scope.values
+        for index, value in enumerate(LSL_CONSTANTS.values()):
+            values[index] = list(value) if isinstance(value, list) else value
 
     def _evaluate_expression(self, expr_str):
         """
@@ -166,42 +403,14 @@ class LSLSimulator:
             # Execute the statement first
             return_value = None
             if isinstance(stmt, dict):
-                stmt_type = stmt.get("type")
-                if stmt_type == "simple" or stmt_type == "declaration":
-                    return_value = self._execute_simple_statement(stmt)
-                elif stmt_type == "expression_statement":
-                    # Handle expression statements by executing the expression
-                    expression = stmt.get("expression", "")
-                    if expression:
-                        return_value = self._execute_simple_statement({"type": "simple", "statement": expression})
-                elif stmt_type == "assignment":
-                    return_value = self._execute_assignment_statement(stmt)
-                elif stmt_type == "if":
-                    return_value = self._execute_if_statement(stmt)
-                elif stmt_type == "while":
-                    return_value = self._execute_while_loop(stmt)
-                elif stmt_type == "for":
-                    return_value = self._execute_for_loop(stmt)
-                elif stmt_type == "return":
-                    return self._evaluate_expression(stmt.get("value"))
+                return_value = self._execute_statement(stmt)
             elif isinstance(stmt, str):
-                # Handle raw string statements with proper if/else logic
+                # Handle raw string statements
                 stmt_str = stmt.strip()
                 if stmt_str and not stmt_str.startswith("//"):
-                    # Handle return statements
                     if stmt_str == "return" or stmt_str == "return;":
-                        return None  # Early return from function
-                    
-                    # Handle structured if statements (parsed by ANTLR)
-                    if isinstance(stmt, dict) and stmt.get('type') == 'if_statement':
-                        return_value = self._execute_if_statement(stmt)
-                        if return_value is not None:
-                            return return_value
-                        i += 1
-                        continue
-                    
-                    # Handle structured statements
-                    return_value = self._execute_simple_statement({"type": "simple", "statement": stmt_str})
+                        return ReturnValue()  # Early return from function
+                    self._execute_simple_statement({"type": "simple", "statement": stmt_str})
             
             # Then check for debug pause AFTER execution
             if self.debug_mode and should_debug and (line_num in self.breakpoints or self.single_step):
@@ -229,6 +438,70 @@ class LSLSimulator:
             i += 1
         return None
 
+    def _execute_statement(self, stmt):
+        """
+        Execute one structured statement.
+        Returns None to continue, or a ReturnValue / BREAK / CONTINUE signal.
+        """
+        stmt_type = stmt.get("type")
+        if stmt_type == "expression_statement":
+            self._evaluate_expression(stmt.get("expression"))
+        elif stmt_type == "assignment":
+            self._execute_assignment_statement(stmt)
+        elif stmt_type in ("variable_declaration", "simple", "declaration"):
+            self._execute_simple_statement(stmt)
+        elif stmt_type == "compound":
+            return self._execute_statements(stmt.get("statements", []))
+        elif stmt_type in ("if_statement", "if"):
+            return self._execute_if_statement(stmt)
+        elif stmt_type in ("while_statement", "while"):
+            return self._execute_while_loop(stmt)
+        elif stmt_type in ("for_statement", "for"):
+            return self._execute_for_loop(stmt)
+        elif stmt_type == "do_while_statement":
+            return self._execute_do_while_loop(stmt)
+        elif stmt_type == "return_statement":
+            return ReturnValue(self._evaluate_expression(stmt.get("expression")))
+        elif stmt_type == "return":
+            return ReturnValue(self._evaluate_expression(stmt.get("value")))
+        elif stmt_type == "state_change":
+            self._change_state(stmt["state"])
+            return ReturnValue()
+        elif stmt_type == "break":
+            return BREAK
+        elif stmt_type == "continue":
+            return CONTINUE
+        return None
+
+    def _execute_body(self, body):
+        """Execute a loop or branch body given as a statement list or a single statement."""
+        if body is None:
+            return None
+        if isinstance(body, list):
+            return self._execute_statements(body)
+        if isinstance(body, dict):
+            return self._execute_statement(body)
+        return self._execute_statements([body])
+
+    def _execute_if_statement(self, if_node):
+        if self._evaluate_expression(if_node["condition"]):
+            return self._execute_body(if_node.get("then_statement", if_node.get("body")))
+        return self._execute_body(if_node.get("else_statement", if_node.get("else_body")))
+
+    def _change_state(self, new_state):
+        """Run state_exit, switch state and queue state_entry for the new state."""
+        if new_state not in self.states:
+            SIMULATOR_LOG.warning("Unknown state: %s", new_state)
+            return
+        if new_state == self.current_state:
+            return
+        self.trigger_event("state_exit")
+        # Listens do not survive a state change
+        self.listeners.remove_owner(self)
+        self.current_state = new_state
+        self.state_handlers = self.dispatch_tables.get(new_state, {})
+        self.queue_event("state_entry")
+
     def _find_statement_line(self, stmt_str):
         """Find the line number for a string statement by searching source code"""
         if not stmt_str or not self.source_lines:
@@ -284,7 +557,7 @@ class LSLSimulator:
         """Find which scope contains a variable, returning the scope or None"""
         current = self.call_stack.get_current_scope()
         while current:
-            if hasattr(current, 'locals') and var_name in current.locals:
+            if current.has(var_name):
                 return current
             current = getattr(current, 'parent', None)
         return None
@@ -293,60 +566,65 @@ class LSLSimulator:
         """Execute assignment statement with operators like =, +=, -=, etc."""
         lvalue = stmt["lvalue"]
         operator = stmt["operator"]
-        expression_text = stmt["expression"]
         
         # Evaluate the right-hand side expression
-        new_value = self._evaluate_expression(expression_text)
+        new_value = self._evaluate_expression(stmt["expression"])
+        
+        # `v.x = ...` assigns one component of a vector or rotation
+        var_name, _, component = lvalue.partition(".")
         
         # Find the correct scope for assignment - prefer existing variable locations
-        target_scope = self._find_variable_scope(lvalue)
+        target_scope = self._find_variable_scope(var_name)
         if target_scope is None:
             # Variable doesn't exist, create it in current scope
             target_scope = self.call_stack.get_current_scope()
         
-        if operator == "=":
-            # Simple assignment
-            target_scope.set(lvalue, new_value)
-        elif operator == "+=":
-            # Addition assignment
-            if lvalue in target_scope.locals:
-                current_value = target_scope.get(lvalue)
-            else:
-                current_value = ""
-            
-            if isinstance(current_value, str) and isinstance(new_value, str):
-                # String concatenation
-                result = current_value + new_value
-            else:
-                # Numeric addition
-                current_num = float(current_value) if current_value else 0.0
-                new_num = float(new_value) if new_value else 0.0
-                result = current_num + new_num
-            target_scope.set(lvalue, result)
-        elif operator == "-=":
-            current_value = target_scope.get(lvalue) or 0
-            result = float(current_value) - float(new_value)
-            target_scope.set(lvalue, result)
-        elif operator == "*=":
-            current_value = target_scope.get(lvalue) or 0
-            result = float(current_value) * float(new_value)
-            target_scope.set(lvalue, result)
-        elif operator == "/=":
-            current_value = target_scope.get(lvalue) or 0
-            result = float(current_value) / float(new_value) if new_value != 0 else 0
-            target_scope.set(lvalue, result)
-        elif operator == "%=":
-            current_value = target_scope.get(lvalue) or 0
-            result = float(current_value) % float(new_value) if new_value != 0 else 0
-            target_scope.set(lvalue, result)
+        if component:
+            current_value = target_scope.get(var_name)
+            target = self._get_component(current_value, component)
+        else:
+            target = target_scope.get(var_name)
         
+        if operator != "=":
+            if target is None:
+                target = "" if isinstance(new_value, str) else 0
+            new_value = self.expression_evaluator._binary_operators[operator[:-1]](
+                self.expression_evaluator, target, new_value)
+        
+        if component:
+            vector = list(current_value) if isinstance(current_value, list) else [0.0, 0.0, 0.0]
+            index = "xyzs".find(component)
+            if 0 <= index < len(vector):
+                vector[index] = float(new_value)
+            new_value = vector
+        
+        target_scope.set(var_name, new_value)
         return None
 
+    def _execute_loop_body(self, body):
+        """Run one loop iteration; returns (stop, result) for the enclosing loop."""
+        result = self._execute_body(body)
+        if result is BREAK:
+            return True, None
+        if result is CONTINUE or result is None:
+            return False, None
+        return True, result
+
     def _execute_while_loop(self, while_node):
-        while self._evaluate_expression(while_node["condition"]):
-            result = self._execute_statements(while_node["body"])
-            if result is not None:
+        body = while_node.get("statement", while_node.get("body"))
+        while self._is_running and self._evaluate_expression(while_node["condition"]):
+            stop, result = self._execute_loop_body(body)
+            if stop:
+                return result
+        return None
+
+    def _execute_do_while_loop(self, do_node):
+        while self._is_running:
+            stop, result = self._execute_loop_body(do_node["statement"])
+            if stop:
                 return result
+            if not self._evaluate_expression(do_node["condition"]):
+                break
         return None
 
     def _execute_for_loop(self, for_node):
@@ -356,14 +634,7 @@ class LSLSimulator:
             
             # Handle ANTLR4 structured format (dict) vs old string format
             if isinstance(init_stmt, dict):
-                # New ANTLR4 format: {"type": "assignment", "lvalue": "i", "operator": "=", "expression": "0"}
-                if init_stmt.get("type") == "assignment":
-                    self._execute_assignment_statement(init_stmt)
-                elif init_stmt.get("type") == "declaration":
-                    self._execute_simple_statement(init_stmt)
-                else:
-                    # Generic statement execution
-                    self._execute_statements([init_stmt])
+                self._execute_statement(init_stmt)
             else:
                 # Old string format handling
                 # Check if it's a declaration (like "integer i = 1")
@@ -380,14 +651,19 @@ class LSLSimulator:
                     # It's a simple assignment
                     self._execute_simple_statement({"type": "simple", "statement": init_stmt})
         
+        body = for_node.get("statement", for_node.get("body"))
+        condition = for_node.get("condition")
+        
         # Execute loop
-        while self._evaluate_expression(for_node["condition"]):
-            result = self._execute_statements(for_node["body"])
-            if result is not None:
+        while self._is_running and (condition is None or self._evaluate_expression(condition)):
+            stop, result = self._execute_loop_body(body)
+            if stop:
                 return result
             
             # Execute increment
-            if for_node.get("increment"):
+            if for_node.get("update"):
+                self._evaluate_expression(for_node["update"])
+            elif for_node.get("increment"):
                 self._execute_simple_statement({"type": "simple", "statement": for_node["increment"]})
         
         return None
@@ -398,8 +674,10 @@ class LSLSimulator:
         # Save current debug context before function call
         saved_statement_info = self.next_statement_info.copy() if isinstance(self.next_statement_info, dict) else None
         
-        # Create new frame for function
-        new_frame = Frame(parent_scope=self.call_stack.get_current_scope())
+        # Create new frame for function, laid out for its compiled body if there is one
+        compiled = self.compiled_functions.get(func_name)
+        new_frame = Frame(parent_scope=self.call_stack.get_current_scope(),
+                          layout=getattr(compiled, 'layout', None))
         
         # Set function arguments
         arg_names = func_def["args"]
@@ -419,8 +697,11 @@ class LSLSimulator:
         
         # Execute function body
         self.call_stack.push(new_frame)
-        return_value = self._execute_statements(func_def["body"])
-        self.call_stack.pop()
+        try:
+            result = compiled() if compiled else self._execute_statements(func_def["body"])
+        finally:
+            self.call_stack.pop()
+        return_value = result.value if isinstance(result, ReturnValue) else None
         
         # Restore debug context after function call
         if saved_statement_info and self.debug_mode:
@@ -429,123 +710,143 @@ class LSLSimulator:
         return return_value
 
     def _call_api_function(self, func_name, args):
-        """Call an API function - either built-in LSL function or user-defined function."""
-        # First check if it's a user-defined function
+        """Call a built-in or user-defined function through the linker's table."""
         if func_name in self.user_functions:
             return self._call_user_function(func_name, args)
-        
-        # Then check if it's a built-in LSL function
-        # Try direct method name first (e.g., llSay)
-        if hasattr(self, func_name):
-            func = getattr(self, func_name)
-            if callable(func):
-                print(f"[LSL API - HASATTR PATH]: {func_name} called with {args}")
-                return func(*args)
-        
-        # Try with api_ prefix for extended API functions
-        api_method_name = f"api_{func_name}"
-        if hasattr(self, api_method_name):
-            func = getattr(self, api_method_name)
-            if callable(func):
-                print(f"[LSL API]: {func_name} called with {args}")
-                return func(*args)
-        
-        # Handle through the extended API if available
-        if hasattr(self, 'lsl_api') and hasattr(self.lsl_api, func_name):
-            func = getattr(self.lsl_api, func_name)
-            if callable(func):
-                print(f"[LSL API]: {func_name} called with {args}")
-                return func(*args)
-        
-        # Function not found
-        print(f"[LSL API]: Unknown function: {func_name}")
-        return None
+        if API_LOG.debug_on:
+            API_LOG.debug("%s called with %s", func_name, args)
+        return self.linker.target(func_name)(*args)
+
+    def _notecard_reply(self, data):
+        """Deliver notecard data as a dataserver event after the read delay; returns the query key"""
+        query_id = str(uuid.uuid4())
+        self.scheduler.call_later(NOTECARD_READ_DELAY, self.queue_event, "dataserver", [query_id, data])
+        return query_id
+
+    def queue_event(self, event_name, args=None):
+        """Queue an event for the event loop; `args` is the handler's argument list."""
+        self.event_queue.put((event_name, list(args) if args else [], time_module.perf_counter()))
 
     def run(self):
-        # Thread-safe event queue operations
-        print("[SIMULATOR] 🚀 run() method called - Queueing state_entry event")
-        self.event_queue.put(("state_entry", []))
-        print("[SIMULATOR] ✅ state_entry event queued")
-        
-        print("[SIMULATOR] 🔄 Entering main event loop")
+        """
+        Event loop: block until an event is queued, dispatch it, repeat until stop().
+        Timers and delayed events are queued by the scheduler, so an idle script
+        sleeps instead of polling. On a VirtualClock an empty queue advances the
+        clock to the next deadline instead.
+        """
+        self.queue_event("state_entry")
+        SIMULATOR_LOG.info("Entering the event loop")
+        scheduler = self.scheduler
+        virtual = getattr(scheduler.clock, 'virtual', False)
         while self._is_running:
-            try:
-                # Non-blocking get with timeout
-                event_name, args = self.event_queue.get(timeout=0.1)
-                print(f"[SIMULATOR] 📨 Processing event: {event_name}")
-                self.trigger_event(event_name, *args)
+            if virtual and self.event_queue.empty() and scheduler.advance():
+                continue
+            event = self.event_queue.get()
+            if event is SHUTDOWN:
                 self.event_queue.task_done()
-            except:
-                # Queue is empty, continue the loop
-                pass
+                break
+            if EVENT_LOG.debug_on:
+                EVENT_LOG.debug("Processing %s", event[0])
+            self._dispatch_event(event)
+
+    def run_for(self, seconds):
+        """
+        Run the script for `seconds` of virtual time and return the number of
+        events dispatched. Needs a scheduler on a VirtualClock: whenever the event
+        queue is empty the clock jumps straight to the next scheduled deadline.
+        """
+        scheduler = self.scheduler
+        if not getattr(scheduler.clock, 'virtual', False):
+            raise ValueError("run_for() needs a scheduler on a VirtualClock")
+        end = scheduler.clock() + seconds
+        dispatched = 0
+        while self._is_running:
+            while self._is_running and not self.event_queue.empty():
+                event = self.event_queue.get_nowait()
+                if event is SHUTDOWN:
+                    self.event_queue.task_done()
+                    break
+                self._dispatch_event(event)
+                dispatched += 1
+            if not self._is_running or not scheduler.advance(until=end):
+                break
+        scheduler.clock.advance_to(end)
+        return dispatched
+
+    def _dispatch_event(self, event):
+        """
+        Run one queued event, recording how long it waited in the queue and how
+        long dispatching it took on top of running the handler body.
+        """
+        event_name, args, queued_at = event
+        started = time_module.perf_counter()
+        latency = started - queued_at
+        self.events_dispatched += 1
+        self.dispatch_latency_total += latency
+        if latency > self.dispatch_latency_max:
+            self.dispatch_latency_max = latency
+        handler_time = self.handler_time_total
+        try:
+            self.trigger_event(event_name, *args)
+        except Exception as e:
+            # A failing handler is reported and the script keeps running, as in SL
+            self.dispatch_errors += 1
+            SIMULATOR_LOG.error("Error in %s handler: %s", event_name, e)
+        finally:
+            self.dispatch_overhead_total += (time_module.perf_counter() - started
+                                             - (self.handler_time_total - handler_time))
+            self.event_queue.task_done()
+
+    def _reset_dispatch_stats(self):
+        self.events_dispatched = 0
+        self.dispatch_errors = 0
+        self.dispatch_latency_total = 0.0
+        self.dispatch_latency_max = 0.0
+        # Time inside handler bodies, and everything else _dispatch_event spends per event
+        self.handler_time_total = 0.0
+        self.dispatch_overhead_total = 0.0
 
     def trigger_event(self, event_name, *args):
+        if EVENT_LOG.debug_on or HTTP_LOG.debug_on or DATASERVER_LOG.debug_on or SENSOR_LOG.debug_on:
+            self._log_event(event_name, args)
+        handler = self.state_handlers.get(event_name)
+        if handler is None:
+            return
+        frame = handler.acquire(self.global_scope)
+        values = frame.values
+        for slot, value in zip(handler.arg_slots, args):
+            values[slot] = value
+
+        frames = self.call_stack.frames
+        # Handlers run from inside another (state_exit on a state change) count as its body time
+        outermost = not frames
+        frames.append(frame)
+        started = time_module.perf_counter()
+        try:
+            if handler.compiled:
+                handler.compiled()
+            else:
+                self._execute_statements(handler.body)
+        finally:
+            if outermost:
+                self.handler_time_total += time_module.perf_counter() - started
+            frames.pop()
+            handler.release(frame)
+
+    def _log_event(self, event_name, args):
+        if EVENT_LOG.debug_on:
+            EVENT_LOG.debug("Triggering %s with %d args", event_name, len(args))
         if event_name == "http_response":
-            request_id = args[0] if args else "none"
-            status = args[1] if len(args) > 1 else "unknown"
-            current_http = self.global_scope.get("current_http_request")
-            print(f"[HTTP] 📨 LSL EVENT TRIGGERED")
-            print(f"[HTTP]    Request ID: {request_id}")
-            print(f"[HTTP]    Status: {status}")
-            print(f"[HTTP]    Current HTTP Request: {current_http}")
-            print(f"[HTTP]    Match: {'✅ YES' if request_id == current_http else '❌ NO'}")
+            if HTTP_LOG.debug_on:
+                current_http = self.global_scope.get("current_http_request")
+                HTTP_LOG.debug("Response %s, status %s (current request %s)",
+                               args[0] if args else "none", args[1] if len(args) > 1 else "unknown", current_http)
         elif event_name == "dataserver":
-            print(f"[DATASERVER] 📨 EVENT TRIGGERED")
-            print(f"[DATASERVER]    Query ID: {args[0] if args else 'none'}")
-            print(f"[DATASERVER]    Data: {args[1] if len(args) > 1 else 'none'}")
+            if DATASERVER_LOG.debug_on:
+                DATASERVER_LOG.debug("Query %s: %r", args[0] if args else "none", args[1] if len(args) > 1 else "none")
         elif event_name == "sensor":
-            print(f"[SENSOR_DEBUG] 📨 EVENT TRIGGERED")
-            print(f"[SENSOR_DEBUG]    Detected: {args[0] if args else 'none'}")
-        print(f"[EVENT DEBUG]: Triggering event '{event_name}' with args: {len(args)} args")
-        state_events = self.states.get(self.current_state, {})
-        event_handler = state_events.get(event_name)
-        if event_handler:
-            print(f"[EVENT DEBUG]: Found handler for '{event_name}', executing...")
-            # Create a frame for the event handler (local variables)
-            event_frame = Frame(parent_scope=self.global_scope)
-            
-            # Map event arguments to parameter names (same pattern as _call_user_function)
-            event_args = event_handler.get("args", "")
-            if event_name == "dataserver":
-                print(f"[DATASERVER] Event args: {event_args}")
-                print(f"[DATASERVER] Received args: {args}")
-            elif event_name == "sensor":
-                print(f"[SENSOR_DEBUG] Event args: {event_args}")
-                print(f"[SENSOR_DEBUG] Received args: {args}")
-            if event_args and args:
-                if isinstance(event_args, list):
-                    # New format: list of parameter objects
-                    for i, arg_obj in enumerate(event_args):
-                        if i < len(args) and isinstance(arg_obj, dict):
-                            arg_name = arg_obj.get("name", f"arg_{i}")
-                            event_frame.set(arg_name, args[i])
-                            if event_name == "dataserver":
-                                print(f"[DATASERVER] Set {arg_name} = {args[i]}")
-                            elif event_name == "sensor":
-                                print(f"[SENSOR_DEBUG] Set {arg_name} = {args[i]}")
-                else:
-                    # Old format: comma-separated string
-                    arg_names = [arg.strip() for arg in event_args.split(",")]
-                    for i, arg_name_str in enumerate(arg_names):
-                        if i < len(args):
-                            # Extract variable name from "type name" format
-                            arg_name = arg_name_str.split()[-1]
-                            event_frame.set(arg_name, args[i])
-                            if event_name == "dataserver":
-                                print(f"[DATASERVER] Set {arg_name} = {args[i]}")
-                            elif event_name == "sensor":
-                                print(f"[SENSOR_DEBUG] Set {arg_name} = {args[i]}")
-            
-            self.call_stack.push(event_frame)
-            try:
-                body_statements = event_handler.get("body", [])
-                if event_name == "dataserver":
-                    print(f"[DATASERVER] Executing handler with {len(body_statements)} statements")
-                elif event_name == "sensor":
-                    print(f"[SENSOR_DEBUG] Executing handler with {len(body_statements)} statements")
-                self._execute_statements(body_statements)
-            finally:
-                self.call_stack.pop()
+            if SENSOR_LOG.debug_on:
+                SENSOR_LOG.debug("Detected %s", args[0] if args else "none")
 
     def continue_execution(self):
         self.single_step = False
@@ -570,12 +871,52 @@ class LSLSimulator:
 
     def stop(self):
         self._is_running = False
+        self._cancel_timer()
+        self._cancel_sensor_repeat()
+        self.listeners.remove_owner(self)
+        self.http.cancel_owner(self)
+        self.event_queue.put(SHUTDOWN)
         self.execution_paused.set()
         self.debugger_ready.set()
 
+    def _queue_timer(self):
+        """Scheduler callback for llSetTimerEvent."""
+        if self._is_running:
+            self.queue_event("timer")
+
+    def _cancel_timer(self):
+        if self.timer_handle is not None:
+            self.timer_handle.cancel()
+            self.timer_handle = None
+
+    def _sensor_sweep(self):
+        """Scheduler callback for llSensorRepeat."""
+        if not self._is_running:
+            return
+        if self.region is not None:
+            self._region_sensor(self.sensor_ranges.get('repeat'))
+            return
+        # Simulate detection
+        self.detected_avatars = [
+            {"key": f"repeat-avatar-{i}", "name": f"RepeatingUser{i}", "distance": 1.5 + i}
+            for i in range(1, 2)  # Simulate 1 detected avatar
+        ]
+        self.queue_event("sensor", [len(self.detected_avatars)])
+
+    def _region_sensor(self, sensor):
+        """Sensor sweep over the region's entities, batched with the region's other sweeps this tick."""
+        if sensor is None:
+            return
+        self.region.request_sensor(self, sensor)
+
+    def _cancel_sensor_repeat(self):
+        if self.sensor_repeat_handle is not None:
+            self.sensor_repeat_handle.cancel()
+            self.sensor_repeat_handle = None
+
     def simulate_avatar_sense(self, avatar_name):
         """Simulate an avatar approaching and trigger NPC greeting via /hook endpoint"""
-        print(f"[AVATAR_SENSE]: Avatar '{avatar_name}' approaching NPC")
+        SENSOR_LOG.info("Avatar %r approaching", avatar_name)
         
         # Generate a sequential key for this avatar (like SL/OS) - thread-safe
         with self.counter_lock:
@@ -592,15 +933,22 @@ class LSLSimulator:
         # Set sensed avatar data for say_on_channel to use
         self.sensed_avatar_name = avatar_name
         self.sensed_avatar_key = avatar_key
-        print(f"[AVATAR_SENSE]: Set sensed avatar: {avatar_name} (key: {avatar_key})")
         
         # Simulate the sensor detection by calling the sensor event
-        self.event_queue.put(("sensor", [1]))  # 1 avatar detected
-        
-        print(f"[AVATAR_SENSE]: Sensor event queued for {avatar_name} (key: {avatar_key})")
+        self.queue_event("sensor", [1])  # 1 avatar detected
+        SENSOR_LOG.info("Sensor event queued for %s (key: %s)", avatar_name, avatar_key)
         if hasattr(self, 'global_scope'):
             self.global_scope.set('current_avatar', avatar_key)
 
+    def say_on_channel(self, channel, message, speaker_name="Avatar",
+                       speaker_key="00000000-0000-0000-0000-000000000000"):
+        """An avatar chats on `channel`; every matching listener gets a listen event."""
+        if CHAT_LOG.debug_on:
+            CHAT_LOG.debug("%s on channel %s: %s", speaker_name, channel, message)
+        if self.region is not None:
+            return self.region.say(speaker_name, speaker_key, int(channel), message)
+        return self.listeners.dispatch(int(channel), speaker_name, speaker_key, message)
+
     def get_variables(self, scope):
         if scope == "globals":
             return self.global_scope.locals
@@ -617,13 +965,25 @@ class LSLSimulator:
         """Get basic performance statistics."""
         return {
             'expression_evaluator': {
-                'evaluations': getattr(self.expression_evaluator, 'total_evaluations', 0)
+                'evaluations': self.expression_evaluator.total_evaluations,
+                'parse_cache': self.expression_evaluator.get_cache_stats()
+            },
+            'event_loop': {
+                'events': self.events_dispatched,
+                'errors': self.dispatch_errors,
+                'queued': self.event_queue.qsize(),
+                'mean_latency': self.dispatch_latency_total / self.events_dispatched if self.events_dispatched else 0.0,
+                'max_latency': self.dispatch_latency_max,
+                'handler_time': self.handler_time_total,
+                'mean_dispatch_overhead': (self.dispatch_overhead_total / self.events_dispatched
+                                           if self.events_dispatched else 0.0)
             }
         }
     
     def reset_performance_stats(self):
         """Reset performance statistics."""
-        pass  # Simple evaluator doesn't need stat reset
+        self.expression_evaluator.reset_stats()
+        self._reset_dispatch_stats()
     
     def get_debug_info(self):
         """Get detailed debug information."""
@@ -636,231 +996,293 @@ class LSLSimulator:
                 'expression_evaluator': self.expression_evaluator is not None
             }
         }
-    def __getattr__(self, name):
+    def _resolve_api(self, func_name):
         """
-        Delegate all API calls to the consolidated LSL API.
-        This eliminates dangerous redundancy by ensuring single source of truth.
+        The implementation of built-in function `func_name` for this script, or
+        None if there is none. The linker calls this once per name; the result
+        may depend on the host (a region), which relinks when it attaches.
         """
-        # Don't create placeholders for user-defined functions
-        if hasattr(self, 'user_functions'):
-            # Check both direct name and api_ prefixed name
-            base_name = name[4:] if name.startswith('api_') else name
-            if base_name in self.user_functions:
-                raise AttributeError(f"'{base_name}' is a user-defined function, not an attribute")
+        # Special handling for simulator-specific functions
+        if func_name in ['llSay']:
+            api_say = self.lsl_api.functions['llSay']
+            def llSay_impl(channel, message):
+                if self.region is not None:
+                    self.region.chat(self, func_name, int(channel), str(message))
+                # The comprehensive implementation writes it to the chat log
+                return api_say(channel, message)
+            return llSay_impl
         
-        if name.startswith('api_'):
-            # Remove 'api_' prefix and delegate to consolidated API
-            func_name = name[4:]  # Remove 'api_' prefix
-            
-            # Special handling for simulator-specific functions
-            if func_name in ['llSay']:
-                # llSay should print to console for debugging
-                def llSay_impl(channel, message):
-                    print(f"[llSay]: {message}")
-                    # Also call the comprehensive implementation if available
-                    if hasattr(self.lsl_api, 'llSay'):
-                        return self.lsl_api.llSay(channel, message)
-                return llSay_impl
+        elif func_name in ['llShout', 'llWhisper', 'llRegionSay'] and self.region is not None:
+            # In a region, chat reaches other scripts' listeners
+            api_chat = self.lsl_api.functions[func_name]
+            def chat_impl(channel, message):
+                self.region.chat(self, func_name, int(channel), str(message))
+                return api_chat(channel, message)
+            return chat_impl
+        
+        elif func_name in ['llGetPos', 'llSetPos', 'llGetRot', 'llSetRot'] and self.region is not None:
+            # A hosted prim's placement is its entity in the region's world
+            world, key = self.region.world, self.object_key
+            if func_name == 'llGetPos':
+                return lambda: world.get(key).position
+            elif func_name == 'llSetPos':
+                return lambda position: world.move(key, position)
+            elif func_name == 'llGetRot':
+                return lambda: world.get(key).rotation
+            else:
+                return lambda rotation: world.rotate(key, rotation)
+        
+        elif func_name in ['llKey2Name', 'llGetObjectDetails', 'osGetAvatarList'] and self.region is not None:
+            # Every avatar and prim in the region is a row of its world
+            world = self.region.world
+            if func_name == 'llKey2Name':
+                return lambda key: world.name_of(str(key))
+            elif func_name == 'llGetObjectDetails':
+                return lambda key, params: world.details(str(key), params)
+            else:
+                def osGetAvatarList_impl():
+                    # [key, position, name] per avatar, leaving out the prim's owner
+                    owner = world.get(self.object_key).owner
+                    avatars = []
+                    for agent in world.agents():
+                        if agent.key != owner:
+                            avatars.extend([agent.key, agent.position, agent.name])
+                    return avatars
+                return osGetAvatarList_impl
+        
+        elif func_name in ['llMessageLinked']:
+            def llMessageLinked_impl(link, num, text, key):
+                if self.region is not None:
+                    self.region.link_message(self, int(link), int(num), str(text), str(key))
+                elif int(link) in (-1, -4, 1):
+                    # A lone script is the whole link set
+                    self.queue_event("link_message", [self.link_number, int(num), str(text), str(key)])
+            return llMessageLinked_impl
+        
+        elif func_name in ['llListen', 'llListenRemove', 'llListenControl']:
+            # Listener functions need access to simulator state
+            if func_name == 'llListen':
+                def llListen_impl(channel, name, key, message):
+                    return self.listeners.add(self, int(channel),
+                                              str(name) if name else "",
+                                              str(key) if key else "",
+                                              str(message) if message else "")
+                return llListen_impl
             
-            elif func_name in ['llListen', 'llListenRemove']:
-                # Listener functions need access to simulator state
-                if func_name == 'llListen':
-                    def llListen_impl(channel, name, key, message):
-                        handle = None
-                        with self.counter_lock:
-                            handle = self.listener_handle_counter
-                            self.listener_handle_counter += 1
-                        
-                        listener = {
-                            'handle': handle,
-                            'channel': int(channel),
-                            'name': str(name) if name else "",
-                            'key': str(key) if key != "" else "",
-                            'message': str(message) if message else "",
-                            'active': True
-                        }
-                        
-                        with self.listeners_lock:
-                            self.active_listeners.append(listener)
-                        
-                        return handle
-                    return llListen_impl
-                
-                elif func_name == 'llListenRemove':
-                    def llListenRemove_impl(handle):
-                        with self.listeners_lock:
-                            for listener in self.active_listeners:
-                                if listener['handle'] == handle:
-                                    listener['active'] = False
-                                    break
-                    return llListenRemove_impl
+            elif func_name == 'llListenRemove':
+                def llListenRemove_impl(handle):
+                    self.listeners.remove(self, int(handle))
+                return llListenRemove_impl
             
-            elif func_name in ['llSetTimerEvent']:
-                # Timer functions need access to simulator state
-                def llSetTimerEvent_impl(time):
-                    self.timer_active = True
+            elif func_name == 'llListenControl':
+                def llListenControl_impl(handle, active):
+                    self.listeners.control(self, int(handle), bool(active))
+                return llListenControl_impl
+        
+        elif func_name in ['llSetTimerEvent']:
+            # Timer functions need access to simulator state
+            def llSetTimerEvent_impl(interval):
+                # Re-arming replaces the previous timer; 0 just cancels it
+                self._cancel_timer()
+                interval = float(interval)
+                if interval > 0:
+                    self.timer_handle = self.scheduler.call_every(interval, self._queue_timer)
+            return llSetTimerEvent_impl
+        
+        elif func_name in ['llSensor', 'llSensorRepeat', 'llSensorRemove']:
+            # Sensor functions need access to simulator state
+            if func_name == 'llSensor':
+                def llSensor_impl(name, key, type_filter, range_val, arc):
+                    self.sensor_ranges['single'] = {
+                        'name': str(name),
+                        'key': str(key),
+                        'type': int(type_filter),
+                        'range': float(range_val),
+                        'arc': float(arc),
+                        'repeat': False
+                    }
+                    
+                    if self.region is not None:
+                        self._region_sensor(self.sensor_ranges['single'])
+                        return
                     
-                    def timer_loop():
-                        while self._is_running and self.timer_active:
-                            time_module.sleep(float(time))
-                            if self.timer_active:
-                                self.event_queue.put(("timer",))
+                    # Simulate detection of nearby avatars for testing
+                    self.detected_avatars = [
+                        {"key": f"test-avatar-{i}", "name": f"TestUser{i}", "distance": 2.5 + i}
+                        for i in range(1, 3)  # Simulate 2 detected avatars
+                    ]
                     
-                    threading.Thread(target=timer_loop, daemon=True).start()
-                return llSetTimerEvent_impl
+                    # Queue sensor event
+                    self.queue_event("sensor", [len(self.detected_avatars)])
+                return llSensor_impl
             
-            elif func_name in ['llSensor', 'llSensorRepeat', 'llSensorRemove']:
-                # Sensor functions need access to simulator state
-                if func_name == 'llSensor':
-                    def llSensor_impl(name, key, type_filter, range_val, arc):
-                        self.sensor_ranges['single'] = {
-                            'name': str(name),
-                            'key': str(key),
-                            'type': int(type_filter),
-                            'range': float(range_val),
-                            'arc': float(arc),
-                            'repeat': False
-                        }
-                        
-                        # Simulate detection of nearby avatars for testing
-                        self.detected_avatars = [
-                            {"key": f"test-avatar-{i}", "name": f"TestUser{i}", "distance": 2.5 + i}
-                            for i in range(1, 3)  # Simulate 2 detected avatars
-                        ]
-                        
-                        # Queue sensor event
-                        self.event_queue.put(("sensor", len(self.detected_avatars)))
-                    return llSensor_impl
-                
-                elif func_name == 'llSensorRepeat':
-                    def llSensorRepeat_impl(name, key, type_filter, range_val, arc, rate):
-                        self.sensor_ranges['repeat'] = {
-                            'name': str(name),
-                            'key': str(key),
-                            'type': int(type_filter),
-                            'range': float(range_val),
-                            'arc': float(arc),
-                            'rate': float(rate),
-                            'repeat': True
-                        }
-                        
-                        def sensor_loop():
-                            while self._is_running and 'repeat' in self.sensor_ranges:
-                                # Simulate detection
-                                self.detected_avatars = [
-                                    {"key": f"repeat-avatar-{i}", "name": f"RepeatingUser{i}", "distance": 1.5 + i}
-                                    for i in range(1, 2)  # Simulate 1 detected avatar
-                                ]
-                                
-                                self.event_queue.put(("sensor", len(self.detected_avatars)))
-                                time_module.sleep(rate)
-                        
-                        threading.Thread(target=sensor_loop, daemon=True).start()
-                    return llSensorRepeat_impl
-                
-                elif func_name == 'llSensorRemove':
-                    def llSensorRemove_impl():
-                        self.sensor_ranges.clear()
-                        self.detected_avatars.clear()
-                    return llSensorRemove_impl
+            elif func_name == 'llSensorRepeat':
+                def llSensorRepeat_impl(name, key, type_filter, range_val, arc, rate):
+                    self.sensor_ranges['repeat'] = {
+                        'name': str(name),
+                        'key': str(key),
+                        'type': int(type_filter),
+                        'range': float(range_val),
+                        'arc': float(arc),
+                        'rate': float(rate),
+                        'repeat': True
+                    }
+                    
+                    # First sweep runs immediately, then every `rate` seconds
+                    self._cancel_sensor_repeat()
+                    if float(rate) > 0:
+                        self.sensor_repeat_handle = self.scheduler.call_every(
+                            float(rate), self._sensor_sweep, first_delay=0)
+                return llSensorRepeat_impl
             
-            elif func_name in ['llDetectedKey', 'llDetectedDist', 'llDetectedName']:
-                # Detection functions need access to simulator state
-                if func_name == 'llDetectedKey':
-                    def llDetectedKey_impl(index):
-                        if 0 <= index < len(self.detected_avatars):
-                            return self.detected_avatars[index]["key"]
-                        return "00000000-0000-0000-0000-000000000000"
-                    return llDetectedKey_impl
-                
-                elif func_name == 'llDetectedDist':
-                    def llDetectedDist_impl(index):
-                        if 0 <= index < len(self.detected_avatars):
-                            return self.detected_avatars[index]["distance"]
-                        return 0.0
-                    return llDetectedDist_impl
-                
-                elif func_name == 'llDetectedName':
-                    def llDetectedName_impl(index):
-                        if 0 <= index < len(self.detected_avatars):
-                            return self.detected_avatars[index]["name"]
-                        return ""
-                    return llDetectedName_impl
+            elif func_name == 'llSensorRemove':
+                def llSensorRemove_impl():
+                    self._cancel_sensor_repeat()
+                    self.sensor_ranges.clear()
+                    self.detected_avatars.clear()
+                return llSensorRemove_impl
+        
+        elif func_name in ['llDetectedKey', 'llDetectedDist', 'llDetectedName', 'llDetectedPos', 'llDetectedType',
+                           'llDetectedRot', 'llDetectedVel', 'llDetectedOwner']:
+            # Detection functions need access to simulator state
+            if func_name == 'llDetectedKey':
+                def llDetectedKey_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index]["key"]
+                    return "00000000-0000-0000-0000-000000000000"
+                return llDetectedKey_impl
             
-            elif func_name in ['llHTTPRequest']:
-                # HTTP functions need access to simulator state
-                def llHTTPRequest_impl(url, parameters, body):
-                    def make_request():
-                        try:
-                            # Simulate HTTP request
-                            time_module.sleep(0.5)  # Simulate network delay
-                            
-                            # Mock different responses based on URL
-                            if "/register" in str(url):
-                                status = 200
-                                response_body = '{"status": "registered", "message": "NPC registered successfully"}'
-                            elif "/hook" in str(url):
-                                status = 200
-                                response_body = '{"say": "Hello! How can I help you today?", "text_display": "Ready to assist"}'
-                            elif "/talk" in str(url):
-                                status = 200  
-                                response_body = '{"say": "That\'s interesting! Tell me more.", "text_display": "Listening..."}'
-                            else:
-                                status = 404
-                                response_body = '{"error": "Endpoint not found"}'
-                            
-                            # Queue http_response event
-                            request_id = str(uuid.uuid4())
-                            metadata = []
-                            self.event_queue.put(("http_response", request_id, status, metadata, response_body))
-                            
-                        except Exception as e:
-                            # Queue error response
-                            request_id = str(uuid.uuid4())
-                            self.event_queue.put(("http_response", request_id, 500, [], f'{{"error": "{str(e)}"}}'))
-                    
-                    threading.Thread(target=make_request, daemon=True).start()
-                    return str(uuid.uuid4())  # Return request ID
-                return llHTTPRequest_impl
+            elif func_name == 'llDetectedDist':
+                def llDetectedDist_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index]["distance"]
+                    return 0.0
+                return llDetectedDist_impl
             
-            elif func_name in ['llGetNotecardLine']:
-                # Notecard functions need access to simulator state
-                def llGetNotecardLine_impl(name, line_number):
-                    def read_notecard():
-                        # Simulate reading notecard content
-                        lines = [
-                            "NPC Profile Data",
-                            "Name: Test NPC",
-                            "Role: Assistant", 
-                            "Personality: Helpful and friendly"
-                        ]
-                        
-                        line_num = int(line_number)
-                        if line_num < len(lines):
-                            data = lines[line_num]
-                        else:
-                            data = "EOF"
-                        
-                        # Queue dataserver event
-                        time_module.sleep(0.1)  # Simulate async delay
-                        query_id = str(uuid.uuid4())
-                        self.event_queue.put(("dataserver", query_id, data))
-                    
-                    threading.Thread(target=read_notecard, daemon=True).start()
-                    return str(uuid.uuid4())  # Return query ID
-                return llGetNotecardLine_impl
+            elif func_name == 'llDetectedName':
+                def llDetectedName_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index]["name"]
+                    return ""
+                return llDetectedName_impl
             
-            # For all other functions, delegate to consolidated API
-            elif hasattr(self.lsl_api, func_name):
-                return getattr(self.lsl_api, func_name)
-            elif func_name in self.lsl_api.functions:
-                return self.lsl_api.functions[func_name]
+            elif func_name == 'llDetectedPos':
+                def llDetectedPos_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index].get("position", (0.0, 0.0, 0.0))
+                    return (0.0, 0.0, 0.0)
+                return llDetectedPos_impl
+            
+            elif func_name == 'llDetectedType':
+                def llDetectedType_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index].get("type", 1)  # AGENT
+                    return 0
+                return llDetectedType_impl
+            
+            elif func_name == 'llDetectedRot':
+                def llDetectedRot_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index].get("rotation", (0.0, 0.0, 0.0, 1.0))
+                    return (0.0, 0.0, 0.0, 1.0)
+                return llDetectedRot_impl
+            
+            elif func_name == 'llDetectedVel':
+                def llDetectedVel_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index].get("velocity", (0.0, 0.0, 0.0))
+                    return (0.0, 0.0, 0.0)
+                return llDetectedVel_impl
+            
+            elif func_name == 'llDetectedOwner':
+                def llDetectedOwner_impl(index):
+                    if 0 <= index < len(self.detected_avatars):
+                        return self.detected_avatars[index].get("owner", "00000000-0000-0000-0000-000000000000")
+                    return "00000000-0000-0000-0000-000000000000"
+                return llDetectedOwner_impl
+        
+        elif func_name in ['llHTTPRequest']:
+            # The (region's) HTTP client throttles, queues and sends; http_response carries the key returned here
+            def llHTTPRequest_impl(url, parameters, body):
+                return self.http.request(self, str(url), parameters, str(body))
+            return llHTTPRequest_impl
+        
+        elif func_name in ['llGetNotecardLine']:
+            # Reads go through the notecard store's line index; the data arrives as a dataserver event
+            def llGetNotecardLine_impl(name, line_number):
+                data = self.notecards.line(str(name), int(line_number))
+                if data is None:
+                    DATASERVER_LOG.warning("Couldn't find notecard %s", name)
+                    return "00000000-0000-0000-0000-000000000000"
+                return self._notecard_reply(data)
+            return llGetNotecardLine_impl
+
+        elif func_name in ['llGetNumberOfNotecardLines']:
+            def llGetNumberOfNotecardLines_impl(name):
+                count = self.notecards.count(str(name))
+                if count is None:
+                    DATASERVER_LOG.warning("Couldn't find notecard %s", name)
+                    return "00000000-0000-0000-0000-000000000000"
+                return self._notecard_reply(str(count))
+            return llGetNumberOfNotecardLines_impl
+
+        elif func_name in ['osGetNotecardLine', 'osGetNumberOfNotecardLines', 'osGetNotecard']:
+            # The OSSL readers answer at once instead of through dataserver
+            if func_name == 'osGetNotecardLine':
+                def osGetNotecardLine_impl(name, line_number):
+                    line = self.notecards.line(str(name), int(line_number))
+                    return "" if line is None or line == EOF else line
+                return osGetNotecardLine_impl
+            elif func_name == 'osGetNumberOfNotecardLines':
+                def osGetNumberOfNotecardLines_impl(name):
+                    count = self.notecards.count(str(name))
+                    return count if count is not None else -1
+                return osGetNumberOfNotecardLines_impl
             else:
-                # Return a placeholder for unimplemented functions
-                def placeholder(*args, **kwargs):
-                    print(f"[LSL API]: {func_name} called with {args}")
-                    return None
-                return placeholder
+                def osGetNotecard_impl(name):
+                    notecard = self.notecards.get(str(name))
+                    return notecard.read() if notecard is not None else ""
+                return osGetNotecard_impl
+
+        elif func_name == 'llGetInventoryType':
+            def llGetInventoryType_impl(name):
+                if str(name) in self.notecards:
+                    return 7  # INVENTORY_NOTECARD
+                return self.lsl_api.functions['llGetInventoryType'](name)
+            return llGetInventoryType_impl
         
+        # For all other functions, delegate to consolidated API
+        elif hasattr(self.lsl_api, func_name):
+            return getattr(self.lsl_api, func_name)
+        elif func_name in self.lsl_api.functions:
+            return self.lsl_api.functions[func_name]
+        return None
+
+    def _placeholder(self, func_name):
+        """Stand-in for a function nothing implements"""
+        def placeholder(*args, **kwargs):
+            if API_LOG.info_on:
+                API_LOG.info("%s is not implemented (called with %s)", func_name, args)
+            return None
+        return placeholder
+
+    def __getattr__(self, name):
+        """
+        Delegate all API calls to the consolidated LSL API.
+        This eliminates dangerous redundancy by ensuring single source of truth.
+        """
+        # Don't create placeholders for user-defined functions
+        if hasattr(self, 'user_functions'):
+            # Check both direct name and api_ prefixed name
+            base_name = name[4:] if name.startswith('api_') else name
+            if base_name in self.user_functions:
+                raise AttributeError(f"'{base_name}' is a user-defined function, not an attribute")
+        
+        if name.startswith('api_'):
+            # Remove 'api_' prefix and delegate to consolidated API
+            func_name = name[4:]
+            implementation = self._resolve_api(func_name)
+            return implementation if implementation is not None else self._placeholder(func_name)
+
         # For non-API attributes, raise the normal AttributeError
         raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
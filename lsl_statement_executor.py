@@ -197,16 +197,8 @@ class FunctionCallCommand(StatementCommand):
         args = self._parse_arguments(args_str)
         evaluated_args = [simulator._evaluate_expression(arg) for arg in args]
         
-        # Try API functions first
-        api_func = getattr(simulator, f"api_{function_name}", None)
-        if api_func:
-            return api_func(*evaluated_args)
-        
-        # Try user-defined functions
-        if function_name in simulator.user_functions:
-            return simulator._call_user_function(function_name, evaluated_args)
-        
-        return None
+        # Resolved like every other call site, through the simulator's linker
+        return simulator._call_api_function(function_name, evaluated_args)
     
     def _parse_arguments(self, args_str: str) -> List[str]:
         """Parse function arguments handling nested structures and quotes."""
@@ -5,7 +5,19 @@ Addresses criticism: "LSL não é JavaScript - a complessità sintattica é limi
 """
 
 import re
-from typing import Any, Union, List
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Union, List
+from lsl_expression_parser import parse_expression, ExpressionSyntaxError
+from lsl_log import category
+
+EXPRESSION_LOG = category("expression")
+
+# Default number of distinct expression strings kept parsed
+DEFAULT_PARSE_CACHE_SIZE = 1024
+
+# Root operators whose string-evaluated result is reported as a Python bool
+BOOLEAN_OPERATORS = {'==', '!=', '<', '>', '<=', '>=', '&&', '||'}
 
 
 class SimpleExpressionEvaluator:
@@ -15,20 +27,49 @@ class SimpleExpressionEvaluator:
     LSL syntax is simple - the evaluator should be too.
     """
     
-    def __init__(self, simulator):
+    def __init__(self, simulator, cache_size: int = DEFAULT_PARSE_CACHE_SIZE):
         self.simulator = simulator
         self._evaluation_depth = 0
         self._max_depth = 50  # Prevent infinite recursion
+        # LRU of parsed node per expression string; None marks strings that are not LSL expressions
+        self._parse_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_size = cache_size
+        self.reset_stats()
     
-    def evaluate(self, expr_str: str) -> Any:
+    def reset_stats(self):
+        """Reset evaluation and parse cache counters (cached entries are kept)."""
+        self.total_evaluations = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Parse cache statistics."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'size': len(self._parse_cache),
+            'max_size': self.cache_size,
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'evictions': self.cache_evictions,
+            'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+        }
+    
+    def evaluate(self, expr_str: Union[str, Dict[str, Any]]) -> Any:
         """
         Evaluate an expression directly without complex architecture.
         Handles the 90% case simply, falls back gracefully for edge cases.
+        Structured expression nodes from the ANTLR parser skip string parsing.
         """
+        self.total_evaluations += 1
+        if isinstance(expr_str, dict):
+            return self.evaluate_node(expr_str)
+        
         # Prevent infinite recursion
         self._evaluation_depth += 1
         if self._evaluation_depth > self._max_depth:
-            print(f"[WARNING] Expression evaluation depth exceeded for: {expr_str[:100]}")
+            EXPRESSION_LOG.warning("Evaluation depth exceeded for: %s", expr_str[:100])
             self._evaluation_depth -= 1
             return str(expr_str)  # Return as string to avoid infinite loop
         
@@ -43,6 +84,17 @@ class SimpleExpressionEvaluator:
             if not expr_str:
                 return original_expr_str
             
+            # Parse once per distinct string, then evaluate the node
+            node = self._cached_parse(expr_str)
+            if node is not None:
+                result = self.evaluate_node(node)
+                if node['type'] == 'binary' and node['op'] in BOOLEAN_OPERATORS:
+                    return bool(result)
+                return result
+            
+            # Not a well-formed expression (unquoted text, URLs, partial input):
+            # fall back to the lenient heuristics below
+            
             # Handle most common cases first (performance optimization)
             
             # 1. String literals (very common)
@@ -92,6 +144,116 @@ class SimpleExpressionEvaluator:
         finally:
             self._evaluation_depth -= 1
     
+    def _cached_parse(self, expr_str: str):
+        """Parsed node for an expression string (None if it is not an expression), via the LRU."""
+        cache = self._parse_cache
+        with self._cache_lock:
+            if expr_str in cache:
+                cache.move_to_end(expr_str)
+                self.cache_hits += 1
+                return cache[expr_str]
+            self.cache_misses += 1
+        
+        try:
+            node = parse_expression(expr_str)
+        except ExpressionSyntaxError:
+            node = None
+        
+        with self._cache_lock:
+            cache[expr_str] = node
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+                self.cache_evictions += 1
+        return node
+    
+    def evaluate_node(self, node: Dict[str, Any]) -> Any:
+        """Evaluate a structured expression node produced by the ANTLR parser."""
+        node_type = node.get('type')
+        
+        if node_type == 'literal':
+            return node['value']
+        if node_type == 'identifier':
+            return self._lookup_variable(node['name'])
+        if node_type == 'binary':
+            op = node['op']
+            left = self.evaluate_node(node['left'])
+            right = self.evaluate_node(node['right'])
+            # LSL does not short-circuit: both sides run, for their side effects too
+            if op == '&&':
+                return int(bool(left) and bool(right))
+            if op == '||':
+                return int(bool(left) or bool(right))
+            return self._binary_operators[op](self, left, right)
+        if node_type == 'call':
+            args = [self.evaluate_node(arg) for arg in node['args']]
+            return self.simulator._call_api_function(node['name'], args)
+        if node_type == 'unary':
+            return self._unary(node['op'], self.evaluate_node(node['operand']))
+        if node_type == 'cast':
+            return self._cast(node['cast_type'], self.evaluate_node(node['expression']))
+        if node_type == 'member':
+            return self.simulator._get_component(self.evaluate_node(node['object']), node['member'])
+        if node_type == 'index':
+            value = self.evaluate_node(node['object'])
+            index = self.evaluate_node(node['index'])
+            try:
+                return value[index]
+            except (IndexError, KeyError, TypeError):
+                return None
+        if node_type in ('vector', 'rotation'):
+            elements = []
+            for element in node['elements']:
+                try:
+                    elements.append(float(self.evaluate_node(element)))
+                except (ValueError, TypeError):
+                    elements.append(0.0)
+            return elements
+        if node_type == 'list':
+            return [self.evaluate_node(element) for element in node['elements']]
+        if node_type == 'postfix':
+            name = self._target_name(node['operand'])
+            value = self._lookup_variable(name)
+            self._store_variable(name, value + 1 if node['op'] == '++' else value - 1)
+            return value
+        if node_type == 'assign':
+            name = self._target_name(node['target'])
+            value = self.evaluate_node(node['value'])
+            if node['op'] != '=':
+                value = self._binary_operators[node['op'][:-1]](self, self._lookup_variable(name), value)
+            self._store_variable(name, value)
+            return value
+        
+        EXPRESSION_LOG.warning("Unknown expression node: %s", node_type)
+        return None
+    
+    def _target_name(self, node: Dict[str, Any]) -> str:
+        """Variable name written by an assignment or ++/-- node."""
+        if node.get('type') == 'identifier':
+            return node['name']
+        raise ValueError(f"Cannot assign to expression node: {node.get('type')}")
+    
+    def _store_variable(self, name: str, value: Any) -> None:
+        """Store a variable in the scope that defines it, or the current scope."""
+        scope = self.simulator._find_variable_scope(name)
+        if scope is None:
+            scope = self.simulator.call_stack.get_current_scope()
+        scope.set(name, value)
+    
+    def _unary(self, op: str, value: Any) -> Any:
+        """Evaluate a unary operator."""
+        if op == '!':
+            return int(not value)
+        if op == '~':
+            return ~int(value)
+        if op == '-':
+            if isinstance(value, list):
+                return [-component for component in value]
+            try:
+                return -value
+            except TypeError:
+                return 0
+        return value
+    
     def _lookup_variable(self, name: str) -> Any:
         """Look up variable value."""
         # Check call stack
@@ -99,9 +261,13 @@ class SimpleExpressionEvaluator:
         if val is not None:
             return val
         
-        # Check constants
-        if hasattr(self.simulator, name):
-            return getattr(self.simulator, name)
+        # Check real simulator attributes; plain hasattr() would go through
+        # LSLSimulator.__getattr__, which builds API closures and raises
+        simulator = self.simulator
+        if name in simulator.__dict__:
+            return simulator.__dict__[name]
+        if hasattr(type(simulator), name):
+            return getattr(simulator, name)
         
         # Return as string if not found (LSL behavior)
         return name
@@ -269,6 +435,36 @@ class SimpleExpressionEvaluator:
         
         return args
     
+    def _bitwise_and(self, left: Any, right: Any) -> int:
+        try:
+            return int(left) & int(right)
+        except (ValueError, TypeError):
+            return 0
+    
+    def _bitwise_or(self, left: Any, right: Any) -> int:
+        try:
+            return int(left) | int(right)
+        except (ValueError, TypeError):
+            return 0
+    
+    def _bitwise_xor(self, left: Any, right: Any) -> int:
+        try:
+            return int(left) ^ int(right)
+        except (ValueError, TypeError):
+            return 0
+    
+    def _shift_left(self, left: Any, right: Any) -> int:
+        try:
+            return int(left) << int(right)
+        except (ValueError, TypeError):
+            return 0
+    
+    def _shift_right(self, left: Any, right: Any) -> int:
+        try:
+            return int(left) >> int(right)
+        except (ValueError, TypeError):
+            return 0
+    
     # Simple binary operation implementations
     def _logical_or(self, left: Any, right: Any) -> bool:
         return bool(left) or bool(right)
@@ -353,9 +549,13 @@ class SimpleExpressionEvaluator:
         
         # Evaluate the expression to cast
         value = self.evaluate(expression)
-        
-        # Perform the type cast
+        return self._cast(cast_type, value)
+    
+    def _cast(self, cast_type: str, value: Any) -> Any:
+        """Perform an LSL type cast on an evaluated value."""
         if cast_type == 'string':
+            if isinstance(value, bool):
+                return str(int(value))
             return str(value)
         elif cast_type == 'integer':
             try:
@@ -390,4 +590,29 @@ class SimpleExpressionEvaluator:
                 return value
             return [value]
         
-        return value  # Fallback
\ No newline at end of file
+        return value  # Fallback
+
+    
+    # Operator table for structured binary and compound-assignment nodes.
+    # Comparisons yield LSL integers (0/1) rather than Python bools.
+    _binary_operators = {
+        '+': _add,
+        '-': _subtract,
+        '*': _multiply,
+        '/': lambda self, left, right: (
+            int(left / right) if isinstance(left, int) and isinstance(right, int) and right != 0
+            else self._divide(left, right)
+        ),
+        '%': _modulo,
+        '==': lambda self, left, right: int(self._equal(left, right)),
+        '!=': lambda self, left, right: int(self._not_equal(left, right)),
+        '<': lambda self, left, right: int(self._less(left, right)),
+        '>': lambda self, left, right: int(self._greater(left, right)),
+        '<=': lambda self, left, right: int(self._less_equal(left, right)),
+        '>=': lambda self, left, right: int(self._greater_equal(left, right)),
+        '&': _bitwise_and,
+        '|': _bitwise_or,
+        '^': _bitwise_xor,
+        '<<': _shift_left,
+        '>>': _shift_right,
+    }
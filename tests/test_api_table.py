@@ -0,0 +1,48 @@
+"""
+Tests for the shared LSL API function table.
+"""
+
+import pytest
+from lsl_api_expanded import FUNCTIONS, LSLAPIExpanded
+from lsl_ossl_compatibility import COMPATIBILITY_INFO, OSSL_FUNCTIONS, LSLOSSLCompatibility, SimulatorMode
+from lsl_scheduler import VirtualClock
+
+
+class TestFunctionTable:
+    """Test suite for the shared function table."""
+
+    def test_table_is_shared_and_read_only(self):
+        first, second = LSLAPIExpanded(), LSLAPIExpanded()
+
+        assert first.function_table is second.function_table is FUNCTIONS
+        assert LSLOSSLCompatibility().function_table is OSSL_FUNCTIONS
+        assert set(FUNCTIONS) < set(OSSL_FUNCTIONS) and "osGetRegionStats" not in FUNCTIONS
+        with pytest.raises(TypeError):
+            FUNCTIONS["llAbs"] = abs
+
+    def test_instances_keep_their_own_state(self):
+        first, second = LSLAPIExpanded(), LSLAPIExpanded()
+        first.call_function("llSetPos", [(1.0, 2.0, 3.0)])
+        handle = first.call_function("llListen", [5, "", "", ""])
+
+        assert first.call_function("llGetPos", []) == (1.0, 2.0, 3.0)
+        assert second.call_function("llGetPos", []) != (1.0, 2.0, 3.0)
+        assert handle in first.listeners and not second.listeners
+
+    def test_functions_are_bound_to_the_context(self):
+        clock = VirtualClock()
+        api = LSLAPIExpanded(clock=clock)
+        get_time = api.functions["llGetTime"]
+        clock.advance(2.5)
+
+        assert get_time() == 2.5
+        assert "llGetTime" in api.functions and "llNoSuchThing" not in api.functions
+        assert len(api.functions) == len(FUNCTIONS)
+        assert api.call_function("llNoSuchThing", []) is None
+
+    def test_compatibility_matrix_is_shared(self):
+        strict = LSLOSSLCompatibility(SimulatorMode.LSL_STRICT)
+
+        assert strict.compatibility_info is COMPATIBILITY_INFO
+        assert strict.call_function("osGetRegionStats", []) is None
+        assert LSLOSSLCompatibility().call_function("osGetSimulatorVersion", []).startswith("OpenSimulator")
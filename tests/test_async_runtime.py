@@ -0,0 +1,143 @@
+"""
+Tests for the asyncio runtime.
+"""
+
+import asyncio
+import threading
+from lsl_antlr_parser import LSLParser
+from lsl_async_runtime import AsyncRuntime
+from lsl_http import HttpResponse
+
+
+TIMER_SCRIPT = LSLParser(single_pass=True).parse("""
+integer ticks = 0;
+default {
+    state_entry() { llSetTimerEvent(0.05); }
+    timer() { ticks++; if (ticks == 3) llSetTimerEvent(0); }
+}
+""")
+
+ORDER_SCRIPT = LSLParser(single_pass=True).parse("""
+string seen = "";
+default {
+    touch_start(integer n) { seen += (string)n; }
+}
+""")
+
+HTTP_SCRIPT = LSLParser(single_pass=True).parse("""
+integer status = 0;
+default {
+    state_entry() { llHTTPRequest("http://example.com/hook", [], ""); }
+    http_response(key id, integer code, list meta, string body) { status = code; }
+}
+""")
+
+
+class AwaitingTransport:
+    """A loop-native backend: the round trip is a coroutine"""
+
+    inline = False
+
+    async def send_async(self, request):
+        await asyncio.sleep(0.01)
+        return HttpResponse(201, request.url)
+
+
+class BlockingTransport:
+    """A backend that blocks, like SessionTransport"""
+
+    inline = False
+
+    def send(self, request):
+        return HttpResponse(202, request.url)
+
+
+class TestAsyncRuntime:
+    """Test suite for AsyncRuntime."""
+
+    def test_many_scripts_one_thread(self):
+        """Timers are loop callbacks; hosting scripts starts no threads."""
+        async def main():
+            runtime = AsyncRuntime()
+            threads = threading.active_count()
+            scripts = [runtime.add_script(TIMER_SCRIPT) for _ in range(200)]
+            await runtime.run_for(0.4)
+            assert threading.active_count() == threads
+            await runtime.stop()
+            return runtime, scripts
+
+        runtime, scripts = asyncio.run(main())
+
+        assert all(script.global_scope.get("ticks") == 3 for script in scripts)
+        assert runtime.get_stats()['running'] == 0
+        assert runtime.get_stats()['events'] == 200 * 4
+
+    def test_events_are_serial_per_script(self):
+        async def main():
+            runtime = AsyncRuntime()
+            first, second = runtime.add_script(ORDER_SCRIPT), runtime.add_script(ORDER_SCRIPT)
+            for n in range(5):
+                first.queue_event("touch_start", [n])
+                second.queue_event("touch_start", [4 - n])
+            await runtime.wait_idle()
+            await runtime.stop()
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        assert first.global_scope.get("seen") == "01234"
+        assert second.global_scope.get("seen") == "43210"
+
+    def test_http_response_on_loop(self):
+        async def main():
+            runtime = AsyncRuntime()
+            script = runtime.add_script(HTTP_SCRIPT)
+            await runtime.run_for(0.7)
+            await runtime.stop()
+            return script
+
+        assert asyncio.run(main()).global_scope.get("status") == 200
+
+    def test_queue_from_other_thread(self):
+        async def main():
+            runtime = AsyncRuntime()
+            script = runtime.add_script(ORDER_SCRIPT)
+            thread = threading.Thread(target=script.queue_event, args=("touch_start", [7]))
+            thread.start()
+            thread.join()
+            await runtime.run_for(0.05)
+            await runtime.wait_idle()
+            await runtime.stop()
+            return script
+
+        assert asyncio.run(main()).global_scope.get("seen") == "7"
+
+    def test_async_transport_needs_no_threads(self):
+        async def main():
+            runtime = AsyncRuntime(http_transport=AwaitingTransport())
+            threads = threading.active_count()
+            scripts = [runtime.add_script(HTTP_SCRIPT) for _ in range(50)]
+            await runtime.run_for(0.2)
+            assert threading.active_count() == threads
+            await runtime.stop()
+            return runtime, scripts
+
+        runtime, scripts = asyncio.run(main())
+
+        assert all(script.global_scope.get("status") == 201 for script in scripts)
+        assert runtime.http.get_stats()['completed'] == 50
+        assert runtime.http.executor is None
+
+    def test_blocking_transport_runs_in_loop_executor(self):
+        async def main():
+            runtime = AsyncRuntime(http_transport=BlockingTransport())
+            script = runtime.add_script(HTTP_SCRIPT)
+            await runtime.run_for(0.2)
+            await runtime.stop()
+            return runtime, script
+
+        runtime, script = asyncio.run(main())
+
+        assert script.global_scope.get("status") == 202
+        # The loop's executor ran it, not a pool of the client's own
+        assert runtime.http.executor is None
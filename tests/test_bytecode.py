@@ -0,0 +1,121 @@
+"""
+Tests for the experimental bytecode VM.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_bytecode import BytecodeCompiler, BytecodeVM, ScriptBytecode, BytecodeError
+from lsl_simulator import LSLSimulator
+
+
+SCRIPT = """
+integer total = 0;
+string log = "";
+vector pos = <0, 0, 0>;
+
+integer sq(integer n) { return n * n; }
+
+integer find_first(integer limit) {
+    integer i;
+    for (i = 0; i < limit; i++) {
+        if (sq(i) > 50 && i % 2 == 0) return i;
+    }
+    return -1;
+}
+
+default {
+    state_entry() {
+        integer i;
+        for (i = 0; i < 10; i++) {
+            if (i % 3 == 0) total += sq(i); else total = total + 1;
+        }
+        integer j = 5;
+        while (j > 0) { log += (string)j; j--; }
+        do { j++; } while (j < 3);
+        pos = <1, 2, 3>;
+        pos.z += 9;
+        total = total + find_first(100) * 1000 + j * 100000;
+    }
+}
+"""
+
+
+@pytest.fixture(scope="module")
+def parsed():
+    return LSLParser(single_pass=True).parse(SCRIPT)
+
+
+def run(parsed_script, **kwargs):
+    simulator = LSLSimulator(parsed_script, **kwargs)
+    simulator.trigger_event("state_entry")
+    return simulator
+
+
+class TestBytecodeVM:
+    """Test suite for BytecodeCompiler and BytecodeVM."""
+
+    def test_matches_interpreter(self, parsed):
+        """Bytecode and interpreted execution leave identical globals."""
+        vm_run = run(parsed, use_bytecode=True)
+        interpreted = run(parsed, use_compiler=False)
+
+        assert vm_run.bytecode_vm is not None
+        for name in ("total", "log", "pos"):
+            assert vm_run.global_scope.get(name) == interpreted.global_scope.get(name)
+        assert vm_run.global_scope.get("pos") == [1.0, 2.0, 12.0]
+        assert vm_run.bytecode_vm.instructions_executed > 0
+
+    def test_serialization_round_trip(self, parsed):
+        """Compiled scripts survive to_bytes()/from_bytes() unchanged."""
+        bytecode = BytecodeCompiler().compile_script(parsed)
+        restored = ScriptBytecode.from_bytes(bytecode.to_bytes())
+
+        original = bytecode.handlers[("default", "state_entry")]
+        copy = restored.handlers[("default", "state_entry")]
+        assert copy.code == original.code
+        assert copy.code.typecode == "H"
+        assert copy.consts == original.consts
+        assert restored.functions["find_first"].arg_names == ("limit",)
+
+    def test_rejects_foreign_data(self):
+        with pytest.raises(BytecodeError):
+            ScriptBytecode.from_bytes(b"not bytecode")
+
+    def test_time_slicing(self, parsed):
+        """A task run in small slices gives the same result as one run."""
+        simulator = LSLSimulator(parsed, use_compiler=False)
+        bytecode = BytecodeCompiler().compile_script(parsed)
+        vm = BytecodeVM(simulator, bytecode)
+
+        task = vm.start(bytecode.handlers[("default", "state_entry")])
+        slices = 1
+        while not vm.resume(task, budget=25):
+            slices += 1
+            assert simulator.call_stack.frames == []
+
+        assert slices > 10
+        assert simulator.global_scope.get("total") == run(parsed, use_compiler=False).global_scope.get("total")
+
+    def test_jump_and_label(self):
+        """jump/label, which the closure compiler leaves to the interpreter, compile to jumps."""
+        code = """
+        integer total = 0;
+        default { state_entry() {
+            integer i = 0;
+            @again;
+            total += i;
+            i++;
+            if (i < 5) jump again;
+        } }
+        """
+        parsed_script = LSLParser(single_pass=True).parse(code)
+        simulator = run(parsed_script, use_bytecode=True)
+
+        assert ("default", "state_entry") in simulator.compiled_handlers
+        assert simulator.global_scope.get("total") == 10
+
+    def test_disassemble(self, parsed):
+        listing = BytecodeCompiler().compile_script(parsed).functions["sq"].disassemble()
+
+        assert "LOAD_NAME" in listing and "n" in listing
+        assert "RETURN_VALUE" in listing
@@ -0,0 +1,103 @@
+"""
+Tests for the shared-memory chat bus.
+"""
+
+import pytest
+from lsl_chat_bus import (BusEndpoint, ChatBus, RingBuffer, benchmark, decode_record, decode_values,
+                          encode_record, encode_values)
+
+
+@pytest.fixture
+def endpoints():
+    bus = ChatBus(3, size=1024)
+    ends = [BusEndpoint(bus.names, shard) for shard in range(3)]
+    yield ends
+    for end in ends:
+        end.close()
+    bus.close()
+
+
+class TestEncoding:
+    """Test suite for the LSL value encoding."""
+
+    def test_values_round_trip(self):
+        values = (7, -2.5, "héllo", (1.0, 2.0, 3.0), (0.0, 0.0, 0.0, 1.0), [1, "a", [2.0, (0.5, 0.5, 0.5)]], "")
+
+        assert decode_values(encode_values(values)) == values
+
+    def test_integers_wrap_to_32_bits(self):
+        assert decode_values(encode_values([2 ** 31, -2 ** 31 - 1, True])) == (-2 ** 31, 2 ** 31 - 1, 1)
+
+    @pytest.mark.parametrize("record", [
+        (0, "Object", "a1b2c3d4-0000-0000-0000-000000000000", "hello"),
+        (-12345, "", "", "ünïcode"),
+        (1, [2, 3], "key", 4.0),
+        (5, "name", "key", "x" * 70000),
+        (5, "name", "key", "positioned", 128.0, 64.5, 22.0, 20.0),
+    ])
+    def test_records_round_trip(self, record):
+        data = encode_record(record)
+
+        assert decode_record(data, 0, len(data)) == tuple(record)
+
+
+class TestRingBuffer:
+    """Test suite for the shared-memory ring."""
+
+    def test_wraps_around(self):
+        writer = RingBuffer.create(readers=1, size=256)
+        reader = RingBuffer.attach(writer.name)
+        received = []
+        for batch in range(50):
+            records = [encode_record((batch, "n", "k", "m" * (i * 7 % 40))) for i in range(3)]
+            assert writer.write(records) == 3
+            received.extend(reader.read(0))
+
+        assert len(received) == 150
+        assert [record[0] for record in received] == [batch for batch in range(50) for _ in range(3)]
+        assert writer.write_position > 256
+        reader.close()
+        writer.close()
+
+    def test_full_ring_takes_a_prefix(self):
+        ring = RingBuffer.create(readers=1, size=128)
+        payload = encode_record((1, "name", "key", "x" * 20))
+
+        written = ring.write([payload] * 10)
+        assert 0 < written < 10
+        assert ring.write([payload]) == 0
+        assert len(ring.read(0)) == written
+        assert ring.write([payload]) == 1
+        ring.close()
+
+
+class TestChatBus:
+    """Test suite for ChatBus endpoints."""
+
+    def test_every_other_shard_receives(self, endpoints):
+        endpoints[0].publish([(1, "zero", "k0", "hi")])
+        endpoints[2].publish([(1, "two", "k2", "yo")])
+
+        assert endpoints[0].consume() == [(1, "two", "k2", "yo")]
+        assert endpoints[1].consume() == [(1, "zero", "k0", "hi"), (1, "two", "k2", "yo")]
+        assert endpoints[2].consume() == [(1, "zero", "k0", "hi")]
+        assert endpoints[1].consume() == []
+
+    def test_positioned_chat(self, endpoints):
+        record = (3, "Object", "k", "hi", 1.5, 2.5, 3.5, 10.0)
+        endpoints[1].publish([record])
+
+        assert endpoints[0].consume() == [record]
+
+    def test_consume_stops_at_limits(self, endpoints):
+        endpoints[0].publish([(1, "a", "k", "first")])
+        limits = [end.position() for end in endpoints]
+        endpoints[0].publish([(1, "a", "k", "second")])
+
+        assert endpoints[1].consume(limits) == [(1, "a", "k", "first")]
+        assert endpoints[1].consume() == [(1, "a", "k", "second")]
+
+    def test_across_processes(self):
+        result = benchmark(workers=2, records=2000, batch=64, size=4096)
+
+        assert result['deliveries'] == 2 * 2000
@@ -0,0 +1,109 @@
+"""
+Tests for the closure compiler tier.
+Compiled handlers must behave exactly like the interpreter, only faster.
+"""
+
+import time
+from lsl_antlr_parser import LSLParser
+from lsl_simulator import LSLSimulator
+
+
+SCRIPT = """
+integer total = 0;
+string log = "";
+vector pos = <0, 0, 0>;
+
+integer sq(integer n) { return n * n; }
+
+integer find_first(integer limit) {
+    integer i;
+    for (i = 0; i < limit; i++) {
+        if (sq(i) > 50) return i;
+    }
+    return -1;
+}
+
+default {
+    state_entry() {
+        integer i;
+        for (i = 0; i < 10; i++) {
+            if (i % 3 == 0) total += sq(i); else total = total + 1;
+        }
+        integer j = 5;
+        while (j > 0) { log += (string)j; j--; }
+        do { j++; } while (j < 3);
+        pos = <1, 2, 3>;
+        pos.z = 9;
+        total = total + find_first(100) * 1000 + j * 100000;
+    }
+}
+"""
+
+
+def run(code, use_compiler):
+    parser = LSLParser(single_pass=True)
+    simulator = LSLSimulator(parser.parse(code), use_compiler=use_compiler)
+    simulator.trigger_event("state_entry")
+    return simulator
+
+
+class TestScriptCompiler:
+    """Test suite for ScriptCompiler."""
+
+    def test_bodies_are_compiled(self):
+        """Functions and handlers are compiled at load time."""
+        simulator = run(SCRIPT, use_compiler=True)
+
+        assert set(simulator.compiled_functions) == {"sq", "find_first"}
+        assert ("default", "state_entry") in simulator.compiled_handlers
+
+    def test_matches_interpreter(self):
+        """Compiled and interpreted execution leave identical globals."""
+        compiled = run(SCRIPT, use_compiler=True)
+        interpreted = run(SCRIPT, use_compiler=False)
+
+        for name in ("total", "log", "pos"):
+            assert compiled.global_scope.get(name) == interpreted.global_scope.get(name)
+        assert compiled.global_scope.get("total") == 300000 + 8000 + 126 + 6
+
+    def test_debug_mode_uses_interpreter(self):
+        """The debugger needs per-statement hooks, so nothing is compiled."""
+        parsed = LSLParser(single_pass=True).parse(SCRIPT)
+        simulator = LSLSimulator(parsed, debug_mode=True)
+
+        assert simulator.compiled_functions == {}
+        assert simulator.compiled_handlers == {}
+
+    def test_unsupported_body_falls_back(self):
+        """A body the compiler rejects is interpreted; other bodies stay compiled."""
+        code = """
+        integer total = 0;
+        default {
+            state_entry() { total = 1; jump done; @done; }
+            touch_start(integer n) { total = 2; }
+        }
+        """
+        simulator = run(code, use_compiler=True)
+
+        assert ("default", "state_entry") not in simulator.compiled_handlers
+        assert ("default", "touch_start") in simulator.compiled_handlers
+        assert simulator.global_scope.get("total") == 1
+
+    def test_performance_loop(self):
+        """Loop-heavy handlers run several times faster compiled."""
+        code = """
+        integer total = 0;
+        default { state_entry() {
+            integer i;
+            for (i = 0; i < 20000; i++) { integer k = i * 2; total += k; }
+        } }
+        """
+        timings = {}
+        for use_compiler in (False, True):
+            start = time.perf_counter()
+            simulator = run(code, use_compiler)
+            timings[use_compiler] = time.perf_counter() - start
+            assert simulator.global_scope.get("total") == 399980000
+
+        print(f"\nInterpreter: {timings[False]:.3f}s, compiled: {timings[True]:.3f}s")
+        assert timings[True] * 2 < timings[False]
@@ -0,0 +1,85 @@
+"""
+Tests for the blocking simulator event loop.
+"""
+
+import threading
+import time
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_simulator import LSLSimulator
+
+
+SCRIPT = """
+integer touches = 0;
+
+default {
+    touch_start(integer n) {
+        touches++;
+    }
+}
+"""
+
+
+@pytest.fixture
+def running():
+    """A simulator whose event loop runs in a background thread."""
+    simulator = LSLSimulator(LSLParser(single_pass=True).parse(SCRIPT))
+    thread = threading.Thread(target=simulator.run, daemon=True)
+    thread.start()
+    yield simulator, thread
+    simulator.stop()
+    thread.join(timeout=2.0)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class TestEventLoop:
+    """Test suite for LSLSimulator.run."""
+
+    def test_wakes_on_enqueue(self, running):
+        simulator, _ = running
+        simulator.queue_event("touch_start", [1])
+
+        assert wait_for(lambda: simulator.global_scope.get("touches") == 1)
+        stats = simulator.get_performance_stats()['event_loop']
+        assert stats['events'] == 2   # state_entry + touch_start
+        assert 0.0 <= stats['mean_latency'] <= stats['max_latency']
+
+    def test_stop_wakes_blocked_loop(self, running):
+        simulator, thread = running
+        assert wait_for(lambda: simulator.events_dispatched == 1)
+        started = time.monotonic()
+        simulator.stop()
+        thread.join(timeout=2.0)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 0.5
+
+    def test_idle_loop_does_not_poll(self, running):
+        simulator, _ = running
+        assert wait_for(lambda: simulator.events_dispatched == 1)
+        cpu = time.process_time()
+        time.sleep(0.3)
+
+        assert time.process_time() - cpu < 0.05
+
+    def test_handler_errors_are_counted(self, running, monkeypatch):
+        simulator, _ = running
+        assert wait_for(lambda: simulator.events_dispatched == 1)
+
+        def failing_trigger(event_name, *args):
+            raise RuntimeError("handler failed")
+        monkeypatch.setattr(simulator, "trigger_event", failing_trigger)
+        simulator.queue_event("touch_start", [1])
+        assert wait_for(lambda: simulator.dispatch_errors == 1)
+        monkeypatch.undo()
+
+        simulator.queue_event("touch_start", [1])
+        assert wait_for(lambda: simulator.global_scope.get("touches") == 1)
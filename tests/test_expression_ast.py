@@ -0,0 +1,178 @@
+"""
+Tests for structured expression nodes.
+Covers the typed nodes emitted by the ANTLR parser and their execution by the simulator.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_simulator import LSLSimulator
+
+
+def parse(code):
+    """Parse a script with the single-pass parser."""
+    parser = LSLParser(single_pass=True)
+    parsed = parser.parse(code)
+    assert not parser.errors
+    return parsed
+
+
+def run_state_entry(code):
+    """Parse a script and run its default state_entry handler."""
+    simulator = LSLSimulator(parse(code))
+    simulator.trigger_event("state_entry")
+    return simulator
+
+
+def entry_body(code):
+    return parse(code)["states"]["default"]["state_entry"]["body"]
+
+
+class TestExpressionNodes:
+    """Test suite for parser expression nodes."""
+
+    def test_binary_precedence(self):
+        """Multiplication binds tighter than addition."""
+        body = entry_body("default { state_entry() { integer x = 1 + 2 * 3; } }")
+        value = body[0]["value"]
+
+        assert value["type"] == "binary"
+        assert value["op"] == "+"
+        assert value["left"] == {"type": "literal", "value": 1}
+        assert value["right"]["op"] == "*"
+
+    def test_left_associativity(self):
+        """Operators of equal precedence fold to the left."""
+        body = entry_body("default { state_entry() { integer x = 10 - 4 - 3; } }")
+        value = body[0]["value"]
+
+        assert value["op"] == "-"
+        assert value["left"]["op"] == "-"
+        assert value["right"] == {"type": "literal", "value": 3}
+
+    @pytest.mark.parametrize("source,expected", [
+        ("42", 42),
+        ("0x1F", 31),
+        ("-5", -5),
+        ("1.5", 1.5),
+        ('"a\\"b"', 'a"b'),
+        ("TRUE", 1),
+        ("NULL_KEY", "00000000-0000-0000-0000-000000000000"),
+    ])
+    def test_literals(self, source, expected):
+        """Literals are converted to Python values at parse time."""
+        body = entry_body("default { state_entry() { x = %s; } }" % source)
+        assert body[0]["expression"] == {"type": "literal", "value": expected}
+
+    def test_call_cast_and_vector(self):
+        """Calls, casts and vector literals get their own node types."""
+        body = entry_body('default { state_entry() { llSay(0, (string)<1, 2, 3>); } }')
+        call = body[0]["expression"]
+
+        assert call["type"] == "call"
+        assert call["name"] == "llSay"
+        assert call["args"][1]["type"] == "cast"
+        assert call["args"][1]["expression"]["type"] == "vector"
+
+    def test_cast_takes_one_operand(self):
+        """A cast applies to the operand after it, not to the rest of the expression."""
+        body = entry_body('default { state_entry() { x = -(integer)"3" + 4; y = (float)(7 / 2); } }')
+        value = body[0]["expression"]
+
+        assert value["op"] == "+"
+        assert value["left"] == {"type": "unary", "op": "-", "operand": {
+            "type": "cast", "cast_type": "integer", "expression": {"type": "literal", "value": "3"}}}
+        assert body[1]["expression"]["expression"]["op"] == "/"
+
+    def test_statement_nodes(self):
+        """do/while, state changes and postfix operators are structured."""
+        body = entry_body("default { state_entry() { do { i++; } while (i < 3); state other; } } state other { }")
+
+        assert body[0]["type"] == "do_while_statement"
+        assert body[0]["statement"]["statements"][0]["expression"]["type"] == "postfix"
+        assert body[1] == {"type": "state_change", "state": "other"}
+
+
+class TestStructuredExecution:
+    """Test suite for executing structured statements."""
+
+    def test_for_loop_keeps_integers(self):
+        """+= on integers stays integral."""
+        simulator = run_state_entry("""
+            integer total = 0;
+            default { state_entry() { integer i; for (i = 0; i < 5; i++) { total += i; } } }
+        """)
+        total = simulator.global_scope.get("total")
+
+        assert total == 10
+        assert isinstance(total, int)
+
+    def test_if_else_chain(self):
+        """Else-if chains pick the first matching branch."""
+        simulator = run_state_entry("""
+            string result = "";
+            default { state_entry() {
+                integer n = 5;
+                if (n < 3) result = "small"; else if (n < 10) result = "medium"; else result = "large";
+            } }
+        """)
+        assert simulator.global_scope.get("result") == "medium"
+
+    def test_recursive_function_and_return(self):
+        """User functions return through nested blocks; calls as statements do not end the handler."""
+        simulator = run_state_entry("""
+            integer total = 0;
+            integer fact(integer n) { if (n <= 1) return 1; return n * fact(n - 1); }
+            default { state_entry() { fact(3); total = fact(5); } }
+        """)
+        assert simulator.global_scope.get("total") == 120
+
+    def test_component_assignment(self):
+        """v.x = value updates one vector component."""
+        simulator = run_state_entry("""
+            vector pos = <1, 2, 3>;
+            default { state_entry() { pos = <1, 2, 3>; pos.y = 7; } }
+        """)
+        assert simulator.global_scope.get("pos") == [1.0, 7.0, 3.0]
+
+    def test_state_change(self):
+        """state X runs state_exit and queues state_entry for the new state."""
+        simulator = run_state_entry("""
+            integer exited = 0;
+            default { state_entry() { state other; exited = 5; } state_exit() { exited = 1; } }
+            state other { state_entry() { } }
+        """)
+        assert simulator.current_state == "other"
+        assert simulator.global_scope.get("exited") == 1
+        assert simulator.event_queue.get_nowait()[:2] == ("state_entry", [])
+
+    @pytest.mark.parametrize("expression,expected", [
+        ('(float)7 / 2', 3.5),
+        ('(integer)"3" + 4', 7),
+        ('2 * (integer)"3" + 4', 10),
+        ('(string)(integer)"3.5" + "x"', "3x"),
+    ])
+    @pytest.mark.parametrize("options", [{"use_compiler": False}, {}, {"use_bytecode": True}])
+    def test_cast_precedence(self, expression, expected, options):
+        """Casts bind tighter than binary operators on every execution path."""
+        lsl_type = {float: "float", int: "integer", str: "string"}[type(expected)]
+        simulator = LSLSimulator(parse("%s result; default { state_entry() { result = %s; } }" % (lsl_type, expression)),
+                                 **options)
+        simulator.trigger_event("state_entry")
+
+        assert simulator.global_scope.get("result") == expected
+        assert simulator.expression_evaluator.evaluate(expression) == expected
+
+    @pytest.mark.parametrize("options", [{"use_compiler": False}, {}, {"use_bytecode": True}])
+    def test_logical_operators_evaluate_both_sides(self, options):
+        """&& and || run their right side even when the left decides the result, as in LSL."""
+        simulator = LSLSimulator(parse("""
+            integer calls = 0;
+            integer either;
+            integer both;
+            integer bump() { calls++; return 1; }
+            default { state_entry() { both = FALSE && bump(); either = TRUE || bump(); } }
+        """), **options)
+        simulator.trigger_event("state_entry")
+
+        assert simulator.global_scope.get("calls") == 2
+        assert (simulator.global_scope.get("both"), simulator.global_scope.get("either")) == (0, 1)
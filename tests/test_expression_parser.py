@@ -0,0 +1,135 @@
+"""
+Tests for the precedence-climbing expression string parser.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_expression_parser import _Parser, parse_expression, tokenize, ExpressionSyntaxError
+from lsl_simulator import LSLSimulator
+from simple_expression_evaluator import SimpleExpressionEvaluator
+
+
+def antlr_expression(expr):
+    """Expression node the ANTLR visitor produces for `x = <expr>;`"""
+    parsed = LSLParser(single_pass=True).parse("default { state_entry() { x = %s; } }" % expr)
+    return parsed["states"]["default"]["state_entry"]["body"][0]["expression"]
+
+
+class TestExpressionParser:
+    """Test suite for parse_expression."""
+
+    def test_tokenize(self):
+        assert tokenize('llSay(0, "a\\"b") + 0x1F') == [
+            ("name", "llSay"), ("op", "("), ("number", 0), ("op", ","),
+            ("string", 'a"b'), ("op", ")"), ("op", "+"), ("number", 31),
+        ]
+
+    @pytest.mark.parametrize("expr", [
+        "1 + 2 * 3",
+        "10 - 4 - 3",
+        "a == b && c != d || !e",
+        "x << 2 | y & 0xFF ^ z",
+        'llList2String(items, i + 1) + "suffix"',
+        "<1.5, -2, 3>",
+        "<0, 0, 0, 1>",
+        '[1, "two", <1, 2, 3>]',
+        "pos.x * 2",
+        "-count",
+        "i++",
+    ])
+    def test_matches_antlr_nodes(self, expr):
+        """String parsing yields the same nodes as the ANTLR visitor."""
+        assert parse_expression(expr) == antlr_expression(expr)
+
+    def test_cast_binds_like_unary(self):
+        node = parse_expression('(string)count + " items"')
+
+        assert node["type"] == "binary"
+        assert node["left"]["type"] == "cast"
+
+    @pytest.mark.parametrize("expr", ["5 +", "invalid(", "Test Message", "http://example.com", "api.example.com", ""])
+    def test_rejects_non_expressions(self, expr):
+        with pytest.raises(ExpressionSyntaxError):
+            parse_expression(expr)
+
+
+class TestEvaluatorParsing:
+    """Test suite for string evaluation through the parser."""
+
+    def test_left_associativity(self, simulator):
+        evaluator = SimpleExpressionEvaluator(simulator)
+
+        assert evaluator.evaluate("10 - 4 - 3") == 3
+        assert evaluator.evaluate("100 / 10 / 5") == 2
+
+    def test_parse_cached_per_string(self, simulator):
+        evaluator = SimpleExpressionEvaluator(simulator)
+        simulator.global_scope.set("n", 1)
+        evaluator.evaluate("n + 1")
+        node = evaluator._parse_cache["n + 1"]
+        simulator.global_scope.set("n", 41)
+
+        assert evaluator.evaluate("n + 1") == 42
+        assert evaluator._parse_cache["n + 1"] is node
+
+    def test_non_expressions_fall_back(self, simulator):
+        """Unquoted text keeps the lenient legacy behaviour."""
+        evaluator = SimpleExpressionEvaluator(simulator)
+
+        assert evaluator.evaluate("Test Message") == "Test Message"
+        assert evaluator._parse_cache["Test Message"] is None
+
+    def test_long_concatenation_is_linear(self, simulator, monkeypatch):
+        """Parser steps grow linearly with the number of `+` terms."""
+        steps = []
+        peek = _Parser.peek
+        monkeypatch.setattr(_Parser, "peek", lambda parser: steps.append(None) or peek(parser))
+
+        def parse_steps(terms):
+            steps.clear()
+            parse_expression(" + ".join(f'"part{i}"' for i in range(terms)))
+            return len(steps)
+
+        small, large = parse_steps(100), parse_steps(800)
+        evaluator = SimpleExpressionEvaluator(simulator)
+
+        assert evaluator.evaluate('"a" + "b" + "c" + 1') == "abc1"
+        assert large <= small * 8 + 10
+
+
+class TestParseCache:
+    """Test suite for the bounded LRU of parsed expressions."""
+
+    def test_hits_and_misses(self, simulator):
+        evaluator = SimpleExpressionEvaluator(simulator)
+        for _ in range(3):
+            evaluator.evaluate("1 + 2")
+        stats = evaluator.get_cache_stats()
+
+        assert stats['misses'] == 1
+        assert stats['hits'] == 2
+        assert stats['size'] == 1
+
+    def test_bounded_with_lru_eviction(self, simulator):
+        evaluator = SimpleExpressionEvaluator(simulator, cache_size=2)
+        evaluator.evaluate("1 + 1")
+        evaluator.evaluate("2 + 2")
+        evaluator.evaluate("1 + 1")   # refresh, "2 + 2" is now least recently used
+        evaluator.evaluate("3 + 3")
+
+        assert list(evaluator._parse_cache) == ["1 + 1", "3 + 3"]
+        assert evaluator.get_cache_stats()['evictions'] == 1
+
+    def test_reported_by_simulator(self):
+        simulator = LSLSimulator({"globals": [], "functions": {}, "states": {}})
+        simulator.reset_performance_stats()
+        simulator._evaluate_expression("count + 1")
+        simulator._evaluate_expression("count + 1")
+        stats = simulator.get_performance_stats()['expression_evaluator']
+
+        assert stats['evaluations'] == 2
+        assert stats['parse_cache']['hits'] == 1
+        assert stats['parse_cache']['hit_rate'] == 0.5
+
+        simulator.reset_performance_stats()
+        assert simulator.get_performance_stats()['expression_evaluator']['parse_cache']['hits'] == 0
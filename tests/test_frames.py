@@ -0,0 +1,145 @@
+"""
+Tests for slot-backed frames and compile-time variable resolution.
+"""
+
+from lsl_antlr_parser import LSLParser
+from lsl_simulator import Frame, SlotLayout, LSLSimulator
+
+
+SCRIPT = """
+integer total = 0;
+
+integer fact(integer n) {
+    if (n <= 1) return 1;
+    integer rest = fact(n - 1);
+    return n * rest;
+}
+
+default {
+    touch_start(integer count) {
+        integer i;
+        for (i = 0; i < count; i++) { integer k = i * 2; total += k; }
+        total += fact(5);
+    }
+}
+"""
+
+
+def load(**kwargs):
+    return LSLSimulator(LSLParser(single_pass=True).parse(SCRIPT), **kwargs)
+
+
+class TestFrame:
+    """Test suite for Frame and SlotLayout."""
+
+    def test_name_api(self):
+        frame = Frame(None, layout=SlotLayout(["a"]))
+        frame.set("a", 1)
+        frame.set("b", 2)
+
+        assert frame.values == [1, 2]
+        assert frame.get("b") == 2
+        assert frame.get("missing") is None
+        assert frame.has("a") and not frame.has("missing")
+        assert frame.locals == {"a": 1, "b": 2}
+
+    def test_reserve_grows_in_place(self):
+        """References to `values` held by compiled code stay valid."""
+        frame = Frame(None)
+        values = frame.values
+        index = frame.reserve("x")
+        frame.set("x", 5)
+
+        assert values is frame.values
+        assert values[index] == 5
+
+    def test_shared_layout(self):
+        """Frames of one body share a layout but not their values."""
+        layout = SlotLayout(["n"])
+        outer, inner = Frame(None, layout), Frame(None, layout)
+        outer.set("n", 1)
+        inner.set("n", 2)
+
+        assert (outer.get("n"), inner.get("n")) == (1, 2)
+
+
+class TestSlotResolution:
+    """Test suite for resolving compiled variables to slots."""
+
+    def test_layouts(self):
+        """Arguments take the first slots, followed by declared locals."""
+        simulator = load()
+
+        assert simulator.compiled_handlers[("default", "touch_start")].layout.names == ["count", "i", "k"]
+        assert simulator.compiled_functions["fact"].layout.names == ["n", "rest"]
+        assert "total" in simulator.global_scope.layout.index
+
+    def test_all_tiers_agree(self):
+        """Recursion and global updates give the same result in every tier."""
+        expected = sum(i * 2 for i in range(10)) + 120
+        for kwargs in ({"use_compiler": False}, {}, {"use_bytecode": True}):
+            simulator = load(**kwargs)
+            simulator.trigger_event("touch_start", 10)
+
+            assert simulator.global_scope.get("total") == expected
+            assert simulator.call_stack.frames == []
+
+    def test_globals_bypass_attribute_lookup(self):
+        """Unknown names do not reach LSLSimulator.__getattr__."""
+        simulator = load()
+
+        assert simulator.expression_evaluator._lookup_variable("llSay") == "llSay"
+
+
+STATES = """
+string log = "";
+default {
+    touch_start(integer n) { string note = "d" + (string)n; log += note; state other; }
+    state_exit() { log += "x"; }
+}
+state other {
+    touch_start(integer n) { log += "o" + (string)n; }
+}
+"""
+
+
+class TestDispatchTables:
+    """Test suite for per-state dispatch tables and pooled handler frames."""
+
+    def load(self, **kwargs):
+        return LSLSimulator(LSLParser(single_pass=True).parse(STATES), **kwargs)
+
+    def test_tables_follow_the_state(self):
+        for kwargs in ({"use_compiler": False}, {}, {"use_bytecode": True}):
+            simulator = self.load(**kwargs)
+            assert set(simulator.dispatch_tables) == {"default", "other"}
+
+            simulator.trigger_event("touch_start", 1)
+            simulator.trigger_event("touch_start", 2)
+            assert simulator.state_handlers is simulator.dispatch_tables["other"]
+            assert simulator.global_scope.get("log") == "d1xo2"
+
+    def test_frames_are_reused_and_cleared(self):
+        simulator = load(use_compiler=False)
+        handler = simulator.dispatch_tables["default"]["touch_start"]
+        assert handler.arg_slots == (0,)
+
+        simulator.trigger_event("touch_start", 3)
+        frame, = handler.pool
+        assert frame.values == [None] * len(handler.layout.names)
+        simulator.trigger_event("touch_start", 1)
+
+        assert handler.pool == [frame]
+        assert simulator.global_scope.get("total") == (0 + 2 + 4 + 120) + (0 + 120)
+
+    def test_dispatch_time_is_separate_from_handler_time(self):
+        simulator = load()
+        for _ in range(5):
+            simulator.queue_event("touch_start", [100])
+        while not simulator.event_queue.empty():
+            simulator._dispatch_event(simulator.event_queue.get_nowait())
+
+        stats = simulator.get_performance_stats()['event_loop']
+        assert stats['events'] == 5
+        assert stats['handler_time'] > 0.0
+        assert 0.0 < stats['mean_dispatch_overhead'] < stats['handler_time'] / 5
@@ -0,0 +1,255 @@
+"""
+Tests for the pooled llHTTPRequest client.
+"""
+
+import importlib.util
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_http import (FAILED_STATUS, HTTP_BODY_TRUNCATED, HTTP_CUSTOM_HEADER, HTTP_METHOD, NULL_KEY, CannedTransport,
+                      Cassette, HttpClient, Recorder, SessionTransport, WSGITransport, parse_parameters)
+from lsl_region import RegionHost
+from lsl_scheduler import Scheduler, VirtualClock
+
+MOCK_NEXUS_SERVER = Path(__file__).parent.parent / "unused_files" / "mock_nexus_server.py"
+
+
+def load_mock_nexus_server():
+    """The Flask mock of the NPC backend, loaded from its file (unused_files is not a package)"""
+    pytest.importorskip("flask")
+    spec = importlib.util.spec_from_file_location("mock_nexus_server", MOCK_NEXUS_SERVER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Script:
+    """Just enough of a simulator for the client: a key and an event list"""
+
+    def __init__(self, name="Object"):
+        self.object_key = f"key-{name}"
+        self.object_name = name
+        self.events = []
+        self.received = threading.Event()
+
+    def queue_event(self, name, args):
+        self.events.append((name, args))
+        self.received.set()
+
+
+def echo_app(environ, start_response):
+    """WSGI app answering with what it was sent"""
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    reply = {'method': environ["REQUEST_METHOD"], 'path': environ["PATH_INFO"], 'query': environ["QUERY_STRING"],
+             'type': environ.get("CONTENT_TYPE"), 'object': environ.get("HTTP_X_SECONDLIFE_OBJECT_NAME"),
+             'extra': environ.get("HTTP_X_EXTRA"), 'body': environ["wsgi.input"].read(length).decode()}
+    start_response("201 Created", [("Content-Type", "application/json")])
+    return [json.dumps(reply).encode()]
+
+
+@pytest.fixture
+def scheduler():
+    return Scheduler(VirtualClock())
+
+
+def run(scheduler, seconds):
+    end = scheduler.clock() + seconds
+    while scheduler.advance(until=end):
+        pass
+    scheduler.clock.advance_to(end)
+
+
+class TestHttpClient:
+    """Test suite for HttpClient on in-process transports."""
+
+    def test_parameters(self):
+        options = parse_parameters([HTTP_METHOD, "post", "mimetype", "application/json",
+                                    HTTP_CUSTOM_HEADER, "X-Extra", "1", 2, 16])
+
+        assert options['method'] == "POST"
+        assert options['headers'] == {"Content-Type": "application/json", "X-Extra": "1"}
+        assert options['max_body'] == 16
+
+    def test_response_carries_the_returned_key(self, scheduler):
+        client, script = HttpClient(scheduler), Script()
+        key = client.request(script, "http://example.com/hook", [], "")
+        run(scheduler, 0.4)
+        assert script.events == []
+
+        run(scheduler, 0.1)
+        assert [(name, args[0], args[1]) for name, args in script.events] == [("http_response", key, 200)]
+
+    def test_throttle(self, scheduler):
+        client, script = HttpClient(scheduler, max_per_script=100), Script()
+        keys = [client.request(script, "http://example.com/talk", [], "") for _ in range(26)]
+
+        assert NULL_KEY not in keys[:25] and keys[25] == NULL_KEY
+        assert client.request(Script("other"), "http://example.com/talk", [], "") != NULL_KEY
+        run(scheduler, 20.0)
+        assert client.request(script, "http://example.com/talk", [], "") != NULL_KEY
+        assert client.get_stats()['throttled'] == 1
+
+    def test_concurrency_limits(self, scheduler):
+        client = HttpClient(scheduler, max_in_flight=5, max_per_script=2)
+        busy, quiet = Script("busy"), Script("quiet")
+        for _ in range(6):
+            client.request(busy, "http://example.com/talk", [], "")
+        client.request(quiet, "http://example.com/talk", [], "")
+        assert client.in_flight == 3     # busy's two slots, then quiet's request skips the queue
+
+        for delivered in (3, 5, 7):
+            run(scheduler, 0.5)
+            assert len(busy.events) + len(quiet.events) == delivered
+        assert client.get_stats()['peak_in_flight'] == 3
+        assert client.in_flight == 0
+
+    def test_wsgi_transport(self, scheduler):
+        client, script = HttpClient(scheduler, WSGITransport(echo_app, latency=0.0)), Script("Greeter")
+        key = client.request(script, "http://backend:5000/npc/talk?x=1",
+                             [HTTP_METHOD, "POST", HTTP_CUSTOM_HEADER, "X-Extra", "yes"], "hello")
+        run(scheduler, 0.0)
+
+        (name, (request_id, status, metadata, body)), = script.events
+        assert (request_id, status, metadata) == (key, 201, [])
+        assert json.loads(body) == {'method': "POST", 'path': "/npc/talk", 'query': "x=1",
+                                    'type': "text/plain;charset=utf-8", 'object': "Greeter", 'extra': "yes",
+                                    'body': "hello"}
+
+    def test_long_bodies_are_truncated(self, scheduler):
+        client, script = HttpClient(scheduler, WSGITransport(echo_app, latency=0.0)), Script()
+        client.request(script, "http://backend/", [2, 20], "x" * 100)
+        run(scheduler, 0.0)
+
+        _, (_, _, metadata, body) = script.events[0]
+        assert len(body) == 20 and metadata == [HTTP_BODY_TRUNCATED, 20]
+
+    def test_failures_are_499(self, scheduler):
+        def broken(environ, start_response):
+            raise ConnectionError("backend down")
+
+        client, script = HttpClient(scheduler, WSGITransport(broken)), Script()
+        client.request(script, "http://backend/", [], "")
+        run(scheduler, 1.0)
+
+        assert script.events[0][1][1] == FAILED_STATUS
+        assert client.get_stats()['failed'] == 1
+
+
+TALKER = LSLParser(single_pass=True).parse("""
+string log = "";
+integer turns = 0;
+default {
+    state_entry() { llHTTPRequest("http://backend/npc/register", [HTTP_METHOD, "POST"], (string)llGetKey()); }
+    http_response(key id, integer status, list meta, string body) {
+        log += (string)status + ":" + body + "@" + (string)llGetTime() + ";";
+        turns = turns + 1;
+        if (turns < 3) llHTTPRequest("http://backend/npc/talk", [HTTP_METHOD, "POST"], "turn " + (string)turns);
+    }
+}
+""")
+
+
+class TestCassette:
+    """Test suite for recording and replaying HTTP traffic."""
+
+    def talk(self, transport):
+        region = RegionHost(http_transport=transport)
+        script = region.add_script(TALKER)
+        region.run_for(10.0)
+        return script.global_scope.get("log")
+
+    def test_replay_matches_recording(self, tmp_path):
+        cassette = tmp_path / "npc.jsonl"
+        recorder = Recorder(WSGITransport(echo_app, latency=0.25), str(cassette))
+        recorded = self.talk(recorder)
+
+        assert recorder.recorded == 3 and len(cassette.read_text().splitlines()) == 3
+        replay = Cassette(str(cassette))
+        assert self.talk(replay) == self.talk(Cassette(str(cassette))) == recorded
+        assert replay.remaining() == 0
+        assert "@0.75;" in recorded      # three round trips at the recorded latency
+
+    def test_full_speed_replay(self, tmp_path):
+        cassette = tmp_path / "npc.jsonl"
+        recorded = self.talk(Recorder(CannedTransport(), str(cassette)))
+        fast = self.talk(Cassette(str(cassette), latency=0.0))
+
+        assert [entry.split("@")[0] for entry in fast.split(";")] == [
+            entry.split("@")[0] for entry in recorded.split(";")]
+        assert fast.endswith("@0.0;")
+
+    def test_body_picks_among_recordings(self, tmp_path, scheduler):
+        cassette = tmp_path / "pairs.jsonl"
+        client, script = HttpClient(scheduler, Recorder(WSGITransport(echo_app, latency=0.0), str(cassette))), Script()
+        for body in ("a", "b"):
+            client.request(script, "http://backend/echo", [HTTP_METHOD, "POST"], body)
+        run(scheduler, 0.0)
+
+        client, script = HttpClient(scheduler, Cassette(str(cassette))), Script()
+        for body in ("b", "c", "a"):
+            client.request(script, "http://backend/echo", [HTTP_METHOD, "POST"], body)
+        run(scheduler, 0.0)
+        replies = [args[3] for _, args in script.events]
+        assert json.loads(replies[0])['body'] == "b"
+        assert json.loads(replies[1])['body'] == "a"       # no recording for "c": the oldest left
+        assert script.events[2][1][1] == FAILED_STATUS      # the cassette ran out
+
+
+class TestTransports:
+    """Test suite for the network and backend transports."""
+
+    def test_session_transport_keeps_connections(self):
+        connections = set()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                connections.add(self.client_address)
+                body = self.path.encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = HttpClient(Scheduler(), SessionTransport(pool_size=1), max_in_flight=1)
+        try:
+            script = Script()
+            for n in range(3):
+                script.received.clear()
+                client.request(script, f"http://127.0.0.1:{server.server_port}/n{n}", [], "")
+                assert script.received.wait(10)
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+        assert [args[3] for _, args in script.events] == ["/n0", "/n1", "/n2"]
+        assert len(connections) == 1
+
+    def test_mock_nexus_backend_in_process(self):
+        mock_nexus_server = load_mock_nexus_server()
+        region = RegionHost(http_transport=WSGITransport(mock_nexus_server.app))
+        script = region.add_script(LSLParser(single_pass=True).parse("""
+string reply = "";
+default {
+    state_entry() {
+        llHTTPRequest("http://localhost:5000/npc/register", [HTTP_METHOD, "POST", HTTP_MIMETYPE, "application/json"],
+                      "{\\"profile\\": \\"Name: Ada\\", \\"region\\": \\"Test\\", \\"object_key\\": \\"k\\"}");
+    }
+    http_response(key id, integer status, list meta, string body) { reply = body; }
+}
+"""))
+        region.run_for(1.0)
+
+        assert json.loads(script.global_scope.get("reply"))['npc_id'] == "Test_k"
+        assert region.get_stats()['http_requests'] == 1
@@ -0,0 +1,85 @@
+"""
+Tests for the load-time call-site linker.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_dialect import LSLDialect
+from lsl_linker import LinkError
+from lsl_ossl_compatibility import SimulatorMode
+from lsl_region import RegionHost
+from lsl_simulator import LSLSimulator
+
+
+def parse(source):
+    return LSLParser(single_pass=True).parse(source)
+
+
+SCRIPT = parse("""
+string said = "";
+integer twice(integer n) { return n * 2; }
+default {
+    touch_start(integer n) {
+        said = llToUpper("hi") + (string)twice(n);
+        llSay(0, said);
+    }
+}
+""")
+
+OSSL = parse("""
+default { state_entry() { osGetNotecardLine("card", 0); } }
+""")
+
+
+class TestLinker:
+    """Test suite for Linker."""
+
+    def test_calls_are_linked_at_load(self, monkeypatch):
+        resolved = []
+        original = LSLSimulator._resolve_api
+        monkeypatch.setattr(LSLSimulator, "_resolve_api",
+                            lambda self, name: resolved.append(name) or original(self, name))
+        for kwargs in ({"use_compiler": False}, {}, {"use_bytecode": True}):
+            resolved.clear()
+            simulator = LSLSimulator(SCRIPT, **kwargs)
+            assert set(simulator.linker.names) == {"llToUpper", "twice", "llSay"}
+            for n in range(3):
+                simulator.trigger_event("touch_start", n)
+
+            assert simulator.global_scope.get("said") == "HI4"
+            assert sorted(resolved) == ["llSay", "llToUpper"]
+
+    def test_unknown_functions_get_a_placeholder(self):
+        simulator = LSLSimulator(parse("default { state_entry() { llNoSuchThing(1); } }"))
+
+        assert simulator.linker.problems == {"llNoSuchThing": "not implemented"}
+        assert simulator.linker.target("llNoSuchThing")(1) is None
+        simulator.trigger_event("state_entry")
+
+    def test_dialect_and_mode(self):
+        second_life = LSLSimulator(OSSL, dialect=LSLDialect.SECONDLIFE)
+        opensim = LSLSimulator(OSSL, dialect=LSLDialect.OPENSIMULATOR)
+        pathfinding = LSLSimulator(parse("default { state_entry() { llCreateCharacter([]); } }"),
+                                   dialect=LSLDialect.OPENSIMULATOR)
+
+        assert "osGetNotecardLine" in second_life.linker.problems
+        assert opensim.linker.problems == {}
+        assert "llCreateCharacter" in pathfinding.linker.problems
+        with pytest.raises(LinkError):
+            LSLSimulator(OSSL, dialect=LSLDialect.OPENSIMULATOR, mode=SimulatorMode.LSL_STRICT)
+
+    def test_region_relinks_in_place(self):
+        region = RegionHost()
+        listener = region.add_script(parse("""
+string heard = "";
+default {
+    state_entry() { llListen(0, "", "", ""); }
+    listen(integer c, string name, key id, string m) { heard = m; }
+}
+"""))
+        speaker = region.add_script(SCRIPT)
+        region.run_for(0.0)
+        speaker.queue_event("touch_start", [1])
+        region.dispatch_pending()
+
+        assert listener.global_scope.get("heard") == "HI2"
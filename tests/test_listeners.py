@@ -0,0 +1,169 @@
+"""
+Tests for the channel-indexed listener registry.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_listeners import ListenerRegistry, MAX_LISTENS, NULL_KEY, TooManyListens
+from lsl_simulator import LSLSimulator
+
+
+def empty_simulator():
+    return LSLSimulator({"globals": [], "functions": {}, "states": {}})
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait()[:2])
+    return events
+
+
+class TestListenerRegistry:
+    """Test suite for ListenerRegistry."""
+
+    def test_handles_are_reused_lowest_first(self):
+        registry, owner = ListenerRegistry(), object()
+        handles = [registry.add(owner, 0) for _ in range(4)]
+        registry.remove(owner, handles[2])
+        registry.remove(owner, handles[0])
+
+        assert handles == [1, 2, 3, 4]
+        assert [registry.add(owner, 0) for _ in range(3)] == [1, 3, 5]
+
+    def test_listen_limit(self):
+        registry, owner = ListenerRegistry(), object()
+        for _ in range(MAX_LISTENS):
+            registry.add(owner, 1)
+
+        with pytest.raises(TooManyListens):
+            registry.add(owner, 1)
+        registry.add(object(), 1)   # the limit is per script
+        registry.remove(owner, 7)
+        assert registry.add(owner, 1) == 7
+
+    def test_filters(self):
+        registry, owner = ListenerRegistry(), object()
+        registry.add(owner, 5)
+        registry.add(owner, 5, name="Bob")
+        registry.add(owner, 5, key="k-bob", message="hi")
+        registry.add(owner, 5, name="Alice", key="k-bob")
+        registry.add(owner, 6)
+
+        def hears(name, key, message):
+            return sorted(listener.handle for listener in registry.match(5, name, key, message))
+
+        assert hears("Bob", "k-bob", "hi") == [1, 2, 3]
+        assert hears("Bob", "k-bob", "yo") == [1, 2]
+        assert hears("Alice", "k-bob", "yo") == [1, 4]
+        assert hears("Carol", "k-carol", "hi") == [1]
+
+    def test_null_key_means_any_speaker(self):
+        registry, owner = ListenerRegistry(), object()
+        registry.add(owner, 0, key=NULL_KEY)
+        registry.add(owner, 0, name="Bob", key=NULL_KEY)
+
+        assert sorted(listener.handle for listener in registry.match(0, "Bob", "aaaa-bbbb", "hi")) == [1, 2]
+        assert len(registry.match(0, "Carol", "cccc-dddd", "hi")) == 1
+        assert registry.channels[0][0] == {}
+
+    def test_disabled_and_removed(self):
+        registry, owner = ListenerRegistry(), object()
+        handle = registry.add(owner, 3, name="Bob")
+        registry.control(owner, handle, False)
+        assert registry.match(3, "Bob", "", "") == []
+
+        registry.control(owner, handle, True)
+        assert len(registry.match(3, "Bob", "", "")) == 1
+
+        registry.remove(owner, handle)
+        assert registry.channels == {}
+        assert len(registry) == 0
+
+    def test_say_touches_only_its_channel(self):
+        registry = ListenerRegistry()
+        owners = [object() for _ in range(400)]
+        for i, owner in enumerate(owners):
+            for j in range(50):
+                registry.add(owner, i * 50 + j, key=f"speaker-{j}" if j % 2 else "")
+
+        assert len(registry) == 20000
+        assert len(registry.match(1235, "Someone", "speaker-7", "")) == 0
+        assert len(registry.match(1235, "Someone", "speaker-35", "")) == 1
+        assert registry.checked == 1
+
+
+LISTEN_SCRIPT = """
+string heard = "";
+integer handle;
+default {
+    state_entry() { handle = llListen(7, "", "", ""); }
+    listen(integer channel, string name, key id, string message) {
+        heard += name + ":" + message + ";";
+        if (message == "off") llListenRemove(handle);
+        if (message == "leave") state other;
+    }
+}
+state other {
+    state_entry() { }
+}
+"""
+
+
+class TestSimulatorListen:
+    """Test suite for chat delivery to a simulator's listen events."""
+
+    def run_pending(self, simulator):
+        while not simulator.event_queue.empty():
+            simulator._dispatch_event(simulator.event_queue.get_nowait())
+
+    def make_simulator(self):
+        simulator = LSLSimulator(LSLParser(single_pass=True).parse(LISTEN_SCRIPT))
+        simulator.queue_event("state_entry")
+        self.run_pending(simulator)
+        return simulator
+
+    def test_say_on_channel(self):
+        simulator = self.make_simulator()
+        assert simulator.say_on_channel(7, "hello", "Bob", "k-bob") == 1
+        assert simulator.say_on_channel(8, "ignored", "Bob", "k-bob") == 0
+        self.run_pending(simulator)
+
+        assert simulator.global_scope.get("heard") == "Bob:hello;"
+
+    def test_listen_with_null_key(self):
+        simulator = LSLSimulator(LSLParser(single_pass=True).parse(
+            LISTEN_SCRIPT.replace('llListen(7, "", "", "")', 'llListen(0, "", NULL_KEY, "")')))
+        simulator.queue_event("state_entry")
+        self.run_pending(simulator)
+
+        assert simulator.say_on_channel(0, "hi", "Bob", "aaaa-bbbb") == 1
+
+    def test_remove_from_script(self):
+        simulator = self.make_simulator()
+        simulator.say_on_channel(7, "off")
+        self.run_pending(simulator)
+        simulator.say_on_channel(7, "again")
+        self.run_pending(simulator)
+
+        assert simulator.global_scope.get("heard") == "Avatar:off;"
+        assert len(simulator.listeners) == 0
+
+    def test_state_change_drops_listens(self):
+        simulator = self.make_simulator()
+        simulator.say_on_channel(7, "leave")
+        self.run_pending(simulator)
+
+        assert simulator.current_state == "other"
+        assert simulator.say_on_channel(7, "anyone?") == 0
+
+    def test_too_many_listens_is_a_script_error(self):
+        simulator = empty_simulator()
+        for channel in range(MAX_LISTENS):
+            simulator.api_llListen(channel, "", "", "")
+
+        with pytest.raises(TooManyListens):
+            simulator.api_llListen(99, "", "", "")
+        simulator.api_llListenControl(1, 0)
+        assert simulator.say_on_channel(0, "muted") == 0
+        assert drain(simulator.event_queue) == []
@@ -0,0 +1,123 @@
+"""
+Tests for the categorized logger.
+"""
+
+import io
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_log import LogWriter, Logger, configure, get_logger
+from lsl_region import RegionHost
+from lsl_simulator import LSLSimulator
+
+
+@pytest.fixture
+def logger():
+    return Logger(LogWriter(io.StringIO(), capacity=3))
+
+
+@pytest.fixture
+def global_logger():
+    """The process-wide logger writing to a buffer, put back to its defaults afterwards"""
+    stream = io.StringIO()
+    get_logger().reset_stats()
+    yield stream
+    configure("warning,chat=info", writer=LogWriter())
+    get_logger().reset_stats()
+
+
+class TestLogger:
+    """Test suite for Logger and Category."""
+
+    def test_levels(self, logger):
+        events, chat = logger.category("event"), logger.category("chat")
+
+        assert not events.debug_on and not events.info_on and events.warning_on
+        assert chat.info_on and not chat.debug_on
+        logger.configure("event=debug")
+        assert events.debug_on
+        logger.configure("off")
+        assert not events.error_on and not chat.info_on
+        assert not logger.category("later").warning_on      # set before it existed
+
+    def test_unknown_level(self, logger):
+        with pytest.raises(ValueError):
+            logger.configure("event=loud")
+
+    def test_writer_batches(self, logger):
+        stream = logger.writer.stream
+        events = logger.category("event")
+        logger.configure("debug")
+        events.debug("one %d", 1)
+        events.info("two")
+        assert stream.getvalue() == ""
+
+        events.debug("three %s", "3")
+        assert stream.getvalue() == "[EVENT] one 1\n[EVENT] two\n[EVENT] three 3\n"
+        events.warning("now")
+        assert stream.getvalue().endswith("[EVENT] now\n")
+
+    def test_counts_without_output(self, logger):
+        events = logger.category("event")
+        logger.configure("event=info", output=False)
+        events.debug("skipped")
+        events.info("counted %s", object())
+        events.error("counted")
+
+        assert logger.writer is None
+        assert logger.get_stats() == {"event": {"info": 1, "error": 1}}
+
+    def test_chat_is_written_at_once(self, logger):
+        logger.configure("event=info")
+        logger.category("chat").info("hello")
+        logger.category("event").warning("not batched either")
+        logger.category("event").info("held")
+
+        assert logger.writer.stream.getvalue() == "[CHAT] hello\n[EVENT] not batched either\n"
+
+    def test_percent_without_args(self, logger):
+        logger.configure(output=True)
+        logger.category("chat").info("100% {literal}")
+        logger.flush()
+
+        assert logger.writer.stream.getvalue() == "[CHAT] 100% {literal}\n"
+
+
+class TestSimulatorLogging:
+    """Test suite for the simulator's log categories."""
+
+    SCRIPT = LSLParser(single_pass=True).parse("""
+default {
+    state_entry() { llSetTimerEvent(1.0); }
+    timer() { llOwnerSay("tick"); }
+}
+""")
+
+    def test_defaults_write_chat_only(self, global_logger):
+        configure(writer=LogWriter(global_logger, capacity=1))
+        region = RegionHost()
+        region.add_script(self.SCRIPT)
+        region.run_for(2.0)
+
+        assert global_logger.getvalue() == "[CHAT] [Owner] tick\n" * 2
+        assert "event" not in get_logger().get_stats()
+
+    def test_debug_categories_count_when_silent(self, global_logger):
+        configure("event=debug,api=debug,chat=warning", output=False)
+        region = RegionHost()
+        region.add_script(self.SCRIPT)
+        region.run_for(3.0)
+
+        stats = get_logger().get_stats()
+        assert stats["event"] == {"debug": 4}      # state_entry and three timers
+        assert "chat" not in stats
+        assert global_logger.getvalue() == ""
+
+    def test_say_reaches_the_default_writer(self, global_logger):
+        configure(writer=LogWriter(global_logger))
+        simulator = LSLSimulator(LSLParser(single_pass=True).parse("""
+default { state_entry() { llSay(0, "hello"); llOwnerSay("owner"); } }
+"""))
+        simulator.trigger_event("state_entry")
+
+        assert global_logger.getvalue() == "[CHAT] [Channel 0] hello\n[CHAT] [Owner] owner\n"
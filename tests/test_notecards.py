@@ -0,0 +1,119 @@
+"""
+Tests for the mmap-backed notecard store.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_notecards import EOF, MAX_LINE_BYTES, NotecardStore, open_store
+from lsl_region import RegionHost
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    (tmp_path / "profile.txt").write_bytes(b"Name: Ada\r\nRole: Guide\n\nMood: calm\n")
+    (tmp_path / "config.txt").write_bytes(b"one\ntwo")
+    (tmp_path / "reader.lsl").write_bytes(b"default { }\n")
+    (tmp_path / "empty.txt").write_bytes(b"")
+    (tmp_path / "long.txt").write_bytes(b"x" * 2000 + b"\nend\n")
+    return tmp_path
+
+
+class TestNotecardStore:
+    """Test suite for NotecardStore."""
+
+    def test_lines_and_counts(self, inventory):
+        store = NotecardStore(str(inventory))
+
+        assert [store.line("profile", n) for n in range(5)] == ["Name: Ada", "Role: Guide", "", "Mood: calm", EOF]
+        assert store.count("profile") == 4
+        assert store.count("config") == 2 and store.line("config", 1) == "two"
+        assert store.count("empty") == 0 and store.line("empty", 0) == EOF
+        assert store.line("profile", -1) == EOF
+
+    def test_missing_and_path_like_names(self, inventory):
+        store = NotecardStore(str(inventory))
+        (inventory / "sub").mkdir()
+        (inventory / "sub" / "inner.txt").write_text("hidden\n")
+
+        assert store.line("nope", 0) is None and store.count("nope") is None
+        assert "sub/inner" not in store and ".." not in store
+        assert "profile" in store
+
+    def test_only_txt_files_are_notecards(self, inventory):
+        store = NotecardStore(str(inventory))
+
+        assert "reader" not in store and "reader.lsl" not in store
+        assert store.get("reader.lsl") is None and store.line("reader", 0) is None
+        assert "profile.txt" not in store       # the name has no extension
+
+    def test_long_lines_are_cut(self, inventory):
+        store = NotecardStore(str(inventory))
+
+        assert len(store.line("long", 0)) == MAX_LINE_BYTES
+        assert store.line("long", 1) == "end"
+
+    def test_index_is_built_once(self, inventory):
+        store = NotecardStore(str(inventory))
+        notecard = store.get("profile")
+        for n in range(4):
+            store.line("profile", n)
+
+        assert store.get("profile") is notecard
+        assert list(notecard.offsets) == [0, 11, 23, 24, 35]
+        store.reload("profile")
+        assert store.get("profile") is not notecard
+        store.close()
+
+    def test_stores_are_shared_per_directory(self, inventory):
+        assert open_store(str(inventory)) is open_store(str(inventory / "."))
+
+
+READER = LSLParser(single_pass=True).parse("""
+string NOTECARD = "profile";
+string text = "";
+integer lines = -1;
+integer line = 0;
+key query;
+default {
+    state_entry() {
+        if (llGetInventoryType(NOTECARD) == INVENTORY_NOTECARD) {
+            llGetNumberOfNotecardLines(NOTECARD);
+            query = llGetNotecardLine(NOTECARD, line);
+        }
+    }
+    dataserver(key id, string data) {
+        if (id != query) { lines = (integer)data; return; }
+        if (data == EOF) { text += "|" + (string)llGetTime(); return; }
+        text += data + ";";
+        line = line + 1;
+        query = llGetNotecardLine(NOTECARD, line);
+    }
+}
+""")
+
+
+class TestSimulatorNotecards:
+    """Test suite for the simulator's notecard functions."""
+
+    def test_script_reads_a_notecard(self, inventory):
+        region = RegionHost()
+        script = region.add_script(READER, inventory=str(inventory))
+        region.run_for(1.0)
+
+        assert script.global_scope.get("lines") == 4
+        assert script.global_scope.get("text") == "Name: Ada;Role: Guide;;Mood: calm;|0.5"
+
+    def test_missing_notecard(self, inventory):
+        region = RegionHost()
+        script = region.add_script(READER, inventory=str(inventory))
+
+        assert script.api_llGetInventoryType("nope") == -1
+        assert script.api_llGetNotecardLine("nope", 0) == "00000000-0000-0000-0000-000000000000"
+
+    def test_ossl_readers(self, inventory):
+        script = RegionHost().add_script(READER, inventory=str(inventory))
+
+        assert script.api_osGetNotecardLine("profile", 1) == "Role: Guide"
+        assert script.api_osGetNotecardLine("profile", 9) == ""
+        assert script.api_osGetNumberOfNotecardLines("config") == 2
+        assert script.api_osGetNotecard("config") == "one\ntwo"
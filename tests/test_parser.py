@@ -3,7 +3,11 @@ Professional tests for LSL Production Parser.
 Tests parsing capabilities with proper assertions and edge cases.
 """
 
+import time
+from pathlib import Path
+
 import pytest
+import lsl_antlr_parser
 from lsl_antlr_parser import LSLParser
 
 
@@ -280,4 +284,78 @@ class TestLSLProductionParser:
         default_state = parsed["states"]["default"]
         assert "state_entry" in default_state
         assert "sensor" in default_state
-        assert "touch_start" in default_state
\ No newline at end of file
+        assert "touch_start" in default_state
+
+
+@pytest.fixture(scope="module")
+def single_pass_parser():
+    """Parser running in single-pass mode."""
+    return LSLParser(single_pass=True)
+
+
+class TestSinglePassParser:
+    """Test suite for the single-pass (whole `script` rule) parsing mode."""
+    
+    NPC_SCRIPT = Path(__file__).parent.parent / "npc.lsl"
+    
+    @pytest.mark.parametrize("script_name", [
+        "minimal", "with_globals", "with_functions", "with_timer", "complex_npc",
+    ])
+    def test_same_output_as_regex_scanner(self, parser, single_pass_parser, sample_lsl_scripts, script_name):
+        """Single-pass mode produces the same dict as the regex scanner."""
+        script = sample_lsl_scripts[script_name]
+        assert single_pass_parser.parse_script(script) == parser.parse_script(script)
+    
+    def test_else_if_chain(self, single_pass_parser):
+        """Else-if chains nest an if_statement in the else branch."""
+        parsed = single_pass_parser.parse_script("""
+            default {
+                touch_start(integer n) {
+                    if (n == 1) llSay(0, "one");
+                    else if (n == 2) llSay(0, "two");
+                    else llSay(0, "many");
+                }
+            }
+        """)
+        stmt = parsed["states"]["default"]["touch_start"]["body"][0]
+        assert stmt["type"] == "if_statement"
+        assert stmt["else_statement"]["type"] == "if_statement"
+        assert "else_statement" in stmt["else_statement"]
+    
+    def test_falls_back_on_grammar_mismatch(self):
+        """Scripts outside the grammar fall back to the regex scanner."""
+        single_pass_parser = LSLParser(single_pass=True)
+        # on_rez is a real LSL event the generated grammar does not know about
+        script = """
+            default {
+                on_rez(integer param) {
+                    llResetScript();
+                }
+            }
+        """
+        parsed = single_pass_parser.parse_script(script)
+        assert "on_rez" in parsed["states"]["default"]
+        assert single_pass_parser.errors
+    
+    @pytest.mark.performance
+    def test_parse_runs_npc(self, single_pass_parser, monkeypatch):
+        """Single-pass parsing of npc.lsl matches the regex scanner with one parser run, not one per body."""
+        code = self.NPC_SCRIPT.read_text()
+        runs = []
+
+        class CountingParser(lsl_antlr_parser.GeneratedLSLParser):
+            def __init__(self, *args, **kwargs):
+                runs.append(1)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(lsl_antlr_parser, "GeneratedLSLParser", CountingParser)
+        regex_result = LSLParser().parse_script(code)
+        regex_runs = len(runs)
+        runs.clear()
+        single_pass_result = single_pass_parser.parse_script(code)
+
+        bodies = len(regex_result["functions"]) + sum(len(events) for events in regex_result["states"].values())
+        assert single_pass_parser.errors == []
+        assert single_pass_result == regex_result
+        assert regex_runs == bodies
+        assert len(runs) == 1
@@ -0,0 +1,226 @@
+"""
+Tests for the region host and its sharded mode.
+"""
+
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_region import RegionHost, ShardedRegion, benchmark
+
+
+def parse(source):
+    return LSLParser(single_pass=True).parse(source)
+
+
+PINGER = parse("""
+default {
+    state_entry() { llSetTimerEvent(1.0); }
+    timer() { llSay(5, "ping"); }
+}
+""")
+
+LISTENER = parse("""
+integer heard = 0;
+string last = "";
+default {
+    state_entry() { llListen(5, "", "", "ping"); }
+    listen(integer channel, string name, key id, string message) {
+        heard++;
+        last = name + ":" + message;
+    }
+}
+""")
+
+LINKED = parse("""
+string got = "";
+default {
+    link_message(integer sender, integer num, string text, key id) {
+        got += (string)sender + text;
+    }
+    touch_start(integer n) { llMessageLinked(n, 0, "x", ""); }
+}
+""")
+
+SENSING = parse("""
+integer seen = -1;
+string first = "";
+default {
+    state_entry() { llSensorRepeat("", "", 1, 20.0, 3.14, 1.0); }
+    sensor(integer n) { seen = n; first = llDetectedName(0); }
+    no_sensor() { seen = 0; }
+}
+""")
+
+
+class TestRegionHost:
+    """Test suite for RegionHost."""
+
+    def test_chat_reaches_listeners(self):
+        region = RegionHost()
+        region.add_script(PINGER, object_name="Pinger")
+        listeners = [region.add_script(LISTENER) for _ in range(3)]
+        region.run_for(3.0)
+
+        for listener in listeners:
+            assert listener.global_scope.get("heard") == 3
+            assert listener.global_scope.get("last") == "Pinger:ping"
+
+    def test_speaker_does_not_hear_itself(self):
+        region = RegionHost()
+        talker = region.add_script(parse("""
+integer heard = 0;
+default {
+    state_entry() { llListen(5, "", "", ""); llSay(5, "hi"); }
+    listen(integer c, string n, key id, string m) { heard++; }
+}
+"""))
+        region.run_for(1.0)
+
+        assert talker.global_scope.get("heard") == 0
+        assert region.get_stats()['chat_messages'] == 1
+
+    def test_link_message_targets(self):
+        region = RegionHost()
+        prims = [region.add_script(LINKED, object_id="chair") for _ in range(3)]
+        other = region.add_script(LINKED, object_id="table")
+        region.run_for(0.0)
+
+        prims[0].queue_event("touch_start", [-1])   # LINK_SET
+        prims[1].queue_event("touch_start", [-2])   # LINK_ALL_OTHERS
+        prims[2].queue_event("touch_start", [3])    # prim 3 only
+        region.dispatch_pending()
+
+        assert [prim.global_scope.get("got") for prim in prims] == ["1x2x", "1x", "1x2x3x"]
+        assert other.global_scope.get("got") == ""
+
+    def test_region_sensor(self):
+        region = RegionHost()
+        script = region.add_script(SENSING)
+        region.run_for(1.5)
+        assert script.global_scope.get("seen") == 0
+
+        region.set_avatars([{"key": "k1", "name": "Alice", "position": (131.0, 132.0, 25.0)},
+                            {"key": "k2", "name": "Bob", "position": (20.0, 20.0, 25.0)}])
+        region.run_for(1.0)
+        assert script.global_scope.get("seen") == 1
+        assert script.global_scope.get("first") == "Alice"
+        assert script.detected_avatars[0]["distance"] == 5.0
+
+    def test_lookups_read_the_world(self):
+        region = RegionHost()
+        script = region.add_script(SENSING, object_name="Greeter", owner="k2")
+        region.set_avatars([{"key": "k1", "name": "Alice", "position": (131.0, 132.0, 25.0),
+                             "velocity": (1.0, 0.0, 0.0)},
+                            {"key": "k2", "name": "Bob", "position": (20.0, 20.0, 25.0)}])
+        region.run_for(1.5)
+
+        assert script.detected_avatars[0]["velocity"] == (1.0, 0.0, 0.0)
+        assert script.api_llDetectedOwner(0) == "k1"
+        assert script.api_llKey2Name("k1") == "Alice"
+        assert script.api_llKey2Name(script.object_key) == "Greeter"
+        assert script.api_llKey2Name("gone") == ""
+        assert script.api_llGetObjectDetails(script.object_key, [1, 3, 6, 99]) == [
+            "Greeter", (128.0, 128.0, 25.0), "k2", -1]
+        assert script.api_llGetObjectDetails("gone", [1]) == []
+        assert script.api_osGetAvatarList() == ["k1", (131.0, 132.0, 25.0), "Alice"]
+
+    def test_sensors_in_a_tick_sweep_together(self):
+        region = RegionHost()
+        scripts = [region.add_script(SENSING, position=(131.0, 128.0 + i, 25.0)) for i in range(5)]
+        region.set_avatars([{"key": "k1", "name": "Alice", "position": (131.0, 132.0, 25.0)}])
+        region.run_for(3.5)
+
+        assert [script.global_scope.get("first") for script in scripts] == ["Alice"] * 5
+        # One sweep at llSensorRepeat, then one a second, each tick a single batch
+        assert region.get_stats()['sensor_sweeps'] == 5 * 4
+        assert region.get_stats()['sensor_flushes'] == 4
+
+    def test_chat_range(self):
+        region = RegionHost()
+        whisperer = parse("""
+default {
+    state_entry() { llWhisper(5, "ping"); llShout(5, "ping"); llRegionSay(5, "ping"); }
+}
+""")
+        near = region.add_script(LISTENER, position=(108.0, 100.0, 25.0))
+        middle = region.add_script(LISTENER, position=(100.0, 150.0, 25.0))
+        far = region.add_script(LISTENER, position=(250.0, 250.0, 25.0))
+        region.add_script(whisperer, position=(100.0, 100.0, 25.0))   # speaks once the others listen
+        region.run_for(0.0)
+
+        assert [script.global_scope.get("heard") for script in (near, middle, far)] == [3, 2, 1]
+
+    def test_avatar_chat_and_moving_prim(self):
+        region = RegionHost()
+        listener = region.add_script(LISTENER, position=(10.0, 10.0, 25.0))
+        region.set_avatars([{"key": "k1", "name": "Alice", "position": (100.0, 100.0, 25.0)}])
+        region.run_for(0.0)
+        listener.say_on_channel(5, "ping", "Alice", "k1")
+        region.dispatch_pending()
+        assert listener.global_scope.get("heard") == 0
+
+        listener.api_llSetPos([95.0, 100.0, 25.0])
+        listener.say_on_channel(5, "ping", "Alice", "k1")
+        region.dispatch_pending()
+        assert listener.global_scope.get("heard") == 1
+        assert listener.api_llGetPos() == (95.0, 100.0, 25.0)
+
+
+class TestShardedRegion:
+    """Test suite for ShardedRegion."""
+
+    def test_chat_crosses_shards(self):
+        region = ShardedRegion(workers=2)
+        region.add_script(PINGER, object_name="Pinger")
+        for _ in range(3):
+            region.add_script(LISTENER)
+        with region:
+            region.run_for(3.0, step=1.0)
+
+        stats = region.shard_stats
+        assert sum(shard['scripts'] for shard in stats) == 4
+        assert all(shard['errors'] == 0 for shard in stats)
+        assert region.routed_chat == 3
+        # 4 state_entry + 3 timer; the listener sharing the pinger's shard hears
+        # all 3 pings, the two on the other shard hear them a step late (2 each)
+        assert sum(shard['events'] for shard in stats) == 4 + 3 + 3 + 2 * 2
+
+    @pytest.mark.parametrize("bus_size", [None, 32])
+    def test_pipe_fallback_matches_bus(self, bus_size):
+        """Without a bus, or with one too small to hold a record, chat still crosses shards."""
+        region = ShardedRegion(workers=2, bus_size=bus_size)
+        region.add_script(PINGER, object_name="Pinger")
+        for _ in range(3):
+            region.add_script(LISTENER)
+        with region:
+            region.run_for(3.0, step=1.0)
+
+        assert sum(shard['events'] for shard in region.shard_stats) == 4 + 3 + 3 + 2 * 2
+
+    def test_sensors_see_prims_on_other_shards(self):
+        region = ShardedRegion(workers=2)
+        region.add_script(parse("default { state_entry() { } }"), object_name="Target")   # shard 0
+        region.add_script(parse("""
+default {
+    state_entry() { llSensorRepeat("Target", "", SCRIPTED, 20.0, PI, 1.0); }
+    sensor(integer n) { llSay(5, llDetectedName(0)); }
+}
+"""), position=(130.0, 128.0, 25.0))                                                     # shard 1
+        with region:
+            region.run_for(3.0, step=1.0)
+
+        # The sensor on shard 1 found the prim on shard 0 at every sweep and said so
+        assert region.routed_chat == 4
+
+    def test_link_sets_stay_together(self):
+        region = ShardedRegion(workers=3)
+        for _ in range(4):
+            region.add_script(LINKED, object_id="chair")
+        region.add_script(LINKED, object_id="table")
+
+        assert [len(scripts) for scripts in region.shard_scripts] == [4, 1, 0]
+
+    def test_benchmark_runs(self):
+        results = benchmark(copies=4, max_workers=2, seconds=2.0, step=1.0)
+
+        assert [row['workers'] for row in results] == [1, 2]
+        assert all(row['events'] == 4 * 3 for row in results)
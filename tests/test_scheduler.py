@@ -0,0 +1,221 @@
+"""
+Tests for the shared timer scheduler.
+"""
+
+import threading
+import pytest
+from lsl_antlr_parser import LSLParser
+from lsl_scheduler import Scheduler, VirtualClock, VIRTUAL_EPOCH
+from lsl_simulator import LSLSimulator
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return Scheduler(clock=clock)
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait()[:2])
+    return events
+
+
+class TestScheduler:
+    """Test suite for Scheduler."""
+
+    def test_fires_in_deadline_order(self, scheduler, clock):
+        fired = []
+        scheduler.call_later(2.0, fired.append, "b")
+        scheduler.call_later(1.0, fired.append, "a")
+        scheduler.call_later(3.0, fired.append, "c")
+        clock.now = 2.5
+
+        assert scheduler.run_pending() == 3.0
+        assert fired == ["a", "b"]
+
+    def test_periodic_does_not_drift(self, scheduler, clock):
+        """Late runs re-arm from the deadline, not from when they ran."""
+        fired = []
+        handle = scheduler.call_every(1.0, lambda: fired.append(clock.now))
+        for now in (1.3, 2.1, 3.05):
+            clock.now = now
+            scheduler.run_pending()
+
+        assert fired == [1.3, 2.1, 3.05]
+        assert handle.when == 4.0
+
+    def test_missed_ticks_are_skipped(self, scheduler, clock):
+        fired = []
+        scheduler.call_every(1.0, fired.append, "tick")
+        clock.now = 5.5
+
+        assert scheduler.run_pending() == 6.0
+        assert fired == ["tick"]
+
+    def test_cancel(self, scheduler, clock):
+        fired = []
+        handle = scheduler.call_every(1.0, fired.append, "tick")
+        clock.now = 1.0
+        scheduler.run_pending()
+        handle.cancel()
+        clock.now = 10.0
+        scheduler.run_pending()
+
+        assert fired == ["tick"]
+        assert len(scheduler) == 0
+        assert scheduler.next_deadline() is None
+
+    def test_mass_cancel_compacts(self, scheduler):
+        handles = [scheduler.call_later(float(i), lambda: None) for i in range(1000)]
+        for handle in handles[:900]:
+            handle.cancel()
+
+        assert len(scheduler) == 100
+        assert len(scheduler._heap) < 1000
+
+    def test_cancel_while_worker_peeks(self, scheduler):
+        """A cancel racing the worker's peek is counted exactly once."""
+        handle = scheduler.call_later(1.0, lambda: None)
+        with scheduler._condition:
+            canceller = threading.Thread(target=handle.cancel)
+            canceller.start()
+            canceller.join(0.05)
+            # What the worker does while the canceller waits for the lock
+            scheduler._peek()
+        canceller.join()
+
+        assert scheduler.next_deadline() is None
+        assert scheduler.get_stats()['cancelled_pending'] == 0
+        assert len(scheduler) == 0
+
+    def test_worker_thread(self):
+        """The threaded scheduler wakes for an entry earlier than its current deadline."""
+        scheduler = Scheduler()
+        done = threading.Event()
+        scheduler.call_later(60.0, lambda: None)
+        scheduler.call_later(0.01, done.set)
+
+        assert done.wait(2.0)
+
+
+class TestSimulatorTimers:
+    """Test suite for simulator timers on the scheduler."""
+
+    def make_simulator(self, scheduler):
+        return LSLSimulator({"globals": [], "functions": {}, "states": {}}, scheduler=scheduler)
+
+    def test_rearm_replaces_timer(self, scheduler, clock):
+        """Changing the interval leaves exactly one timer; 0 cancels it."""
+        simulator = self.make_simulator(scheduler)
+        simulator.api_llSetTimerEvent(1.0)
+        simulator.api_llSetTimerEvent(0.5)
+
+        assert len(scheduler) == 1
+        clock.now = 1.0
+        scheduler.run_pending()
+        assert drain(simulator.event_queue) == [("timer", [])]
+
+        simulator.api_llSetTimerEvent(0)
+        clock.now = 5.0
+        scheduler.run_pending()
+        assert drain(simulator.event_queue) == []
+        assert len(scheduler) == 0
+
+    def test_sensor_repeat_and_remove(self, scheduler, clock):
+        simulator = self.make_simulator(scheduler)
+        simulator.api_llSensorRepeat("", "", 1, 20.0, 3.14, 2.0)
+        scheduler.run_pending()
+        clock.now = 2.0
+        scheduler.run_pending()
+
+        assert drain(simulator.event_queue) == [("sensor", [1]), ("sensor", [1])]
+        simulator.api_llSensorRemove()
+        assert len(scheduler) == 0
+
+    def test_many_scripts_share_no_threads(self, scheduler, clock):
+        before = threading.active_count()
+        simulators = [self.make_simulator(scheduler) for _ in range(500)]
+        for i, simulator in enumerate(simulators):
+            simulator.api_llSetTimerEvent(1.0 + i % 5)
+        clock.now = 1.0
+        scheduler.run_pending()
+
+        assert threading.active_count() == before
+        assert sum(simulator.event_queue.qsize() for simulator in simulators) == 100
+
+    def test_stop_cancels_timers(self, scheduler):
+        simulator = self.make_simulator(scheduler)
+        simulator.api_llSetTimerEvent(1.0)
+        simulator.stop()
+
+        assert len(scheduler) == 0
+
+
+SOAK_SCRIPT = """
+integer ticks = 0;
+integer replies = 0;
+float elapsed = 0.0;
+
+default {
+    state_entry() {
+        llSetTimerEvent(60.0);
+    }
+    timer() {
+        ticks++;
+        elapsed = llGetTime();
+        if (ticks % 60 == 0) llHTTPRequest("http://example.com/talk", [], "");
+    }
+    http_response(key id, integer status, list meta, string body) {
+        replies++;
+    }
+}
+"""
+
+
+class TestVirtualClock:
+    """Test suite for fast-forwarding on a VirtualClock."""
+
+    def soak(self):
+        simulator = LSLSimulator(LSLParser(single_pass=True).parse(SOAK_SCRIPT),
+                                 scheduler=Scheduler(VirtualClock()))
+        simulator.queue_event("state_entry")
+        dispatched = simulator.run_for(24 * 3600 + 1)  # room for the last HTTP reply
+        return simulator, dispatched
+
+    def test_day_long_soak(self):
+        """A day of minute timers plus hourly HTTP round trips, without waiting."""
+        simulator, dispatched = self.soak()
+
+        assert simulator.global_scope.get("ticks") == 1440
+        assert simulator.global_scope.get("replies") == 24
+        assert simulator.global_scope.get("elapsed") == 24 * 3600.0
+        assert dispatched == 1 + 1440 + 24
+        assert simulator.scheduler.clock() == 24 * 3600 + 1
+
+    def test_reproducible(self):
+        first, _ = self.soak()
+        second, _ = self.soak()
+
+        assert first.global_scope.locals == second.global_scope.locals
+
+    def test_time_functions(self, scheduler, clock):
+        simulator = LSLSimulator({"globals": [], "functions": {}, "states": {}}, scheduler=scheduler)
+        clock.advance(90.25)
+
+        assert simulator.api_llGetTime() == 90.25
+        assert simulator.api_llGetUnixTime() == int(VIRTUAL_EPOCH) + 90
+        assert simulator.api_llGetTimestamp() == "2024-01-01T00:01:30.250000Z"
+        assert simulator.api_llGetAndResetTime() == 90.25
+        assert simulator.api_llGetTime() == 0.0
+
+    def test_run_for_needs_virtual_clock(self):
+        simulator = LSLSimulator({"globals": [], "functions": {}, "states": {}})
+
+        with pytest.raises(ValueError):
+            simulator.run_for(1.0)
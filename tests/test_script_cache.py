@@ -0,0 +1,95 @@
+"""
+Tests for the on-disk compiled-script cache.
+"""
+
+import pytest
+from lsl_dialect import LSLDialect
+from lsl_script_cache import ScriptCache, CACHE_DIR_NAME
+
+
+SCRIPT = """
+integer count = 0;
+
+default {
+    state_entry() {
+        llSay(0, "Hello");
+    }
+}
+"""
+
+
+@pytest.fixture
+def script_file(tmp_path):
+    """A small script on disk."""
+    path = tmp_path / "hello.lsl"
+    path.write_text(SCRIPT)
+    return path
+
+
+class TestScriptCache:
+    """Test suite for ScriptCache."""
+
+    def test_miss_then_hit(self, script_file):
+        """First load parses and writes the entry, second load is served from disk."""
+        cache = ScriptCache()
+        first = cache.load(script_file)
+        second = ScriptCache().load(script_file)
+
+        assert first == second
+        assert cache.get_stats()['misses'] == 1
+        assert cache.get_stats()['writes'] == 1
+        assert (script_file.parent / CACHE_DIR_NAME).is_dir()
+
+    def test_hit_skips_parser(self, script_file, monkeypatch):
+        """A cache hit never constructs the ANTLR parser."""
+        ScriptCache().load(script_file)
+
+        import lsl_script_cache
+        monkeypatch.setattr(lsl_script_cache, "LSLParser", None)
+        cache = ScriptCache()
+        parsed = cache.load(script_file)
+
+        assert "default" in parsed["states"]
+        assert cache.get_stats()['hits'] == 1
+
+    def test_source_change_invalidates(self, script_file):
+        """Editing the script invalidates its entry automatically."""
+        cache = ScriptCache()
+        cache.load(script_file)
+        script_file.write_text(SCRIPT.replace("integer count = 0;", "integer count = 0;\nfloat rate = 1.5;"))
+        parsed = cache.load(script_file)
+
+        assert [g["name"] for g in parsed["globals"]] == ["count", "rate"]
+        assert cache.get_stats()['invalidations'] == 1
+        assert cache.get_stats()['hits'] == 0
+
+    def test_dialect_is_part_of_key(self, script_file):
+        """Each dialect gets its own entry."""
+        cache = ScriptCache()
+        cache.load(script_file, LSLDialect.SECONDLIFE)
+        cache.load(script_file, LSLDialect.OPENSIMULATOR)
+
+        assert cache.get_stats()['misses'] == 2
+        assert cache.cache_path(script_file, LSLDialect.SECONDLIFE) != cache.cache_path(script_file, LSLDialect.OPENSIMULATOR)
+
+    def test_custom_cache_dir(self, script_file, tmp_path):
+        """Entries can live in a dedicated cache directory."""
+        cache_dir = tmp_path / "cache"
+        cache = ScriptCache(cache_dir=cache_dir)
+        cache.load(script_file)
+
+        assert list(cache_dir.iterdir())
+        assert not (script_file.parent / CACHE_DIR_NAME).exists()
+
+    def test_corrupt_entry_is_reparsed(self, script_file):
+        """Unreadable cache files count as misses, not failures."""
+        cache = ScriptCache()
+        path = cache.cache_path(script_file)
+        path.parent.mkdir()
+        path.write_bytes(b"LSLC not a pickle")
+
+        parsed = cache.load(script_file)
+
+        assert "default" in parsed["states"]
+        assert cache.get_stats()['errors'] == 1
+        assert ScriptCache().load(script_file) == parsed
@@ -0,0 +1,139 @@
+"""
+Tests for the region world and its spatial index.
+"""
+
+import math
+import random
+import pytest
+from lsl_world import AGENT, MAX_SENSED, NULL_KEY, PASSIVE, SCRIPTED, World, benchmark, populate
+
+
+@pytest.fixture
+def world():
+    world = World(cell_size=10.0)
+    world.add("prim", "Sensor", PASSIVE | SCRIPTED, (100.0, 100.0, 20.0))
+    return world
+
+
+def keys(found):
+    return [entity.key for _, entity in found]
+
+
+class TestWorld:
+    """Test suite for World queries."""
+
+    def test_index_matches_brute_force(self):
+        world = World(cell_size=8.0)
+        rng = random.Random(7)
+        populate(world, 2000, rng)
+        for i in range(0, 2000, 97):
+            for radius in (5.0, 20.0, 96.0):
+                indexed = world.sense(f"entity-{i}", type_mask=AGENT | PASSIVE, range=radius, limit=10000)
+                brute = world.sense(f"entity-{i}", type_mask=AGENT | PASSIVE, range=radius, limit=10000,
+                                    use_index=False)
+                assert keys(indexed) == keys(brute)
+
+    def test_range_type_and_name(self, world):
+        world.add("near", "Alice", AGENT, (103.0, 104.0, 20.0))
+        world.add("far", "Bob", AGENT, (130.0, 100.0, 20.0))
+        world.add("box", "Alice", PASSIVE, (101.0, 100.0, 20.0))
+
+        assert keys(world.sense("prim", type_mask=AGENT, range=20.0)) == ["near"]
+        assert keys(world.sense("prim", type_mask=AGENT | PASSIVE, range=96.0)) == ["box", "near", "far"]
+        assert keys(world.sense("prim", name="Alice", type_mask=AGENT | PASSIVE)) == ["box", "near"]
+        assert keys(world.sense("prim", key="far", type_mask=AGENT)) == ["far"]
+        assert world.sense("prim", type_mask=AGENT)[0][0] == 5.0
+
+    def test_arc_follows_rotation(self, world):
+        world.add("ahead", "A", AGENT, (110.0, 100.0, 20.0))
+        world.add("left", "L", AGENT, (100.0, 110.0, 20.0))
+        world.add("behind", "B", AGENT, (90.0, 100.0, 20.0))
+
+        assert keys(world.sense("prim", arc=math.pi / 4)) == ["ahead"]
+        assert sorted(keys(world.sense("prim", arc=2.0))) == ["ahead", "left"]
+        # Turned 90 degrees about Z, the prim faces +Y
+        half = math.sqrt(0.5)
+        world.rotate("prim", (0.0, 0.0, half, half))
+        assert keys(world.sense("prim", arc=math.pi / 4)) == ["left"]
+
+    def test_nearest_sixteen(self, world):
+        for i in range(40):
+            world.add(f"a{i}", "A", AGENT, (100.0 + i + 1, 100.0, 20.0))
+
+        found = world.sense("prim")
+        assert len(found) == MAX_SENSED
+        assert keys(found) == [f"a{i}" for i in range(MAX_SENSED)]
+
+    def test_move_between_cells(self, world):
+        world.add("walker", "W", AGENT, (200.0, 200.0, 20.0))
+        assert world.sense("prim", range=10.0) == []
+
+        world.move("walker", (105.0, 100.0, 20.0))
+        assert keys(world.sense("prim", range=10.0)) == ["walker"]
+        world.remove("walker")
+        assert world.sense("prim", range=10.0) == []
+        assert len(world.grid.cells) == 1
+
+    def test_batch_matches_sense(self, world):
+        rng = random.Random(3)
+        populate(world, 1500, rng)
+        world.add("inside", "I", AGENT, (100.0, 100.0, 20.0))   # at the sensing prim itself
+        for i in range(0, 1500, 50):
+            world.rotate(f"entity-{i}", (0.0, 0.0, math.sin(i / 2.0), math.cos(i / 2.0)))
+        sensors = [("prim", "", "", AGENT, 96.0, math.pi), ("prim", "Entity40", "", PASSIVE, 96.0, math.pi),
+                   ("prim", "", "entity-5", AGENT | PASSIVE, 96.0, math.pi), ("missing", "", "", AGENT, 20.0, 1.0)]
+        for i in range(0, 1500, 7):
+            sensors.append((f"entity-{i}", "", "", (AGENT, PASSIVE, AGENT | PASSIVE)[i % 3],
+                            rng.choice((5.0, 20.0, 96.0, 200.0)), rng.choice((0.3, math.pi / 2, math.pi))))
+
+        expected = [world.sense(*sensor) for sensor in sensors]
+        assert world.sense_batch(sensors) == expected
+        world.vectorized = False
+        assert world.sense_batch(sensors) == expected
+
+    def test_batch_sees_moves(self, world):
+        pytest.importorskip("numpy")
+        world.add("walker", "W", AGENT, (200.0, 200.0, 20.0))
+        sensors = [("prim", "", "", AGENT, 10.0, math.pi)]
+        assert world.sense_batch(sensors) == [[]]
+
+        world.move("walker", (105.0, 100.0, 20.0))
+        assert [keys(found) for found in world.sense_batch(sensors)] == [["walker"]]
+
+    def test_columns_reuse_removed_rows(self, world):
+        world.add("a", "A", AGENT, (1.0, 2.0, 3.0), owner="a")
+        world.add("b", "B", PASSIVE, (4.0, 5.0, 6.0), velocity=(1.0, 0.0, 0.0))
+        world.remove("a")
+        assert world.sense("prim", type_mask=AGENT | PASSIVE) == []   # 96 m away
+        assert world.name_of("a") == ""
+
+        entity = world.add("c", "C", AGENT, (7.0, 8.0, 9.0))
+        assert entity.row == 1 and len(world) == 3
+        assert world.positions[3:6].tolist() == [7.0, 8.0, 9.0]
+        assert world.get("b").velocity == (1.0, 0.0, 0.0)
+        assert world.details("c", [1, 3, 5, 7]) == ["C", (7.0, 8.0, 9.0), (0.0, 0.0, 0.0), NULL_KEY]
+        assert [agent.key for agent in world.agents()] == ["c"]
+
+    @pytest.mark.parametrize("vectorized", [True, False])
+    def test_bulk_movement(self, world, vectorized):
+        if vectorized:
+            pytest.importorskip("numpy")
+        world.vectorized = vectorized
+        for i in range(10):
+            world.add(f"w{i}", "W", AGENT, (200.0, 100.0 + i, 20.0), velocity=(-10.0, 0.0, 0.0))
+
+        assert world.advance(5.0) == 10
+        assert world.get("w3").position == (150.0, 103.0, 20.0)
+        assert world.sense("prim", range=20.0) == []
+        world.move_many([f"w{i}" for i in range(5)], [(100.0, 101.0 + i, 20.0) for i in range(5)])
+        assert keys(world.sense("prim", range=20.0)) == ["w0", "w1", "w2", "w3", "w4"]
+        assert world.advance(1.0) == 10
+        assert [entity.position for _, entity in world.sense("prim", range=20.0)] == [
+            (90.0, 101.0 + i, 20.0) for i in range(5)]
+
+    def test_benchmark_runs(self):
+        result = benchmark(scripts=20, entities=200, seconds=2.0)
+
+        assert result['events'] == 20 + 20 * 3
+        assert result['indexed_sweep'] > 0
+        assert result['batched_sweep'] > 0